@@ -0,0 +1,391 @@
+import abc
+import asyncio
+import os
+import re
+import threading
+import time
+
+from cv_to_role_analyzer.llm import LLMClient
+from cv_to_role_analyzer.prefilter import KeywordPrefilter
+from cv_to_role_analyzer.role import PreparedRole
+from cv_to_role_analyzer.streaming import FieldStream
+from cv_to_role_analyzer.tracing import Tracer
+
+
+class Backend(abc.ABC):
+    """
+    The interface of the analysis backends, which turn a CV and a job description into an analysis.
+
+    Every backend returns the same analysis shape (`match_score`, `skill_gaps` and `recommendations`), so
+    they are interchangeable behind `CVAnalyzer.analyze_core`. The calls, failures and latency of each
+    backend are recorded to report its throughput. A backend implements `_analyze`, and may override
+    `_analyze_async` when it has a native asynchronous call.
+
+    Attributes:
+        name (str): The name of the backend in the registry.
+        model (str): The model identity, part of the result cache key.
+        version (str): The version of the backend logic, part of the result cache key.
+
+    Methods:
+        analyze_match(cv_text, role_text): Analyzes a CV against a job description.
+        analyze_match_async(cv_text, role_text, timeout): Asynchronous counterpart of `analyze_match`.
+        analyze_match_stream(cv_text, role_text, on_field): Analyzes a pair, emitting each field of the analysis.
+        reanalyze_match(cv_text, role_text, previous, revised, removed): Updates the analysis of an earlier
+            version of a CV after some of its sections were revised.
+        stats(): Returns the calls, failures, mean latency and throughput of the backend.
+    """
+
+    name = None
+    model = None
+    version = "1"
+
+    def __init__(self):
+        """Initializes the throughput counters."""
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._failures = 0
+        self._seconds = 0.0
+        self._first_start = None
+        self._last_end = None
+
+    def analyze_match(self, cv_text, role_text):
+        """Analyzes a CV against a job description.
+
+        Args:
+            cv_text (str): The CV text to analyze.
+            role_text (str or PreparedRole): The job description text, or a role prepared once for many CVs.
+
+        Returns:
+            dict: The analysis, or None if it failed.
+        """
+        start = time.perf_counter()
+        analysis = self._analyze(cv_text, role_text)
+        self._record(start, analysis)
+        return analysis
+
+    async def analyze_match_async(self, cv_text, role_text, timeout=None):
+        """Analyzes a CV against a job description asynchronously.
+
+        Args:
+            cv_text (str): The CV text to analyze.
+            role_text (str or PreparedRole): The job description text, or a role prepared once for many CVs.
+            timeout (float, optional): The maximum number of seconds to wait for each remote call.
+
+        Returns:
+            dict: The analysis, or None if it failed.
+        """
+        start = time.perf_counter()
+        analysis = await self._analyze_async(cv_text, role_text, timeout)
+        self._record(start, analysis)
+        return analysis
+
+    def analyze_match_stream(self, cv_text, role_text, on_field):
+        """Analyzes a CV against a job description, passing each field of the analysis to `on_field`.
+
+        Backends that cannot stream emit every field at once when the analysis is complete.
+
+        Args:
+            cv_text (str): The CV text to analyze.
+            role_text (str or PreparedRole): The job description text, or a role prepared once for many CVs.
+            on_field (callable): Called with each FieldEvent.
+
+        Returns:
+            dict: The analysis, or None if it failed.
+        """
+        stream = FieldStream()
+        analysis = self.analyze_match(cv_text, role_text)
+        for event in stream.finish(analysis):
+            on_field(event)
+        return analysis
+
+    def reanalyze_match(self, cv_text, role_text, previous, revised, removed=()):
+        """Updates the analysis of an earlier version of a CV after some of its sections were revised.
+
+        Backends that cannot take the previous analysis as context analyze the whole revised CV again.
+
+        Args:
+            cv_text (str): The full text of the revised CV.
+            role_text (str or PreparedRole): The job description text, or a role prepared once for many CVs.
+            previous (dict): The analysis of the earlier version.
+            revised (dict): The text of each added or changed section, by section name.
+            removed (list): The names of the sections removed since the earlier version.
+
+        Returns:
+            dict: The analysis, or None if it failed.
+        """
+        return self.analyze_match(cv_text, role_text)
+
+    def stats(self):
+        """Returns the calls, failures, mean latency and throughput of the backend.
+
+        Returns:
+            dict: The number of calls and failures, the mean seconds per call, and the calls per second of
+                wall-clock time between the first call and the end of the last one.
+        """
+        with self._lock:
+            wall = (self._last_end - self._first_start) if self._calls else 0.0
+            return {
+                "calls": self._calls,
+                "failures": self._failures,
+                "mean_seconds": round(self._seconds / self._calls, 6) if self._calls else 0.0,
+                "throughput_per_second": round(self._calls / wall, 3) if wall > 0 else 0.0,
+            }
+
+    @abc.abstractmethod
+    def _analyze(self, cv_text, role_text):
+        """Analyzes a pair and returns the normalized analysis (dict), or None if it failed."""
+
+    async def _analyze_async(self, cv_text, role_text, timeout):
+        """Runs `_analyze` on a worker thread; backends with a native asynchronous call override it."""
+        return await asyncio.to_thread(self._analyze, cv_text, role_text)
+
+    def _record(self, start, analysis):
+        """Records one call and its outcome."""
+        end = time.perf_counter()
+        with self._lock:
+            self._calls += 1
+            self._failures += analysis is None
+            self._seconds += end - start
+            self._first_start = start if self._first_start is None else min(self._first_start, start)
+            self._last_end = end if self._last_end is None else max(self._last_end, end)
+        Tracer.count("backend_calls", backend=self.name, status="ok" if analysis is not None else "failed")
+
+
+class GeminiBackend(Backend):
+    """The Gemini API backend, which calls `LLMClient` with its shared client, scheduler and retries."""
+
+    name = "gemini"
+
+    def __init__(self):
+        super().__init__()
+        self.model = LLMClient.MODEL_NAME
+        self.version = LLMClient.PROMPT_VERSION
+
+    def analyze_match_stream(self, cv_text, role_text, on_field):
+        start = time.perf_counter()
+        analysis = LLMClient.analyze_match_stream(cv_text, role_text, on_field)
+        self._record(start, analysis)
+        return analysis
+
+    def reanalyze_match(self, cv_text, role_text, previous, revised, removed=()):
+        start = time.perf_counter()
+        sections = "\n\n".join(f"{name.title()}:\n{text}" for name, text in revised.items())
+        analysis = LLMClient.analyze_match(sections, role_text, previous=previous, removed=list(removed))
+        self._record(start, analysis)
+        return analysis
+
+    def _analyze(self, cv_text, role_text):
+        return LLMClient.analyze_match(cv_text, role_text)
+
+    async def _analyze_async(self, cv_text, role_text, timeout):
+        return await LLMClient.analyze_match_async(cv_text, role_text, timeout=timeout)
+
+
+class SkillOverlapBackend(Backend):
+    """
+    A local, CPU-only backend scoring the overlap between the skills of a role and the terms of a CV.
+
+    It needs no network access and is deterministic. Each skill listed under the skill or qualification
+    headings of the role (or, if there are none, each of its main keywords) is covered when at least half of
+    its terms appear in the CV. The match score blends the share of covered skills with the keyword
+    similarity of the texts, and every uncovered skill becomes a skill gap with a recommendation.
+    """
+
+    name = "local"
+    model = "skill-overlap"
+
+    MAX_KEYWORDS = 12
+    MAX_GAPS = 10
+    COVERAGE_WEIGHT = 0.7
+    EDUCATION = re.compile(r"degree|bachelor|master|ph\.?d|diploma|certif|graduate", re.I)
+    RECOMMENDATIONS = {"Education": "Consider obtaining, or list if already held",
+                       "Experience": "Describe relevant experience with",
+                       "Technical": "Highlight or build skills in"}
+    EXPERIENCE = re.compile(r"\d\+?\s*years?|experience|senior|track record|led\b|leading", re.I)
+
+    def _analyze(self, cv_text, role_text):
+        text = getattr(role_text, "text", role_text)
+        prefilter = getattr(role_text, "prefilter", None) or KeywordPrefilter(text)
+        skills = getattr(role_text, "skills", None) or PreparedRole.extract_skills(PreparedRole.normalize(text))
+        if not skills:
+            skills = sorted(prefilter.role_vector, key=lambda term: (-prefilter.role_vector[term], term))
+            skills = skills[:SkillOverlapBackend.MAX_KEYWORDS]
+
+        cv_vector = KeywordPrefilter.vectorize(cv_text)
+        covered, gaps = 0, []
+        for skill in skills:
+            terms = set(KeywordPrefilter.tokenize(skill))
+            if not terms:
+                continue
+            if len(terms & cv_vector.keys()) * 2 >= len(terms):
+                covered += 1
+            else:
+                gaps.append(skill)
+
+        coverage = covered / (covered + len(gaps)) if covered + len(gaps) else 0.0
+        similarity = min(1.0, prefilter.score(cv_vector) * 2)  # Cosine scores of matching texts rarely pass 0.5
+        weight = SkillOverlapBackend.COVERAGE_WEIGHT
+        gaps = [(SkillOverlapBackend._category(gap), gap.rstrip(" .;")) for gap in gaps[:SkillOverlapBackend.MAX_GAPS]]
+        return {
+            "match_score": round(100 * (weight * coverage + (1 - weight) * similarity)),
+            "skill_gaps": [{"category": category, "gap": f"No evidence of: {gap}"} for category, gap in gaps],
+            "recommendations": [f"{SkillOverlapBackend.RECOMMENDATIONS[category]}: {gap}" for category, gap in gaps],
+        }
+
+    async def _analyze_async(self, cv_text, role_text, timeout):
+        return self._analyze(cv_text, role_text)  # Microseconds of CPU work, not worth a thread
+
+    @staticmethod
+    def _category(skill):
+        """Returns the skill gap category of a skill item."""
+        if SkillOverlapBackend.EDUCATION.search(skill):
+            return "Education"
+        if SkillOverlapBackend.EXPERIENCE.search(skill):
+            return "Experience"
+        return "Technical"
+
+
+class RoutingBackend(Backend):
+    """
+    A backend routing each pair through a cheap pre-screening backend, and only the shortlist to a second one.
+
+    Pairs scored below `min_score` by the pre-screening backend keep its analysis; the others are analyzed
+    again by the shortlist backend. With the defaults, the local scorer screens every pair and only the
+    promising ones reach Gemini.
+
+    Attributes:
+        prescreen (Backend): The backend analyzing every pair.
+        shortlist (Backend): The backend analyzing the pairs that pass the pre-screening.
+        min_score (int): The pre-screening score from which a pair is shortlisted.
+    """
+
+    name = "routed"
+
+    def __init__(self, prescreen, shortlist, min_score=40):
+        """
+        Initializes the routing policy.
+
+        Args:
+            prescreen (Backend): The backend analyzing every pair.
+            shortlist (Backend): The backend analyzing the pairs that pass the pre-screening.
+            min_score (int): The pre-screening score from which a pair is shortlisted.
+        """
+        super().__init__()
+        self.prescreen = prescreen
+        self.shortlist = shortlist
+        self.min_score = min_score
+        self.model = f"{prescreen.model}>{shortlist.model}@{min_score}"
+        self.version = f"{prescreen.version}>{shortlist.version}"
+
+    @staticmethod
+    def from_env():
+        """Creates the default routing policy, local then Gemini, from the CV_ANALYZER_ROUTE_MIN_SCORE variable.
+
+        Returns:
+            RoutingBackend: The routing backend.
+        """
+        return RoutingBackend(BackendRegistry.get("local"), BackendRegistry.get("gemini"),
+                              int(os.getenv("CV_ANALYZER_ROUTE_MIN_SCORE", "40")))
+
+    def analyze_match_stream(self, cv_text, role_text, on_field):
+        start = time.perf_counter()
+        analysis = self.prescreen.analyze_match(cv_text, role_text)
+        if analysis is None or analysis["match_score"] >= self.min_score:
+            analysis = self.shortlist.analyze_match_stream(cv_text, role_text, on_field)
+        else:
+            for event in FieldStream().finish(analysis):
+                on_field(event)
+        self._record(start, analysis)
+        return analysis
+
+    def _analyze(self, cv_text, role_text):
+        analysis = self.prescreen.analyze_match(cv_text, role_text)
+        if analysis is not None and analysis["match_score"] < self.min_score:
+            return analysis
+        return self.shortlist.analyze_match(cv_text, role_text)
+
+    async def _analyze_async(self, cv_text, role_text, timeout):
+        analysis = await self.prescreen.analyze_match_async(cv_text, role_text, timeout)
+        if analysis is not None and analysis["match_score"] < self.min_score:
+            return analysis
+        return await self.shortlist.analyze_match_async(cv_text, role_text, timeout)
+
+
+class BackendRegistry:
+    """
+    The process-wide registry of analysis backends.
+
+    Backends are registered by name with a factory and created once, on first use. The default backend is
+    named by the CV_ANALYZER_BACKEND environment variable, or is `gemini`.
+
+    Methods:
+        register(name, factory): Registers a backend factory under a name.
+        names(): Returns the registered backend names.
+        get(backend): Returns a backend given its name, or the default backend.
+        stats(): Returns the throughput of every backend used so far.
+    """
+
+    _factories = {}
+    _instances = {}
+    _lock = threading.RLock()
+
+    @staticmethod
+    def register(name, factory):
+        """Registers a backend factory under a name, replacing any backend of the same name.
+
+        Args:
+            name (str): The backend name, as given to `--backend`.
+            factory (callable): Called without arguments to create the backend.
+        """
+        with BackendRegistry._lock:
+            BackendRegistry._factories[name] = factory
+            BackendRegistry._instances.pop(name, None)
+
+    @staticmethod
+    def names():
+        """Returns the registered backend names.
+
+        Returns:
+            list: The names, sorted.
+        """
+        return sorted(BackendRegistry._factories)
+
+    @staticmethod
+    def get(backend=None):
+        """Returns a backend given its name, or the default backend.
+
+        Args:
+            backend (str or Backend, optional): The backend name, a backend (returned as is), or None for the
+                default backend.
+
+        Returns:
+            Backend: The backend.
+
+        Raises:
+            ValueError: If no backend is registered under the name.
+        """
+        if isinstance(backend, Backend):
+            return backend
+        name = backend or os.getenv("CV_ANALYZER_BACKEND") or "gemini"
+        with BackendRegistry._lock:
+            if name not in BackendRegistry._instances:
+                if name not in BackendRegistry._factories:
+                    raise ValueError(f"Unknown backend '{name}'. Use one of: {', '.join(BackendRegistry.names())}.")
+                BackendRegistry._instances[name] = BackendRegistry._factories[name]()
+            return BackendRegistry._instances[name]
+
+    @staticmethod
+    def stats():
+        """Returns the throughput of every backend used so far.
+
+        Returns:
+            dict: The `Backend.stats()` of each backend created so far, keyed by name.
+        """
+        with BackendRegistry._lock:
+            instances = dict(BackendRegistry._instances)
+        return {name: backend.stats() for name, backend in sorted(instances.items())}
+
+
+BackendRegistry.register("gemini", GeminiBackend)
+BackendRegistry.register("local", SkillOverlapBackend)
+BackendRegistry.register("routed", RoutingBackend.from_env)
@@ -0,0 +1,281 @@
+import hashlib
+import heapq
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from datetime import datetime, timezone
+
+from cv_to_role_analyzer.prefilter import KeywordPrefilter
+from cv_to_role_analyzer.role import PreparedRole
+from cv_to_role_analyzer.validation import AnalysisRequest
+
+
+class BatchRunner:
+    """
+    A class for analyzing many CVs against many job descriptions in a single run.
+
+    CVs are consumed lazily from a stream of `(cv_id, text)` records and every CV x role pair is analyzed on
+    a bounded worker pool. At most `max_pending` pairs are queued or running at any time, so the next CV is
+    only pulled from the stream once a slot frees up and memory stays flat regardless of the corpus size.
+    Each pair produces one result file with a stable name, or one line of a `ResultSink` when a sink is
+    given, and a summary manifest is written once all pairs are finished. A failure on one pair is recorded
+    in the manifest and does not abort the remaining pairs. A pair whose result file name is already used in
+    the run (a duplicate CV identifier) is recorded as failed rather than overwriting the earlier result.
+
+    When `min_score` or `top_k` is set, every pair is first scored locally with a `KeywordPrefilter`, and
+    only the CVs above the threshold, or the `top_k` best CVs of each role, are sent to the LLM. The local
+    score of every pair, including the filtered ones, is kept in the manifest for auditing.
+
+    Attributes:
+        output_dir (str): The directory where result files and the manifest are written.
+        max_workers (int): The maximum number of analyses running concurrently.
+        max_pending (int): The maximum number of pairs queued or running at once.
+        analyze (callable): The function used to analyze a (cv_text, role_text) pair into a JSON string.
+        min_score (float): The local score below which a pair is not analyzed, or None.
+        top_k (int): The number of best-scoring CVs analyzed per role, or None for all of them.
+        sink (ResultSink): The append-only store receiving the results instead of one file per pair, or None.
+
+    Methods:
+        discover(directory, extension): Lists the input files of a directory with the given extension.
+        read_roles(role_paths, compactor): Reads and prepares the job role files into a dictionary keyed by file name.
+        result_name(cv_id, role_id): Returns the stable result file name for a CV x role pair.
+        run(records, roles): Analyzes all pairs and writes the result files and the manifest.
+    """
+
+    MANIFEST_NAME = "manifest.json"
+
+    def __init__(self, output_dir, max_workers=4, analyze=None, max_pending=None, min_score=None, top_k=None,
+                 sink=None):
+        """
+        Initializes the BatchRunner.
+
+        Args:
+            output_dir (str): The directory where result files and the manifest are written.
+            max_workers (int): The maximum number of analyses running concurrently.
+            analyze (callable, optional): The analysis function, defaults to `CVAnalyzer.analyze_core`.
+            max_pending (int, optional): The maximum number of pairs queued or running at once, defaults to
+                twice `max_workers`.
+            min_score (float, optional): The local score (0.0-1.0) below which a pair is not analyzed.
+            top_k (int, optional): The number of best-scoring CVs analyzed per role.
+            sink (ResultSink, optional): The append-only store receiving the results instead of one file per pair.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1.")
+        if top_k is not None and top_k < 1:
+            raise ValueError("top_k must be at least 1.")
+        if analyze is None:
+            from cv_to_role_analyzer.cv_analyzer import CVAnalyzer
+            analyze = CVAnalyzer.analyze_core
+        self.output_dir = output_dir
+        self.max_workers = max_workers
+        self.max_pending = max(max_pending or 2 * max_workers, max_workers)
+        self.analyze = analyze
+        self.min_score = min_score
+        self.top_k = top_k
+        self.sink = sink
+        self._names = set()
+        self._names_lock = threading.Lock()
+
+    @staticmethod
+    def discover(directory, extension):
+        """Lists the files in a directory with the given extension, sorted by name.
+
+        Args:
+            directory (str): The directory to scan.
+            extension (str): The file extension to match (e.g. ".pdf"), compared case-insensitively.
+
+        Returns:
+            list: The sorted list of matching file paths.
+
+        Raises:
+            FileNotFoundError: If the directory does not exist.
+            NotADirectoryError: If the path is not a directory.
+        """
+        if not os.path.exists(directory):
+            raise FileNotFoundError(f"The directory {directory} does not exist.")
+        if not os.path.isdir(directory):
+            raise NotADirectoryError(f"{directory} is not a directory.")
+        return sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.lower().endswith(extension) and os.path.isfile(os.path.join(directory, name))
+        )
+
+    @staticmethod
+    def read_roles(role_paths, compactor=None):
+        """Reads and prepares the job role files into a dictionary keyed by file name.
+
+        Each role is parsed, compacted and its prompt prefix built once, then shared by every CV of the batch.
+
+        Args:
+            role_paths (list): The paths to the job role text files.
+            compactor (TextCompactor, optional): The compactor shrinking each role to its token budget.
+
+        Returns:
+            dict: The prepared roles (or None if a file could not be read), keyed by file name.
+        """
+        return {os.path.basename(path): PreparedRole.from_file(path, os.path.basename(path), compactor=compactor)
+                for path in role_paths}
+
+    @staticmethod
+    def result_name(cv_id, role_id):
+        """Returns the stable result file name for a CV x role pair.
+
+        Args:
+            cv_id (str): The identifier of the CV, usually its file name.
+            role_id (str): The identifier of the job role, usually its file name.
+
+        Returns:
+            str: A file name of the form `<cv>__<role>.json`. Identifiers made of letters, digits, `.`, `-`
+                and single `_` are kept whole, extension included, so `alice.pdf` and `alice.txt` get different
+                names; other identifiers are sanitized and suffixed with a short hash of the original one.
+        """
+        def part(identifier):
+            name = re.sub(r"[^A-Za-z0-9._-]+|_{2,}", "_", identifier).strip("_")
+            if name == identifier:
+                return name
+            return f"{name or 'unnamed'}-{hashlib.sha256(identifier.encode('utf-8')).hexdigest()[:8]}"
+
+        return f"{part(cv_id)}__{part(role_id)}.json"
+
+    def run(self, records, roles):
+        """Analyzes every CV x role pair and writes one result file per pair plus a manifest.
+
+        Args:
+            records (iterable): The `(cv_id, cv_text)` records, consumed lazily.
+            roles (dict): The job roles, as texts or PreparedRole objects, keyed by role identifier.
+
+        Returns:
+            dict: The manifest, also written to `manifest.json` in the output directory.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._names = set()
+        started_at = datetime.now(timezone.utc).isoformat()
+
+        prefilters = None
+        if self.min_score is not None or self.top_k is not None:
+            prefilters = {role_id: getattr(role, "prefilter", None) or KeywordPrefilter(role)
+                          for role_id, role in roles.items()}
+        shortlists = {role_id: [] for role_id in roles}  # Min-heaps of the best CVs per role, used with top_k
+
+        entries = []
+        pending = set()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for position, (cv_id, cv_text) in enumerate(records):
+                cv_vector = KeywordPrefilter.vectorize(cv_text) if prefilters and cv_text else None
+                for role_id, role_text in roles.items():
+                    score = prefilters[role_id].score(cv_vector) if cv_vector is not None else None
+                    if score is None:
+                        self._submit(executor, pending, entries, cv_id, cv_text, role_id, role_text, score)
+                    elif self.min_score is not None and score < self.min_score:
+                        entries.append(self._filtered_entry(cv_id, role_id, score, "below min_score"))
+                    elif self.top_k is not None:
+                        heapq.heappush(shortlists[role_id], (score, -position, cv_id, cv_text))
+                        if len(shortlists[role_id]) > self.top_k:
+                            dropped = heapq.heappop(shortlists[role_id])
+                            entries.append(self._filtered_entry(dropped[2], role_id, dropped[0], "outside top_k"))
+                    else:
+                        self._submit(executor, pending, entries, cv_id, cv_text, role_id, role_text, score)
+
+            for role_id, shortlist in shortlists.items():
+                for score, _, cv_id, cv_text in sorted(shortlist, reverse=True):
+                    self._submit(executor, pending, entries, cv_id, cv_text, role_id, roles[role_id], score)
+            entries.extend(future.result() for future in as_completed(pending))
+
+        entries.sort(key=lambda entry: (entry["cv"], entry["role"]))
+        succeeded = sum(1 for entry in entries if entry["status"] == "ok")
+        filtered = sum(1 for entry in entries if entry["status"] == "filtered")
+        manifest = {
+            "started_at": started_at,
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "total": len(entries),
+            "succeeded": succeeded,
+            "filtered": filtered,
+            "failed": len(entries) - succeeded - filtered,
+            "results": entries,
+        }
+        with open(os.path.join(self.output_dir, self.MANIFEST_NAME), "w", encoding="utf-8") as f:
+            f.write(json.dumps(manifest, indent=4, ensure_ascii=False))
+        return manifest
+
+    def _submit(self, executor, pending, entries, cv_id, cv_text, role_id, role_text, score):
+        """Queues a pair for analysis once fewer than `max_pending` pairs are in flight.
+
+        Args:
+            executor (ThreadPoolExecutor): The worker pool.
+            pending (set): The futures of the pairs in flight, updated in place.
+            entries (list): The finished manifest entries, extended in place.
+            cv_id (str): The identifier of the CV.
+            cv_text (str): The CV text.
+            role_id (str): The identifier of the job role.
+            role_text (str or PreparedRole): The job role.
+            score (float): The local prefilter score of the pair, or None.
+        """
+        # Backpressure: wait for a free slot before queueing more work
+        while len(pending) >= self.max_pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            pending.difference_update(done)
+            entries.extend(future.result() for future in done)
+        pending.add(executor.submit(self._run_pair, cv_id, cv_text, role_id, role_text, score))
+
+    @staticmethod
+    def _filtered_entry(cv_id, role_id, score, reason):
+        """Returns the manifest entry of a pair skipped by the local prefilter."""
+        return {"cv": cv_id, "role": role_id, "output": None, "status": "filtered", "prefilter_score": score,
+                "reason": reason, "elapsed_seconds": 0.0}
+
+    def _write_result(self, entry, json_report):
+        """Writes the report of a pair to its result file, or appends it to the sink and points the entry to it."""
+        if self.sink is None:
+            with open(os.path.join(self.output_dir, entry["output"]), "w", encoding="utf-8") as f:
+                f.write(json_report)
+            return
+        metadata = {"prefilter_score": entry["prefilter_score"]} if "prefilter_score" in entry else {}
+        self.sink.append(entry["cv"], entry["role"], json_report, **metadata)
+        entry["output"] = os.path.relpath(self.sink.path, self.output_dir)
+
+    def _claim(self, name, cv_id):
+        """Reserves a result file name for the run.
+
+        Raises:
+            ValueError: If another pair of the run already uses the name.
+        """
+        with self._names_lock:
+            if name in self._names:
+                raise ValueError(f"The result file {name} is already used by another pair of this run; "
+                                 f"is the CV identifier {cv_id} duplicated?")
+            self._names.add(name)
+
+    def _run_pair(self, cv_id, cv_text, role_id, role_text, score=None):
+        """Validates and analyzes a single pair and writes its result file, never raising.
+
+        Args:
+            cv_id (str): The identifier of the CV.
+            cv_text (str): The CV text, or None if it could not be extracted.
+            role_id (str): The identifier of the job role.
+            role_text (str or PreparedRole): The job role, or None if it could not be read.
+            score (float, optional): The local prefilter score of the pair, recorded in the entry.
+
+        Returns:
+            dict: The manifest entry for the pair.
+        """
+        entry = {"cv": cv_id, "role": role_id, "output": self.result_name(cv_id, role_id)}
+        if score is not None:
+            entry["prefilter_score"] = score
+        start = time.perf_counter()
+        try:
+            self._claim(entry["output"], cv_id)
+            request = AnalysisRequest.process_record(cv_id, cv_text, getattr(role_text, "text", role_text))
+            json_report = self.analyze(request["cv_text"], role_text)
+            self._write_result(entry, json_report)
+
+            entry["status"] = "ok"
+            entry["match_score"] = json.loads(json_report).get("match_score")
+        except Exception as e:  # A failing pair must not abort the rest of the batch
+            entry["status"] = "failed"
+            entry["output"] = None
+            entry["error"] = f"{type(e).__name__}: {e}"
+        entry["elapsed_seconds"] = round(time.perf_counter() - start, 3)
+        return entry
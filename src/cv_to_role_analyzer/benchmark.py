@@ -0,0 +1,506 @@
+import asyncio
+import datetime
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+from click.testing import CliRunner
+from cv_to_role_analyzer.backends import GeminiBackend, RoutingBackend, SkillOverlapBackend
+from cv_to_role_analyzer.batch import BatchRunner
+from cv_to_role_analyzer.compaction import TextCompactor
+from cv_to_role_analyzer.cv_analyzer import CVAnalyzer
+from cv_to_role_analyzer.fakes import FakeGeminiClient
+from cv_to_role_analyzer.index import CVIndex
+from cv_to_role_analyzer.ingestion import CVSource
+from cv_to_role_analyzer.llm import LLMClient
+from cv_to_role_analyzer.ranking import Ranker
+from cv_to_role_analyzer.ratelimit import RequestScheduler
+from cv_to_role_analyzer.utils import PDFProcessor, RoleProcessor
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+class SyntheticCorpus:
+    """
+    A generated corpus of CV PDFs and job role texts, written to a directory.
+
+    The CVs are multi-page PDFs with per-page headers, page numbers and a contact line, like real exports,
+    and are generated from a seed so that every run measures the same inputs.
+
+    Attributes:
+        cv_dir (str): The directory of the CV PDFs.
+        role_dir (str): The directory of the job role text files.
+
+    Methods:
+        write_text_pdf(path, pages): Writes a PDF with one page per list of text lines.
+    """
+
+    SKILLS = ("Python", "Java", "Go", "Rust", "C++", "SQL", "PostgreSQL", "Kafka", "Docker", "Kubernetes", "AWS",
+              "GCP", "Terraform", "React", "TypeScript", "Spring Boot", "Django", "Airflow", "Spark", "Linux")
+    TITLES = ("Backend Engineer", "Data Engineer", "Platform Engineer", "Frontend Developer", "ML Engineer")
+
+    def __init__(self, directory, cv_count, role_count, pages=2, seed=0):
+        """
+        Generates the corpus.
+
+        Args:
+            directory (str): The directory to write the corpus to.
+            cv_count (int): The number of CVs.
+            role_count (int): The number of job roles.
+            pages (int): The number of pages of each CV.
+            seed (int): The seed of the generated contents.
+        """
+        rng = random.Random(seed)
+        self.cv_dir = os.path.join(directory, "cvs")
+        self.role_dir = os.path.join(directory, "roles")
+        os.makedirs(self.cv_dir, exist_ok=True)
+        os.makedirs(self.role_dir, exist_ok=True)
+
+        for index in range(cv_count):
+            name = f"Candidate {index:04d}"
+            page_lines = []
+            for page in range(pages):
+                lines = [f"{name} - Curriculum Vitae", f"candidate{index}@example.com | +1 555 010 {index:04d}"]
+                for job in range(3):
+                    lines.append(f"{rng.choice(SyntheticCorpus.TITLES)} | Company {rng.randrange(100)} | "
+                                 f"{2010 + job * 4} - {2014 + job * 4}")
+                    lines.extend(f"* Built services with {', '.join(rng.sample(SyntheticCorpus.SKILLS, 3))}."
+                                 for _ in range(6))
+                lines.append(f"Page {page + 1} of {pages}")
+                page_lines.append(lines)
+            SyntheticCorpus.write_text_pdf(os.path.join(self.cv_dir, f"cv_{index:04d}.pdf"), page_lines)
+
+        for index in range(role_count):
+            skills = rng.sample(SyntheticCorpus.SKILLS, 6)
+            with open(os.path.join(self.role_dir, f"role_{index:02d}.txt"), "w", encoding="utf-8") as f:
+                f.write(f"{rng.choice(SyntheticCorpus.TITLES)}\n\nRequirements:\n"
+                        + "".join(f"* Experience with {skill}.\n" for skill in skills)
+                        + "\nBenefits\nCompetitive salary and remote work.\n")
+
+    @staticmethod
+    def write_text_pdf(path, pages):
+        """Writes a PDF with one page per list of text lines, using the standard Helvetica font.
+
+        Args:
+            path (str): The path of the PDF file.
+            pages (list): The pages, each a list of ASCII text lines.
+        """
+        objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+                   "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+        kids = []
+        for lines in pages:
+            escaped = [line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in lines]
+            stream = "BT /F1 10 Tf 50 790 Td 13 TL " + " ".join(f"({line}) Tj T*" for line in escaped) + " ET"
+            objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+            objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+                           f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+            kids.append(f"{len(objects)} 0 R")
+        objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+        output, offsets = b"%PDF-1.4\n", []
+        for number, body in enumerate(objects, 1):
+            offsets.append(len(output))
+            output += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+        xref = len(output)
+        output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+        output += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+        output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+        with open(path, "wb") as f:
+            f.write(output)
+
+
+class BenchmarkHarness:
+    """
+    A harness that drives the analysis paths against a fake Gemini backend and measures them.
+
+    Every scenario runs the real pipeline (PDF extraction, compaction, prompt building, scheduling, response
+    parsing and repair) over a synthetic corpus, with the Gemini client replaced by a `FakeGeminiClient`.
+    Throughput, latency percentiles, the peak resident memory of the process and the LLM counters are
+    reported per scenario as JSON, so that results can be compared across commits.
+
+    Attributes:
+        client (FakeGeminiClient): The fake backend answering every call.
+        workers (int): The number of concurrent analyses of each scenario.
+
+    Methods:
+        run(corpus, scenarios): Runs the scenarios and returns the results.
+        compare(current, baseline, tolerance): Lists the regressions of a run against a baseline run.
+        percentile(values, fraction): Returns a percentile of a list of values, using the nearest rank.
+        peak_rss_mb(): Returns the peak resident memory of the process, in megabytes.
+        import_time(runs): Measures the import time of the CLI, and of the dependencies it defers, in fresh
+            interpreters.
+        index_latency(directory, role_texts, sizes, k, repeats, seed): Measures the query latency of the
+            embedding index against its size.
+    """
+
+    SCENARIOS = ("analyze_core", "analyze_core_async", "batch", "rank", "cli", "local", "routed")
+    DEFERRED_IMPORTS = ("google.genai", "google.genai.types", "pypdf", "pyarrow")
+
+    def __init__(self, client, workers=8):
+        """
+        Initializes the harness.
+
+        Args:
+            client (FakeGeminiClient): The fake backend answering every call.
+            workers (int): The number of concurrent analyses of each scenario.
+        """
+        self.client = client
+        self.workers = workers
+        self._backends = {}
+
+    def run(self, corpus, scenarios=SCENARIOS):
+        """Runs the scenarios against the corpus and returns the results.
+
+        Args:
+            corpus (SyntheticCorpus): The corpus to analyze.
+            scenarios (tuple): The names of the scenarios to run, among `SCENARIOS`.
+
+        Returns:
+            dict: The run metadata and the results of each scenario.
+        """
+        cv_paths = BatchRunner.discover(corpus.cv_dir, ".pdf")
+        role_paths = BatchRunner.discover(corpus.role_dir, ".txt")
+        results = {}
+        LLMClient.set_client(self.client)
+        try:
+            for name in scenarios:
+                # Each scenario starts from a cold PDF cache and a fresh scheduler with fast retries
+                with PDFProcessor._cache_lock:
+                    PDFProcessor._cache.clear()
+                LLMClient.set_scheduler(RequestScheduler(rpm=10 ** 9, tpm=10 ** 12, base_delay=0.01, max_delay=0.1))
+                counters = LLMClient.stats()
+                start = time.perf_counter()
+                self._backends = {}
+                latencies, errors = getattr(self, f"_run_{name}")(cv_paths, role_paths)
+                seconds = time.perf_counter() - start
+                after = LLMClient.stats()
+                results[name] = {
+                    **BenchmarkHarness._summarize(latencies, errors, seconds),
+                    "peak_rss_mb": BenchmarkHarness.peak_rss_mb(),
+                    "llm": {key: round(value - counters.get(key, 0), 3) if key != "speed" else value
+                            for key, value in after.items()},
+                }
+                if self._backends:
+                    results[name]["backends"] = {key: backend.stats() for key, backend in self._backends.items()}
+        finally:
+            LLMClient.set_client(None)
+            LLMClient.set_scheduler(None)
+        return {"meta": BenchmarkHarness._metadata(self), "startup": BenchmarkHarness.import_time(),
+                "scenarios": results}
+
+    @staticmethod
+    def compare(current, baseline, tolerance=0.1):
+        """Lists the regressions of a run against a baseline run.
+
+        Args:
+            current (dict): The results of the current run.
+            baseline (dict): The results of the baseline run.
+            tolerance (float): The accepted relative loss of throughput or gain of p95 latency.
+
+        Returns:
+            list: The description of each regression, empty if there is none.
+        """
+        regressions = []
+        for name, result in current["scenarios"].items():
+            before = baseline.get("scenarios", {}).get(name)
+            if not before:
+                continue
+            if result["throughput_per_second"] < before["throughput_per_second"] * (1 - tolerance):
+                regressions.append(f"{name}: throughput {before['throughput_per_second']} -> "
+                                   f"{result['throughput_per_second']} per second")
+            if result["latency_ms"]["p95"] > before["latency_ms"]["p95"] * (1 + tolerance):
+                regressions.append(f"{name}: p95 latency {before['latency_ms']['p95']} -> "
+                                   f"{result['latency_ms']['p95']} ms")
+        return regressions
+
+    @staticmethod
+    def percentile(values, fraction):
+        """Returns a percentile of a list of values, using the nearest rank.
+
+        Args:
+            values (list): The values.
+            fraction (float): The percentile, from 0.0 to 1.0.
+
+        Returns:
+            float: The percentile, or 0.0 if there are no values.
+        """
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+    @staticmethod
+    def peak_rss_mb():
+        """Returns the peak resident memory of the process so far, in megabytes.
+
+        Returns:
+            float: The peak resident memory, or None where it cannot be measured.
+        """
+        if resource is None:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)  # Bytes on macOS, KB elsewhere
+
+    @staticmethod
+    def import_time(runs=3):
+        """Measures the import time of the CLI, and of the dependencies it defers, in fresh interpreters.
+
+        Each run starts a new Python process, imports the CLI module (the cost of `--help` or a validation
+        failure), records which deferred dependencies that import already loaded, then imports the installed
+        deferred dependencies (the extra cost of the first Gemini call, PDF or Parquet export). The fastest run
+        is kept, as the others only add scheduling noise.
+
+        Args:
+            runs (int): The number of interpreters started.
+
+        Returns:
+            dict: The `cli_ms` and `deferred_ms` import times, or None where they cannot be measured, and the
+                deferred dependencies imported `eager`ly by the CLI module, which should be empty.
+        """
+        code = "\n".join([
+            "import importlib, importlib.util, json, sys, time",
+            "start = time.perf_counter()",
+            "import cv_to_role_analyzer.cv_analyzer",
+            "middle = time.perf_counter()",
+            f"names = {BenchmarkHarness.DEFERRED_IMPORTS!r}",
+            "eager = [name for name in names if name in sys.modules]",
+            "for name in names:",
+            "    if importlib.util.find_spec(name.split('.')[0]) is not None:",  # Optional extras may be missing
+            "        importlib.import_module(name)",
+            "print(json.dumps([middle - start, time.perf_counter() - middle, eager]))",
+        ])
+        timings, eager = [], []
+        for _ in range(runs):
+            try:
+                output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, timeout=60,
+                                        check=True).stdout
+                cli, deferred, eager = json.loads(output)
+                timings.append((cli * 1000, deferred * 1000))
+            except (OSError, ValueError, subprocess.SubprocessError):
+                continue
+        if not timings:
+            return {"cli_ms": None, "deferred_ms": None, "eager": None}
+        return {"cli_ms": round(min(cli for cli, _ in timings), 1),
+                "deferred_ms": round(min(deferred for _, deferred in timings), 1), "eager": eager}
+
+    @staticmethod
+    def index_latency(directory, role_texts, sizes, k=50, repeats=5, seed=0):
+        """Measures the query latency of the embedding index against its size.
+
+        One index is grown to each size in turn with random sparse unit vectors, which embed about as many
+        terms as a CV, and is then queried with each role, one role at a time and all roles in one scan.
+
+        Args:
+            directory (str): The directory to create the index in.
+            role_texts (list): The job description texts to query with.
+            sizes (list): The numbers of indexed CVs to measure.
+            k (int): The number of CVs returned per query.
+            repeats (int): The number of times each role is queried at each size.
+            seed (int): The seed of the generated vectors.
+
+        Returns:
+            dict: Whether numpy vectorized the queries, `k`, and for each size the seconds spent adding the new
+                vectors, the p50/p95 latency of single-role queries, the latency of one batched query for every
+                role, and the size of the vector file.
+        """
+        rng = random.Random(seed)
+        index = CVIndex(os.path.join(directory, "index"))
+        results = {}
+        try:
+            for size in sorted(set(sizes)):
+                start = time.perf_counter()
+                while len(index) < size:
+                    first = len(index)
+                    count = min(CVIndex.BATCH_SIZE * 8, size - first)
+                    index.add_vectors([f"cv_{first + offset:07d}" for offset in range(count)],
+                                      [BenchmarkHarness._random_vector(rng, index.dim) for _ in range(count)])
+                build_seconds = time.perf_counter() - start
+
+                latencies = []
+                for _ in range(repeats):
+                    for role_text in role_texts:
+                        start = time.perf_counter()
+                        index.query(role_text, k)
+                        latencies.append((time.perf_counter() - start) * 1000)
+                start = time.perf_counter()
+                index.query_many(role_texts, k)
+                batched = (time.perf_counter() - start) * 1000
+                results[str(size)] = {
+                    "build_seconds": round(build_seconds, 3),
+                    "query_ms": {"p50": round(BenchmarkHarness.percentile(latencies, 0.50), 2),
+                                 "p95": round(BenchmarkHarness.percentile(latencies, 0.95), 2)},
+                    "batched_query_ms": round(batched, 2),
+                    "roles": len(role_texts),
+                    "bytes": index.stats()["bytes"],
+                }
+        finally:
+            index.close()
+        return {"numpy": index.stats()["numpy"], "k": k, "sizes": results}
+
+    @staticmethod
+    def _random_vector(rng, dim, terms=48):
+        """Returns a random sparse unit vector with `terms` non-zero dimensions."""
+        vector = array("f", bytes(4 * dim))
+        weights = [rng.gauss(0.0, 1.0) for _ in range(terms)]
+        norm = math.sqrt(sum(weight * weight for weight in weights)) or 1.0
+        for bucket, weight in zip(rng.sample(range(dim), terms), weights):
+            vector[bucket] = weight / norm
+        return vector
+
+    def _run_analyze_core(self, cv_paths, role_paths, backend=None):
+        """Extracts and analyzes every CV x role pair with `analyze_core` on a thread pool."""
+        compactor = TextCompactor()
+        roles = [RoleProcessor.process(path) for path in role_paths]
+        backend = backend or GeminiBackend()
+        self._backends[backend.name] = backend
+
+        def analyze(pair):
+            cv_path, role_text = pair
+            return CVAnalyzer.analyze_core(PDFProcessor.extract_text(cv_path), role_text, compactor=compactor,
+                                           backend=backend)
+
+        return self._timed_map(analyze, [(cv_path, role) for role in roles for cv_path in cv_paths])
+
+    def _run_analyze_core_async(self, cv_paths, role_paths):
+        """Extracts and analyzes every CV x role pair with `analyze_core_async` on one event loop."""
+        compactor = TextCompactor()
+        roles = [RoleProcessor.process(path) for path in role_paths]
+        latencies, errors = [], 0
+
+        async def analyze(semaphore, cv_path, role_text):
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    cv_text = await asyncio.to_thread(PDFProcessor.extract_text, cv_path)
+                    await CVAnalyzer.analyze_core_async(cv_text, role_text, compactor=compactor)
+                    latencies.append(time.perf_counter() - start)
+                except Exception:
+                    errors += 1
+
+        async def run_all():
+            semaphore = asyncio.Semaphore(self.workers)
+            await asyncio.gather(*(analyze(semaphore, cv_path, role) for role in roles for cv_path in cv_paths))
+
+        asyncio.run(run_all())
+        return latencies, errors
+
+    def _run_batch(self, cv_paths, role_paths):
+        """Streams the CV directory through `BatchRunner`, timing each pair."""
+        compactor = TextCompactor()
+        latencies = []
+
+        def analyze(cv_text, role_text):
+            start = time.perf_counter()
+            report = CVAnalyzer.analyze_core(cv_text, role_text, compactor=compactor)
+            latencies.append(time.perf_counter() - start)
+            return report
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            runner = BatchRunner(output_dir, max_workers=self.workers, analyze=analyze)
+            manifest = runner.run(CVSource.open(os.path.dirname(cv_paths[0])),
+                                  BatchRunner.read_roles(role_paths, compactor=compactor))
+        return latencies, manifest["failed"]
+
+    def _run_local(self, cv_paths, role_paths):
+        """Extracts and analyzes every CV x role pair with the offline skill-overlap backend."""
+        return self._run_analyze_core(cv_paths, role_paths, SkillOverlapBackend())
+
+    def _run_routed(self, cv_paths, role_paths):
+        """Pre-screens every pair with the local backend and analyzes the shortlist with the fake Gemini backend."""
+        routing = RoutingBackend(SkillOverlapBackend(), GeminiBackend())
+        self._backends.update({"local": routing.prescreen, "gemini": routing.shortlist})
+        return self._run_analyze_core(cv_paths, role_paths, routing)
+
+    def _run_rank(self, cv_paths, role_paths):
+        """Ranks every CV against each role with batched requests, timing each leaderboard."""
+        cvs = {os.path.basename(path): PDFProcessor.extract_text(path) for path in cv_paths}
+        ranker = Ranker(workers=self.workers, compactor=TextCompactor(), backend="gemini")
+        latencies, errors = [], 0
+        for role_path in role_paths:
+            start = time.perf_counter()
+            leaderboard = ranker.rank_cvs_for_role(RoleProcessor.process(role_path), cvs)
+            latencies.append(time.perf_counter() - start)
+            errors += sum(1 for entry in leaderboard if entry["rank"] is None)
+        return latencies, errors
+
+    def _run_cli(self, cv_paths, role_paths):
+        """Invokes the `analyze` command in-process for each CV against the first role."""
+        runner = CliRunner()
+        with tempfile.TemporaryDirectory() as output_dir:
+            def invoke(cv_path):
+                result = runner.invoke(CVAnalyzer.cli, ["--cv", cv_path, "--role", role_paths[0], "--output-dir",
+                                                        output_dir, "--verbose", "0", "--no-cache"])
+                if result.exit_code != 0 or result.return_value not in (None, 0):
+                    raise RuntimeError(f"The analyze command failed: {result.output}")
+
+            latencies, errors = [], 0
+            for cv_path in cv_paths:  # Sequential: the CLI analyzes a single pair per invocation
+                start = time.perf_counter()
+                try:
+                    invoke(cv_path)
+                    latencies.append(time.perf_counter() - start)
+                except Exception:
+                    errors += 1
+        return latencies, errors
+
+    def _timed_map(self, function, items):
+        """Runs a function over items on a thread pool, returning the latencies and the number of errors."""
+        def timed(item):
+            start = time.perf_counter()
+            try:
+                function(item)
+                return time.perf_counter() - start
+            except Exception:
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            durations = list(executor.map(timed, items))
+        return [duration for duration in durations if duration is not None], durations.count(None)
+
+    @staticmethod
+    def _summarize(latencies, errors, seconds):
+        """Summarizes the latencies of a scenario into throughput and percentiles."""
+        milliseconds = [latency * 1000 for latency in latencies]
+        return {
+            "requests": len(latencies) + errors,
+            "errors": errors,
+            "seconds": round(seconds, 3),
+            "throughput_per_second": round(len(latencies) / seconds, 2) if seconds else 0.0,
+            "latency_ms": {
+                "p50": round(BenchmarkHarness.percentile(milliseconds, 0.50), 2),
+                "p95": round(BenchmarkHarness.percentile(milliseconds, 0.95), 2),
+                "p99": round(BenchmarkHarness.percentile(milliseconds, 0.99), 2),
+                "mean": round(sum(milliseconds) / len(milliseconds), 2) if milliseconds else 0.0,
+                "max": round(max(milliseconds), 2) if milliseconds else 0.0,
+            },
+        }
+
+    def _metadata(self):
+        """Returns the metadata identifying a run: commit, platform and backend configuration."""
+        try:
+            commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                    timeout=5).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            commit = None
+        return {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "commit": commit,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "workers": self.workers,
+            "backend": {"latency": self.client.latency, "jitter": self.client.jitter,
+                        "error_rate": self.client.error_rate, "malformed_rate": self.client.malformed_rate},
+        }
+
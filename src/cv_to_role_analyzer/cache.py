@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class ResultCache:
+    """
+    A persistent, content-addressed cache of analysis results backed by SQLite.
+
+    Entries are keyed by a SHA-256 hash of the normalized CV text, role text, model name and prompt version,
+    so resubmitting the same CV against the same role returns the stored analysis without calling the LLM.
+    Only the hash and the analysis result are stored; the CV and role texts themselves are never persisted.
+
+    Attributes:
+        path (str): The path to the SQLite database file.
+        ttl_seconds (float): The time after which an entry expires, or None to never expire.
+        max_entries (int): The maximum number of entries kept; the least recently used are evicted first.
+
+    Methods:
+        default_path(): Returns the cache location, honoring the CV_ANALYZER_CACHE environment variable.
+        key(cv_text, role_text, model, prompt_version): Computes the cache key for an analysis.
+        get(key): Returns the cached analysis for a key, or None on a miss.
+        set(key, analysis): Stores an analysis under a key and evicts entries beyond `max_entries`.
+        stats(): Returns the number of entries, hits, misses and the hit rate.
+        clear(): Removes every entry and resets the statistics.
+    """
+
+    DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+    DEFAULT_MAX_ENTRIES = 10000
+
+    def __init__(self, path=None, ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        Opens (and creates if needed) the cache database.
+
+        Args:
+            path (str, optional): The path to the SQLite database file, defaults to `default_path()`.
+            ttl_seconds (float, optional): The time after which an entry expires, or None to never expire.
+            max_entries (int, optional): The maximum number of entries kept.
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        self.path = path or ResultCache.default_path()
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, analysis TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS results_accessed_at ON results (accessed_at)")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER)")
+            self._connection.execute("INSERT OR IGNORE INTO stats VALUES ('hits', 0), ('misses', 0)")
+
+    @staticmethod
+    def default_path():
+        """Returns the cache location, honoring the CV_ANALYZER_CACHE environment variable.
+
+        Returns:
+            str: The path to the SQLite database file.
+        """
+        return os.getenv("CV_ANALYZER_CACHE") or os.path.join(
+            os.path.expanduser("~"), ".cache", "cv_analyzer", "results.sqlite3"
+        )
+
+    @staticmethod
+    def key(cv_text, role_text, model, prompt_version):
+        """Computes the cache key for an analysis.
+
+        Whitespace is collapsed before hashing, so re-extracted or re-uploaded texts that only differ in
+        spacing share the same key.
+
+        Args:
+            cv_text (str): The CV text.
+            role_text (str): The job description text.
+            model (str): The name of the model producing the analysis.
+            prompt_version (str): The version of the prompt template.
+
+        Returns:
+            str: The hexadecimal SHA-256 digest identifying the analysis.
+        """
+        digest = hashlib.sha256()
+        for value in (model, prompt_version, cv_text, role_text):
+            normalized = " ".join((value or "").split())
+            digest.update(normalized.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Returns the cached analysis for a key.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            dict: The cached analysis, or None if the key is missing or expired.
+        """
+        now = time.time()
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT analysis, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                self._connection.execute("DELETE FROM results WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self._connection.execute("UPDATE stats SET value = value + 1 WHERE name = 'misses'")
+                return None
+            self._connection.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+            self._connection.execute("UPDATE stats SET value = value + 1 WHERE name = 'hits'")
+        return json.loads(row[0])
+
+    def set(self, key, analysis):
+        """Stores an analysis and evicts the least recently used entries beyond `max_entries`.
+
+        Args:
+            key (str): The cache key.
+            analysis (dict): The analysis result to store.
+        """
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                (key, json.dumps(analysis, ensure_ascii=False), now, now)
+            )
+            self._connection.execute(
+                "DELETE FROM results WHERE key IN "
+                "(SELECT key FROM results ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def stats(self):
+        """Returns the cache statistics.
+
+        Returns:
+            dict: The number of entries, hits and misses, and the hit rate (0.0-1.0).
+        """
+        with self._lock:
+            counters = dict(self._connection.execute("SELECT name, value FROM stats").fetchall())
+            entries = self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "entries": entries,
+            "hits": counters["hits"],
+            "misses": counters["misses"],
+            "hit_rate": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+    def clear(self):
+        """Removes every entry and resets the statistics."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM results")
+            self._connection.execute("UPDATE stats SET value = 0")
+
+    def close(self):
+        """Closes the underlying database connection."""
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,206 @@
+import os
+import re
+import threading
+from collections import Counter
+
+from cv_to_role_analyzer.utils import PDFProcessor, TokenCounter
+
+
+class TextCompactor:
+    """
+    A class that shrinks CV and job description texts before they are put into a prompt.
+
+    Text extracted from PDFs carries repeated page headers and footers, page numbers, page-join whitespace,
+    contact details and boilerplate sections, none of which help the match. The compactor normalizes the
+    whitespace, removes those lines and sections, and enforces a token budget for each text, so that a long
+    CV costs a bounded number of tokens. Token counts before and after are reported for every text and
+    totaled per compactor.
+
+    Attributes:
+        cv_tokens (int): The token budget of a CV, or 0 for no limit.
+        role_tokens (int): The token budget of a job description, or 0 for no limit.
+
+    Methods:
+        from_env(): Creates a compactor from the CV_ANALYZER_CV_TOKENS and CV_ANALYZER_ROLE_TOKENS
+            environment variables.
+        compact_cv(cv_text): Compacts a CV text.
+        compact_role(role_text): Compacts a job description text.
+        compact(text, low_value, token_budget): Compacts a text, dropping the given low-value sections.
+        stats(): Returns the totals of the texts compacted so far.
+    """
+
+    # Sections that do not inform the match
+    CV_LOW_VALUE = ("references", "referees", "hobbies", "interests", "hobbies and interests", "hobbies & interests",
+                    "personal details", "personal information", "personal data", "declaration")
+    ROLE_LOW_VALUE = ("about us", "about the company", "who we are", "benefits", "perks", "what we offer",
+                      "equal opportunity", "equal opportunity employer", "how to apply", "diversity and inclusion")
+
+    # Headings that end a dropped section
+    HEADINGS = frozenset(CV_LOW_VALUE + ROLE_LOW_VALUE + (
+        "summary", "profile", "about me", "objective", "skills", "technical skills", "experience",
+        "work experience", "professional experience", "employment", "employment history", "education",
+        "projects", "certifications", "certificates", "languages", "publications", "awards", "achievements",
+        "volunteering", "courses", "training", "responsibilities", "requirements", "qualifications",
+        "preferred qualifications", "what you'll do", "what you will do", "what you bring", "nice to have",
+        "must have", "the role", "role overview", "job description",
+    ))
+
+    # A page number alone, such as "3", "- 3 -" or "Page 3 of 5", only looked for among the edge lines of a page
+    PAGE_NUMBER = re.compile(r"^[-\s|\u2013\u2014]*(?:page\s*)?\d{1,3}(?:\s*(?:/|of)\s*\d{1,3})?"
+                             r"[-\s|\u2013\u2014]*$", re.I)
+    PAGE_REFERENCE = re.compile(r"\bpage\s*\d{1,3}(?:\s*(?:/|of)\s*\d{1,3})?", re.I)
+    CONTACT = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+|\+?\(?\d{2,4}\)?[\s.-]?\d{3}[\s.-]?\d{3,4}"
+                         r"|(?:https?://|www\.|\b(?:linkedin|github)\.com/)\S*", re.I)
+    CONTACT_LABELS = re.compile(r"\b(?:e-?mail|phone|tel|mobile|cell|linkedin|github|web(?:site)?|contact)\b", re.I)
+
+    def __init__(self, cv_tokens=6000, role_tokens=1500):
+        """
+        Initializes the compactor.
+
+        Args:
+            cv_tokens (int): The token budget of a CV, or 0 for no limit.
+            role_tokens (int): The token budget of a job description, or 0 for no limit.
+        """
+        self.cv_tokens = cv_tokens
+        self.role_tokens = role_tokens
+        self._lock = threading.Lock()
+        self._totals = {"texts": 0, "tokens_before": 0, "tokens_after": 0, "truncated": 0}
+
+    @staticmethod
+    def from_env():
+        """Creates a compactor from the CV_ANALYZER_CV_TOKENS and CV_ANALYZER_ROLE_TOKENS environment variables.
+
+        Returns:
+            TextCompactor: The configured compactor.
+        """
+        return TextCompactor(
+            cv_tokens=int(os.getenv("CV_ANALYZER_CV_TOKENS", "6000")),
+            role_tokens=int(os.getenv("CV_ANALYZER_ROLE_TOKENS", "1500")),
+        )
+
+    def compact_cv(self, cv_text):
+        """Compacts a CV text, dropping contact details and sections such as references or hobbies.
+
+        Args:
+            cv_text (str): The CV text, with pages separated by form feeds.
+
+        Returns:
+            tuple: The compacted text (str) and its statistics (dict, see `compact`).
+        """
+        return self.compact(cv_text, TextCompactor.CV_LOW_VALUE, self.cv_tokens, drop_contact=True)
+
+    def compact_role(self, role_text):
+        """Compacts a job description text, dropping sections such as company presentation or benefits.
+
+        Args:
+            role_text (str): The job description text.
+
+        Returns:
+            tuple: The compacted text (str) and its statistics (dict, see `compact`).
+        """
+        return self.compact(role_text, TextCompactor.ROLE_LOW_VALUE, self.role_tokens)
+
+    def compact(self, text, low_value=(), token_budget=0, drop_contact=False):
+        """Compacts a text.
+
+        Args:
+            text (str): The text, with pages separated by form feeds.
+            low_value (tuple): The lowercase headings of the sections to drop.
+            token_budget (int): The maximum number of tokens of the result, or 0 for no limit.
+            drop_contact (bool): Whether to drop the lines holding nothing but contact details: e-mail addresses,
+                phone numbers, URLs and their labels. Lines with other words, such as a project and its link, are kept.
+
+        Returns:
+            tuple: The compacted text (str) and its statistics (dict): the estimated tokens before and after,
+                the number of removed lines, the dropped section headings, and whether the text was truncated.
+        """
+        tokens_before = TokenCounter.estimate(text)
+        pages = [[re.sub(r"[ \t\u00a0]+", " ", line).strip() for line in page.splitlines()]
+                 for page in (text or "").split(PDFProcessor.PAGE_BREAK)]
+        total_lines = sum(1 for page in pages for line in page if line)
+
+        repeated = TextCompactor._repeated_edge_lines(pages)
+        lines = []
+        for page in pages:
+            edges = TextCompactor._edges(page)
+            for position, line in enumerate(page):
+                if line and ((position in edges and (TextCompactor.PAGE_NUMBER.match(line)
+                                                     or TextCompactor._mask(line) in repeated))
+                             or (drop_contact and TextCompactor._is_contact(line))):
+                    continue
+                lines.append(line)
+        lines, dropped = TextCompactor._drop_sections(lines, low_value)
+        kept_lines = sum(1 for line in lines if line)
+        compacted = re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+        truncated = bool(token_budget) and TokenCounter.estimate(compacted) > token_budget
+        if truncated:
+            limit = token_budget * TokenCounter.CHARS_PER_TOKEN - 12
+            cut = compacted.rfind("\n", 0, limit)
+            compacted = compacted[:cut if cut > limit // 2 else limit].rstrip() + "\n[truncated]"
+
+        stats = {"tokens_before": tokens_before, "tokens_after": TokenCounter.estimate(compacted),
+                 "lines_removed": total_lines - kept_lines, "sections_dropped": dropped, "truncated": truncated}
+        with self._lock:
+            self._totals["texts"] += 1
+            self._totals["tokens_before"] += stats["tokens_before"]
+            self._totals["tokens_after"] += stats["tokens_after"]
+            self._totals["truncated"] += truncated
+        return compacted, stats
+
+    def stats(self):
+        """Returns the totals of the texts compacted so far.
+
+        Returns:
+            dict: The number of texts, the estimated tokens before and after compaction, the number of
+                truncated texts, and the overall ratio of tokens kept.
+        """
+        with self._lock:
+            totals = dict(self._totals)
+        before = totals["tokens_before"]
+        totals["ratio"] = round(totals["tokens_after"] / before, 3) if before else 1.0
+        return totals
+
+    @staticmethod
+    def _mask(line):
+        """Lowercases a line and masks its page number, so that "CV - Page 2" and "CV - Page 3" compare equal."""
+        return TextCompactor.PAGE_REFERENCE.sub("page #", line.lower())
+
+    @staticmethod
+    def _edges(page, edge=2):
+        """Returns the positions of the first and last `edge` non-empty lines of a page."""
+        positions = [position for position, line in enumerate(page) if line]
+        return set(positions[:edge] + positions[-edge:])
+
+    @staticmethod
+    def _is_contact(line):
+        """Whether a line holds contact details and no other word, such as "Email: jane@example.com | +1 555 1234"."""
+        if len(line) > 120 or not TextCompactor.CONTACT.search(line):
+            return False
+        rest = TextCompactor.CONTACT_LABELS.sub(" ", TextCompactor.CONTACT.sub(" ", line))
+        return not re.search(r"[^\W\d_]{2,}", rest)
+
+    @staticmethod
+    def _repeated_edge_lines(pages, edge=2):
+        """Returns the masked lines found among the first or last lines of at least half of 3 pages or more."""
+        if len(pages) < 3:
+            return set()
+        counts = Counter()
+        for page in pages:
+            counts.update({TextCompactor._mask(page[position]) for position in TextCompactor._edges(page, edge)})
+        return {line for line, count in counts.items() if count >= max(2, len(pages) / 2)}
+
+    @staticmethod
+    def _drop_sections(lines, low_value):
+        """Drops the sections whose heading is low-value, up to the next known heading."""
+        kept, dropped, dropping = [], [], False
+        for line in lines:
+            heading = re.sub(r"[^\w&' ]+", "", line).strip().lower() if len(line) <= 40 else ""
+            if heading in TextCompactor.HEADINGS:
+                dropping = heading in low_value
+                if dropping:
+                    dropped.append(line.strip(" :"))
+                    continue
+            if not dropping:
+                kept.append(line)
+        return kept, dropped
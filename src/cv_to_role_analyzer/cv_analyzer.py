@@ -1,11 +1,37 @@
 import json
 import os
+from functools import partial
+
 import click
+from cv_to_role_analyzer.backends import BackendRegistry
+from cv_to_role_analyzer.cache import ResultCache
+from cv_to_role_analyzer.compaction import TextCompactor
 from cv_to_role_analyzer.llm import LLMClient
 from cv_to_role_analyzer.report import AnalysisReport
+from cv_to_role_analyzer.streaming import FieldStream
+from cv_to_role_analyzer.tracing import ProfileSink, Tracer
 from cv_to_role_analyzer.utils import PDFProcessor, RoleProcessor
 
 
+class DefaultCommandGroup(click.Group):
+    """
+    A click group that falls back to a default command when no subcommand is named.
+
+    This keeps `cv-analyzer --cv <pdf> --role <txt>` working while also allowing subcommands such as
+    `cv-analyzer batch ...`.
+    """
+
+    def __init__(self, *args, default_command=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.default_command = default_command
+
+    def parse_args(self, ctx, args):
+        if args and self.default_command and args[0] not in self.commands and args[0] not in ctx.help_option_names \
+                and args[0] != "--version":
+            args = [self.default_command, *args]
+        return super().parse_args(ctx, args)
+
+
 class CVAnalyzer:
     """
     A class for analyzing CVs against job descriptions.
@@ -16,35 +42,325 @@ class CVAnalyzer:
     orchestrating the application's overall process.
 
     Methods:
-        analyze_core(cv_text, role_text):
+        analyze_core(cv_text, role_text, cache, refresh, compactor):
             Performs the core analysis of a CV against a job description and returns a JSON report.
 
-        analyze_cli(cv, role, output_dir, verbose):
+        analyze_core_async(cv_text, role_text, cache, refresh, timeout, compactor):
+            Asynchronous counterpart of `analyze_core`, allowing many analyses to run on one event loop.
+
+        analyze_revision(candidate_id, cv_text, role_text, versions, compactor, backend):
+            Analyzes a revised CV, reusing or updating the analysis of the candidate's previous version.
+
+        analyze_cli(cv, role, output_dir, verbose, no_cache, refresh, cv_tokens, role_tokens, profile, trace):
             Command-line interface for analyzing CVs, processing input files, and generating reports.
             This function orchestrates the application's workflow, handling file extraction, analysis,
             and output generation.
+
+        batch_cli(cvs, roles, output_dir, workers, ..., profile, trace):
+            Command-line interface for analyzing every CV of a corpus against every job role in a directory.
+
+        rank_cli(role, cvs, cv, roles, output_dir, ..., profile, trace):
+            Command-line interface for ranking many CVs against one role, or many roles against one CV.
+
+        benchmark_cli(cvs, roles, pages, workers, latency, ...):
+            Command-line interface for measuring the analysis paths against a fake LLM backend.
+
+        cache_cli(clear):
+            Command-line interface for showing the result cache statistics or clearing the cache.
+
+        index_cli():
+            Command group maintaining the candidate embedding index (`add`, `delete`, `rebuild`, `stats`) and
+            shortlisting the best indexed CVs for new roles (`query`).
+
+        versions_cli(candidate):
+            Command-line interface for showing a candidate's CV versions, or the calls avoided by reusing analyses.
+
+        serve_cli(host, port, workers, max_queue, no_cache):
+            Command-line interface for running the long-lived HTTP analysis service.
+
+        daemon_cli(socket_path, workers, no_cache):
+            Command-line interface for running the warm local worker used by `analyze --daemon`.
     """
     @staticmethod
-    def analyze_core(cv_text, role_text):
+    def analyze_core(cv_text, role_text, cache=None, refresh=False, compactor=None, on_field=None, backend=None):
         """
         Analyzes a CV against a job description (core logic).
 
         This function uses the LLMClient to analyze the match between the
         provided CV and job role text. The result is converted into a JSON
-        string format through the AnalysisReport.
+        string format through the AnalysisReport. When a cache is given, a
+        previous analysis of the same texts is returned without calling the LLM;
+        only complete analyses are cached. When `on_field` is given, the model's answer is streamed and each field
+        is passed to it as soon as it is parsed (a cached analysis is replayed).
+        The analysis is produced by the named backend, or the default one.
+
+        Args:
+            cv_text (str): The text extracted from the CV.
+            role_text (str or PreparedRole): The text describing the job role, or a role prepared once
+                for many CVs.
+            cache (ResultCache, optional): The result cache to read from and write to.
+            refresh (bool): Whether to ignore a cached result and store a fresh analysis.
+            compactor (TextCompactor, optional): The compactor shrinking the texts to their token budgets.
+            on_field (callable, optional): Called with each FieldEvent of a streamed analysis.
+            backend (str or Backend, optional): The analysis backend, defaults to `BackendRegistry.get()`.
+
+        Returns:
+            str: A JSON string containing the analysis report.
+        """
+        backend = BackendRegistry.get(backend)
+        analyze_match = backend.analyze_match if on_field is None else \
+            partial(backend.analyze_match_stream, on_field=on_field)
+        with Tracer.span("analysis"):
+            cv_text, role_text = CVAnalyzer._compact(cv_text, role_text, compactor)
+            if cache is None:
+                analysis = analyze_match(cv_text, role_text)
+            else:
+                key = CVAnalyzer._cache_key(cv_text, role_text, backend)
+                analysis = CVAnalyzer._cache_lookup(cache, key, refresh)
+                if analysis is None:
+                    analysis = analyze_match(cv_text, role_text)
+                    if CVAnalyzer._cacheable(analysis):
+                        cache.set(key, analysis)
+                elif on_field is not None:
+                    for event in FieldStream().finish(analysis):
+                        on_field(event)
+            with Tracer.span("report.serialize"):
+                return AnalysisReport(analysis).to_json()  # Return JSON string
+
+    @staticmethod
+    async def analyze_core_async(cv_text, role_text, cache=None, refresh=False, timeout=None, compactor=None,
+                                 backend=None):
+        """
+        Analyzes a CV against a job description asynchronously (core logic).
+
+        This is the asyncio-native counterpart of `analyze_core`. It awaits the backend through
+        `analyze_match_async`, so the network latency of many analyses can overlap on a single
+        event loop without threads.
 
         Args:
             cv_text (str): The text extracted from the CV.
-            role_text (str): The text describing the job role.
+            role_text (str or PreparedRole): The text describing the job role, or a role prepared once
+                for many CVs.
+            cache (ResultCache, optional): The result cache to read from and write to.
+            refresh (bool): Whether to ignore a cached result and store a fresh analysis.
+            timeout (float, optional): The maximum number of seconds to wait for each LLM call.
+            compactor (TextCompactor, optional): The compactor shrinking the texts to their token budgets.
+            backend (str or Backend, optional): The analysis backend, defaults to `BackendRegistry.get()`.
 
         Returns:
             str: A JSON string containing the analysis report.
         """
-        analysis = LLMClient.analyze_match(cv_text, role_text)
-        return AnalysisReport(analysis).to_json()  # Return JSON string
+        import asyncio
+
+        backend = BackendRegistry.get(backend)
+        with Tracer.span("analysis"):
+            cv_text, role_text = CVAnalyzer._compact(cv_text, role_text, compactor)
+            if cache is None:
+                analysis = await backend.analyze_match_async(cv_text, role_text, timeout=timeout)
+            else:
+                # The cache is a SQLite database: its reads and writes run off the event loop
+                key = CVAnalyzer._cache_key(cv_text, role_text, backend)
+                analysis = await asyncio.to_thread(CVAnalyzer._cache_lookup, cache, key, refresh)
+                if analysis is None:
+                    analysis = await backend.analyze_match_async(cv_text, role_text, timeout=timeout)
+                    if CVAnalyzer._cacheable(analysis):
+                        await asyncio.to_thread(cache.set, key, analysis)
+            with Tracer.span("report.serialize"):
+                return AnalysisReport(analysis).to_json()
+
+    @staticmethod
+    def analyze_revision(candidate_id, cv_text, role_text, versions, compactor=None, backend=None):
+        """
+        Analyzes a candidate's CV against a job description, reusing the analysis of its previous version.
+
+        The CV is recorded as a new version of the candidate's CV in the version store and compared, section
+        by section, with the version last analyzed against the same role and backend. Without real changes
+        the stored analysis is returned without any call; with changes, the backend updates the stored
+        analysis from the revised sections only; without a stored analysis, the CV is analyzed in full.
+
+        Args:
+            candidate_id (str): The identifier of the candidate.
+            cv_text (str): The text extracted from the CV.
+            role_text (str or PreparedRole): The text describing the job role, or a role prepared once for many
+                CVs.
+            versions (CVVersionStore): The store of CV versions and of their analyses.
+            compactor (TextCompactor, optional): The compactor shrinking the texts to their token budgets.
+            backend (str or Backend, optional): The analysis backend, defaults to `BackendRegistry.get()`.
+
+        Returns:
+            tuple: The JSON string of the analysis report, and the revision details: the `outcome` (`new`,
+                `reused` or `revised`), the CV `version`, the `base_version` compared against, and the
+                `added`, `changed` and `removed` section names.
+        """
+        backend = BackendRegistry.get(backend)
+        with Tracer.span("analysis"):
+            cv_text, role_text = CVAnalyzer._compact(cv_text, role_text, compactor)
+            role_key = CVAnalyzer._cache_key("", role_text, backend)
+            with Tracer.span("versions.diff"):
+                current = versions.add_version(candidate_id, cv_text)
+                stored = versions.report(candidate_id, role_key)
+                base = versions.version(candidate_id, stored["version"]) if stored else None
+                diff = versions.diff(base["sections"], current["sections"]) if base else {}
+            revision = {"outcome": "new", "version": current["version"],
+                        "base_version": base["version"] if base else None, **diff}
+
+            if base is None:
+                analysis = backend.analyze_match(cv_text, role_text)
+            elif not any(diff.values()):
+                revision["outcome"] = "reused"
+                analysis = stored["report"]
+                Tracer.count("revision_calls_avoided")
+            else:
+                revision["outcome"] = "revised"
+                sections = versions.sections(cv_text)
+                revised = {name: sections[name] for name in diff["added"] + diff["changed"]}
+                analysis = backend.reanalyze_match(cv_text, role_text, stored["report"], revised, diff["removed"])
+            if analysis:
+                versions.save_report(candidate_id, role_key, current["version"], analysis, revision["outcome"])
+            with Tracer.span("report.serialize"):
+                return AnalysisReport(analysis).to_json(), revision
+
+    @staticmethod
+    def _compact(cv_text, role_text, compactor):
+        """Compacts the CV text and, unless it was prepared already, the job description text."""
+        if compactor is None:
+            return cv_text, role_text
+        with Tracer.span("text.compact") as span:
+            cv_text, stats = compactor.compact_cv(cv_text)
+            span.set(cv_tokens_before=stats["tokens_before"], cv_tokens_after=stats["tokens_after"])
+            if isinstance(role_text, str):
+                role_text = compactor.compact_role(role_text)[0]
+        return cv_text, role_text
+
+    @staticmethod
+    def _cache_key(cv_text, role_text, backend):
+        """Returns the result cache key of a CV and job description pair analyzed by a backend."""
+        return ResultCache.key(cv_text, getattr(role_text, "text", role_text), backend.model, backend.version)
+
+    @staticmethod
+    def _cache_lookup(cache, key, refresh):
+        """Returns the cached analysis of a key, or None on a miss or when refreshing, and counts the outcome."""
+        if refresh:
+            return None
+        with Tracer.span("cache.lookup"):
+            analysis = cache.get(key)
+        Tracer.count("result_cache_hits" if analysis is not None else "result_cache_misses")
+        return analysis
+
+    @staticmethod
+    def _cacheable(analysis):
+        """Whether an analysis has every required field; a partial one is not served from the cache for its TTL."""
+        return bool(analysis) and not AnalysisReport.normalize(analysis)[1]
 
     @staticmethod
-    @click.command()
+    def _analyze_candidate(candidate, cv_text, role_text, compactor, backend, verbose, on_field=None):
+        """
+        Analyzes a new version of a candidate's CV with `analyze_revision` and reports what was re-analyzed.
+
+        Args:
+            candidate (str): The identifier of the candidate.
+            cv_text (str): The text extracted from the CV.
+            role_text (str): The job description text.
+            compactor (TextCompactor): The compactor shrinking the texts to their token budgets.
+            backend (str): The name of the analysis backend, or None for the default one.
+            verbose (int): The verbosity level; the revision is reported above 0, the store statistics at 2.
+            on_field (callable, optional): Called with each field of the analysis once it is complete.
+
+        Returns:
+            str: The JSON string of the analysis report.
+        """
+        from cv_to_role_analyzer.versions import CVVersionStore
+
+        versions = CVVersionStore()
+        try:
+            json_report, revision = CVAnalyzer.analyze_revision(candidate, cv_text, role_text, versions,
+                                                                compactor=compactor, backend=backend)
+            if on_field is not None and verbose > 0:
+                for event in FieldStream().finish(json.loads(json_report)):
+                    on_field(event)
+            if verbose > 0:
+                if revision["outcome"] == "reused":
+                    click.echo(f"Version {revision['version']} of {candidate}: unchanged since version "
+                               f"{revision['base_version']}, previous analysis reused (1 call avoided).")
+                elif revision["outcome"] == "revised":
+                    sections = ", ".join(revision["added"] + revision["changed"] + revision["removed"])
+                    click.echo(f"Version {revision['version']} of {candidate}: re-analyzed the sections changed "
+                               f"since version {revision['base_version']} ({sections}).")
+                else:
+                    click.echo(f"Version {revision['version']} of {candidate}: analyzed in full.")
+            if verbose == 2:
+                click.echo(f"Versions: {versions.stats()}")
+        finally:
+            versions.close()
+        return json_report
+
+    @staticmethod
+    def _analyze_in_daemon(path, cv, role, verbose, **options):
+        """
+        Hands an analysis to the warm worker listening on a Unix socket.
+
+        Missing input files are left to the local path, which reports them, and a worker that is not running
+        falls back to a local analysis.
+
+        Args:
+            path (str): The path to the worker's socket.
+            cv (str): The path to the CV PDF file.
+            role (str): The path to the job role text file.
+            verbose (int): The verbosity level; a fallback is reported above 0.
+            **options: The analysis options forwarded to the worker.
+
+        Returns:
+            dict: The worker's response (`report`, `tokens` and `backends`), or None to analyze locally.
+        """
+        from cv_to_role_analyzer.daemon import DaemonClient, DaemonUnavailableError
+
+        if not (os.path.isfile(cv) and os.path.isfile(role)):
+            return None
+        with Tracer.span("daemon.request"):
+            try:
+                return DaemonClient(path).analyze(cv, role, **options)
+            except DaemonUnavailableError as e:
+                if verbose > 0:
+                    click.echo(f"{e}. Analyzing locally.", err=True)
+                return None
+
+    @staticmethod
+    def _start_tracing(profile, trace):
+        """
+        Registers the trace sinks requested on the command line for the duration of the current command.
+
+        The sinks are closed, and the per-stage breakdown printed if requested, when the command ends.
+
+        Args:
+            profile (bool): Whether to print a per-stage breakdown when the command ends.
+            trace (tuple): The sink specifications (`log`, `prometheus:<path>` or `otel:<path>`).
+        """
+        sinks = [Tracer.sink_from_spec(spec) for spec in trace]
+        profiler = ProfileSink() if profile else None
+        for sink in filter(None, [*sinks, profiler]):
+            Tracer.add_sink(sink)
+
+        def finish():
+            for sink in filter(None, [*sinks, profiler]):
+                Tracer.remove_sink(sink)
+                sink.close()
+            if profiler:
+                click.echo(profiler.report())
+
+        click.get_current_context().call_on_close(finish)
+
+    @staticmethod
+    @click.group(cls=DefaultCommandGroup, default_command="analyze")
+    @click.version_option("1.0")
+    def cli():
+        """
+        CV Analyzer: Analyzes CVs against job roles.
+
+        Runs the `analyze` command by default, so `cv-analyzer --cv <pdf> --role <txt>` analyzes a single pair.
+        """
+
+    @staticmethod
+    @click.command(name="analyze")
     @click.option(
         "--cv", required=True, help="Path to the CV PDF file."
     )
@@ -58,8 +374,52 @@ class CVAnalyzer:
         "--verbose", type=click.IntRange(0, 2), default=1,
         help="Verbosity level (0: silent, 1: summary, 2: full JSON)."
     )
+    @click.option(
+        "--no-cache", is_flag=True, help="Do not read or write the result cache."
+    )
+    @click.option(
+        "--refresh", is_flag=True, help="Ignore cached results and store fresh analyses."
+    )
+    @click.option(
+        "--cv-tokens", type=click.IntRange(0), default=6000,
+        help="Token budget of each CV after compaction (0: no limit)."
+    )
+    @click.option(
+        "--role-tokens", type=click.IntRange(0), default=1500,
+        help="Token budget of each job description after compaction (0: no limit)."
+    )
+    @click.option(
+        "--profile", is_flag=True, help="Print a per-stage timing breakdown when done."
+    )
+    @click.option(
+        "--trace", multiple=True,
+        help="Trace sink (repeatable): log, prometheus:<path> or otel:<path> for OpenTelemetry JSON lines."
+    )
+    @click.option(
+        "--stream", is_flag=True, help="Print each field of the analysis as soon as the model produces it."
+    )
+    @click.option(
+        "--backend", default=None,
+        help="Analysis backend: gemini, local (offline skill-overlap scorer) or routed (local pre-screening, "
+             "Gemini for the shortlist). Defaults to CV_ANALYZER_BACKEND or gemini."
+    )
+    @click.option(
+        "--results-format", type=click.Choice(["files", "jsonl"]), default="files",
+        help="Write each result to its own JSON file, or append compact lines to results.jsonl in the output directory."
+    )
+    @click.option(
+        "--daemon", default=None, envvar="CV_ANALYZER_DAEMON",
+        help="Hand the analysis to the warm worker listening on this Unix socket (see `cv-analyzer daemon`), "
+             "analyzing locally if none is running. Defaults to CV_ANALYZER_DAEMON."
+    )
+    @click.option(
+        "--candidate", default=None,
+        help="Keep this CV as the latest version of the candidate's CV, and only re-analyze the sections revised "
+             "since the version last analyzed against the role."
+    )
     @click.version_option("1.0")
-    def analyze_cli(cv, role, output_dir, verbose):
+    def analyze_cli(cv, role, output_dir, verbose, no_cache, refresh, cv_tokens, role_tokens, profile, trace,
+                    stream, backend, results_format, daemon, candidate):
         """
         CV Analyzer: Analyzes CVs against job roles (CLI entry point).
 
@@ -72,25 +432,77 @@ class CVAnalyzer:
             role (str): The path to the job role text file.
             output_dir (str, optional): The directory to save the output report.
             verbose (int): The verbosity level of the output.
+            no_cache (bool): Whether to bypass the result cache.
+            refresh (bool): Whether to ignore a cached result and store a fresh analysis.
+            cv_tokens (int): The token budget of the CV after compaction, or 0 for no limit.
+            role_tokens (int): The token budget of the job description after compaction, or 0 for no limit.
+            profile (bool): Whether to print a per-stage timing breakdown.
+            trace (tuple): The trace sink specifications.
+            stream (bool): Whether to stream the analysis, printing each field and the time to the first one.
+            backend (str): The name of the analysis backend, or None for the default one.
+            results_format (str): `files` to overwrite `analysis_result.json`, or `jsonl` to append the result to
+                `results.jsonl`.
+            daemon (str): The path to the socket of a warm worker, or None to analyze in this process. Streamed
+                analyses always run in this process.
+            candidate (str): The identifier of the candidate whose CV versions are kept, or None to analyze the
+                CV on its own.
         """
+        first_field = []
+
+        def print_field(event):
+            if event.field == "report":
+                click.echo(f"Time to first field: {first_field[0] if first_field else event.elapsed:.2f}s, "
+                           f"total: {event.elapsed:.2f}s")
+                return
+            first_field.append(event.elapsed)
+            value = f"[{event.value['category']}] {event.value['gap']}" if event.field == "skill_gap" else event.value
+            click.echo(f"{event.field}: {value}")
+
         try:
-            role_text = RoleProcessor.process(role)
-            cv_text = PDFProcessor.extract_text(cv)
-            if not role_text or not cv_text:
-                return 1
+            CVAnalyzer._start_tracing(profile, trace)
+            response = None
+            if daemon and not stream and not candidate:
+                response = CVAnalyzer._analyze_in_daemon(daemon, cv, role, verbose, no_cache=no_cache, refresh=refresh,
+                                                         cv_tokens=cv_tokens, role_tokens=role_tokens, backend=backend)
+            if response is None:
+                role_text = RoleProcessor.process(role)
+                cv_text = PDFProcessor.extract_text(cv)
+                if not role_text or not cv_text:
+                    return 1
 
-            json_report = CVAnalyzer.analyze_core(cv_text, role_text)  # Call core logic
+                cache = None if no_cache else ResultCache()
+                compactor = TextCompactor(cv_tokens=cv_tokens, role_tokens=role_tokens)
+                if candidate:
+                    json_report = CVAnalyzer._analyze_candidate(candidate, cv_text, role_text, compactor, backend,
+                                                                verbose, print_field if stream else None)
+                else:
+                    json_report = CVAnalyzer.analyze_core(
+                        cv_text, role_text, cache=cache, refresh=refresh, compactor=compactor,
+                        on_field=print_field if stream and verbose > 0 else None, backend=backend,
+                    )  # Call core logic
+                response = {"report": json_report, "tokens": compactor.stats(), "backends": BackendRegistry.stats()}
+            json_report = response["report"]
 
             if output_dir:
                 if os.path.isfile(output_dir):
                     click.echo(f"Error: {output_dir} is a file, not a directory.", err=True)
                     return 1  # Return error code 1
                 os.makedirs(output_dir, exist_ok=True)
-                output_path = os.path.join(output_dir, "analysis_result.json")
-                with open(output_path, "w", encoding="utf-8") as f:
-                    f.write(json_report)
+                if results_format == "jsonl":
+                    from cv_to_role_analyzer.results import ResultSink
+
+                    sink = ResultSink(os.path.join(output_dir, ResultSink.DEFAULT_NAME))
+                    sink.append(os.path.basename(cv), os.path.basename(role), json_report)
+                    output_path = sink.path
+                else:
+                    output_path = os.path.join(output_dir, "analysis_result.json")
+                    with open(output_path, "w", encoding="utf-8") as f:
+                        f.write(json_report)
                 click.echo(f"Analysis saved to {output_path}")
 
+            if verbose == 2:
+                click.echo(f"Tokens: {response['tokens']}")
+                click.echo(f"Backends: {response['backends']}")
             if verbose > 0:
                 click.echo(json_report if verbose == 2 else "Analysis completed successfully!")
 
@@ -124,3 +536,941 @@ class CVAnalyzer:
             return 1
 
         return 0  # Return success
+
+    @staticmethod
+    @click.command(name="batch")
+    @click.option(
+        "--cvs", required=True,
+        help="Path to a directory of CV files (.pdf/.txt), a .zip archive of them, or a .jsonl file of CV records."
+    )
+    @click.option(
+        "--roles", required=True, help="Path to a directory of job role text files."
+    )
+    @click.option(
+        "--output-dir", default="analysis_results", help="Path to the output directory (optional)."
+    )
+    @click.option(
+        "--workers", type=click.IntRange(1, 64), default=4,
+        help="Maximum number of analyses running concurrently."
+    )
+    @click.option(
+        "--pdf-workers", type=click.IntRange(1, 64), default=1,
+        help="Number of worker processes used to extract the pages of large CVs."
+    )
+    @click.option(
+        "--min-score", type=click.FloatRange(0.0, 1.0), default=None,
+        help="Skip pairs whose local keyword score is below this value (0.0-1.0)."
+    )
+    @click.option(
+        "--top-k", type=click.IntRange(1), default=None,
+        help="Only analyze the K CVs with the best local keyword score for each role."
+    )
+    @click.option(
+        "--context-cache", is_flag=True,
+        help="Store each role's prompt prefix in the provider's context cache for the duration of the batch."
+    )
+    @click.option(
+        "--verbose", type=click.IntRange(0, 2), default=1,
+        help="Verbosity level (0: silent, 1: summary, 2: per-pair status)."
+    )
+    @click.option(
+        "--no-cache", is_flag=True, help="Do not read or write the result cache."
+    )
+    @click.option(
+        "--refresh", is_flag=True, help="Ignore cached results and store fresh analyses."
+    )
+    @click.option(
+        "--cv-tokens", type=click.IntRange(0), default=6000,
+        help="Token budget of each CV after compaction (0: no limit)."
+    )
+    @click.option(
+        "--role-tokens", type=click.IntRange(0), default=1500,
+        help="Token budget of each job description after compaction (0: no limit)."
+    )
+    @click.option(
+        "--profile", is_flag=True, help="Print a per-stage timing breakdown when done."
+    )
+    @click.option(
+        "--trace", multiple=True,
+        help="Trace sink (repeatable): log, prometheus:<path> or otel:<path> for OpenTelemetry JSON lines."
+    )
+    @click.option(
+        "--job", default=None,
+        help="Name of a resumable job: progress is checkpointed, and rerunning the job skips the finished pairs."
+    )
+    @click.option(
+        "--backend", default=None,
+        help="Analysis backend: gemini, local (offline skill-overlap scorer) or routed (local pre-screening, "
+             "Gemini for the shortlist). Defaults to CV_ANALYZER_BACKEND or gemini."
+    )
+    @click.option(
+        "--results-format", type=click.Choice(["files", "jsonl"]), default="files",
+        help="Write each result to its own JSON file, or append compact lines to results.jsonl in the output directory."
+    )
+    def batch_cli(cvs, roles, output_dir, workers, pdf_workers, min_score, top_k, context_cache, verbose, no_cache,
+                  refresh, cv_tokens, role_tokens, profile, trace, job, backend, results_format):
+        """
+        CV Analyzer: Analyzes every CV against every job role (batch CLI entry point).
+
+        CVs are streamed from a directory, a ZIP archive or a JSONL file of `{"id", "text"}` records, and
+        every CV x role pair is analyzed on a bounded worker pool. One result file is written per pair,
+        named `<cv>__<role>.json`, together with a `manifest.json` summary. A failed pair is recorded in
+        the manifest and does not abort the rest of the batch.
+
+        Args:
+            cvs (str): The path to the directory, ZIP archive or JSONL file of CVs.
+            roles (str): The path to the directory of job role text files.
+            output_dir (str): The directory to save the result files and manifest.
+            workers (int): The maximum number of concurrent analyses.
+            pdf_workers (int): The number of worker processes used to extract the pages of large CVs.
+            min_score (float): The local keyword score below which a pair is not sent to the LLM.
+            top_k (int): The number of best-scoring CVs sent to the LLM for each role.
+            context_cache (bool): Whether to store each role's prompt prefix in the provider's context cache.
+            verbose (int): The verbosity level of the output.
+            no_cache (bool): Whether to bypass the result cache.
+            refresh (bool): Whether to ignore cached results and store fresh analyses.
+            cv_tokens (int): The token budget of each CV after compaction, or 0 for no limit.
+            role_tokens (int): The token budget of each job description after compaction, or 0 for no limit.
+            profile (bool): Whether to print a per-stage timing breakdown.
+            trace (tuple): The trace sink specifications.
+            job (str): The name of the job under which progress is checkpointed in the job store, or None.
+            backend (str): The name of the analysis backend, or None for the default one.
+            results_format (str): `files` for one result file per pair, or `jsonl` to append every result to
+                `results.jsonl`.
+        """
+        from cv_to_role_analyzer.batch import BatchRunner
+        from cv_to_role_analyzer.ingestion import CVSource
+        from cv_to_role_analyzer.jobs import JobRunner, JobStore
+        from cv_to_role_analyzer.results import ResultSink
+
+        store = None
+        try:
+            CVAnalyzer._start_tracing(profile, trace)
+            if os.path.isfile(output_dir):
+                click.echo(f"Error: {output_dir} is a file, not a directory.", err=True)
+                click.get_current_context().exit(1)
+            records = CVSource.open(cvs, workers=pdf_workers)
+            role_paths = BatchRunner.discover(roles, ".txt")
+            if not role_paths:
+                click.echo("Error: No job role (.txt) files were found.", err=True)
+                click.get_current_context().exit(1)
+
+            cache = None if no_cache else ResultCache()
+            compactor = TextCompactor(cv_tokens=cv_tokens, role_tokens=role_tokens)
+            analyze = partial(CVAnalyzer.analyze_core, cache=cache, refresh=refresh, compactor=compactor,
+                              backend=BackendRegistry.get(backend))
+            sink = ResultSink(os.path.join(output_dir, ResultSink.DEFAULT_NAME)) if results_format == "jsonl" else None
+            if job:
+                store = JobStore()
+                store.save_job(job, {
+                    "cvs": os.path.abspath(cvs), "roles": os.path.abspath(roles),
+                    "output_dir": os.path.abspath(output_dir), "pdf_workers": pdf_workers,
+                    "cv_tokens": cv_tokens, "role_tokens": role_tokens, "backend": backend,
+                    "results_format": results_format,
+                })
+                runner = JobRunner(store, job, output_dir, max_workers=workers, analyze=analyze, min_score=min_score,
+                                   top_k=top_k, sink=sink)
+            else:
+                runner = BatchRunner(output_dir, max_workers=workers, analyze=analyze, min_score=min_score,
+                                     top_k=top_k, sink=sink)
+            prepared_roles = BatchRunner.read_roles(role_paths, compactor=compactor)
+            if context_cache:
+                for role in filter(None, prepared_roles.values()):
+                    role.enable_context_cache()
+            try:
+                manifest = runner.run(records, prepared_roles)
+            finally:
+                for role in filter(None, prepared_roles.values()):
+                    role.release_context_cache()
+
+            if verbose == 2:
+                for entry in manifest["results"]:
+                    click.echo(f"[{entry['status']}] {entry['cv']} x {entry['role']}"
+                               + (f": {entry['error']}" if entry["status"] == "failed" else ""))
+            if verbose == 2:
+                click.echo(f"LLM calls: {LLMClient.stats()}")
+                click.echo(f"Backends: {BackendRegistry.stats()}")
+                click.echo(f"Tokens: {compactor.stats()}")
+                if cache is not None:
+                    click.echo(f"Cache: {cache.stats()}")
+            if verbose > 0:
+                click.echo(f"Batch completed: {manifest['succeeded']} succeeded, {manifest['filtered']} filtered, "
+                           f"{manifest['failed']} failed. "
+                           f"Manifest saved to {os.path.join(output_dir, BatchRunner.MANIFEST_NAME)}")
+
+        except (FileNotFoundError, NotADirectoryError) as e:
+            click.echo(f"Error: {e}", err=True)
+            click.get_current_context().exit(1)
+        except ValueError as e:
+            click.echo(f"Invalid input error: {e}", err=True)
+            click.get_current_context().exit(1)
+        except PermissionError as e:
+            click.echo(f"Permission error: {e}", err=True)
+            click.echo("You do not have permission to read the input or write to the output directory.", err=True)
+            click.get_current_context().exit(1)
+        except OSError as e:
+            click.echo(f"OS error: {e}", err=True)
+            click.echo("There was an error when creating the output directory.", err=True)
+            click.get_current_context().exit(1)
+        finally:
+            if store is not None:
+                store.close()
+
+        if manifest["failed"]:
+            click.get_current_context().exit(1)  # Lets scripts and CI jobs detect a partially failed batch
+        return 0
+
+    @staticmethod
+    @click.command(name="rank")
+    @click.option(
+        "--role", default=None, help="Path to the job role text file to rank the CVs of --cvs against."
+    )
+    @click.option(
+        "--cvs", default=None,
+        help="Path to a directory of CV files (.pdf/.txt), a .zip archive of them, or a .jsonl file of CV records."
+    )
+    @click.option(
+        "--cv", default=None, help="Path to the CV PDF file to rank the roles of --roles against."
+    )
+    @click.option(
+        "--roles", default=None, help="Path to a directory of job role text files."
+    )
+    @click.option(
+        "--output-dir", default="analysis_results", help="Path to the output directory (optional)."
+    )
+    @click.option(
+        "--token-budget", type=click.IntRange(1000), default=30_000,
+        help="Maximum estimated number of prompt tokens packed into one request."
+    )
+    @click.option(
+        "--workers", type=click.IntRange(1, 64), default=4,
+        help="Maximum number of requests running concurrently."
+    )
+    @click.option(
+        "--verbose", type=click.IntRange(0, 2), default=1,
+        help="Verbosity level (0: silent, 1: summary, 2: full leaderboard)."
+    )
+    @click.option(
+        "--profile", is_flag=True, help="Print a per-stage timing breakdown when done."
+    )
+    @click.option(
+        "--trace", multiple=True,
+        help="Trace sink (repeatable): log, prometheus:<path> or otel:<path> for OpenTelemetry JSON lines."
+    )
+    @click.option(
+        "--backend", default=None,
+        help="Analysis backend: gemini (pairs packed into batched requests), local (each pair scored offline) or "
+             "routed (local pre-screening, shortlist packed for Gemini). Defaults to CV_ANALYZER_BACKEND or gemini."
+    )
+    def rank_cli(role, cvs, cv, roles, output_dir, token_budget, workers, verbose, profile, trace, backend):
+        """
+        CV Analyzer: Ranks many CVs against one role, or many roles against one CV (ranking CLI entry point).
+
+        With Gemini, several pairs are packed into each LLM request, up to the token budget, and the reports
+        are sorted into a leaderboard saved as `leaderboard.json`. Use either `--role` with `--cvs`, or `--cv`
+        with `--roles`.
+
+        Args:
+            role (str): The path to the job role text file to rank the CVs against.
+            cvs (str): The path to the directory, ZIP archive or JSONL file of CVs.
+            cv (str): The path to the CV PDF file to rank the roles against.
+            roles (str): The path to the directory of job role text files.
+            output_dir (str): The directory to save the leaderboard.
+            token_budget (int): The maximum estimated number of prompt tokens per request.
+            workers (int): The maximum number of concurrent requests.
+            verbose (int): The verbosity level of the output.
+            profile (bool): Whether to print a per-stage timing breakdown.
+            trace (tuple): The trace sink specifications.
+            backend (str): The name of the analysis backend, or None for the default one.
+        """
+        from cv_to_role_analyzer.batch import BatchRunner
+        from cv_to_role_analyzer.ingestion import CVSource
+        from cv_to_role_analyzer.ranking import Ranker
+
+        try:
+            CVAnalyzer._start_tracing(profile, trace)
+            if os.path.isfile(output_dir):
+                click.echo(f"Error: {output_dir} is a file, not a directory.", err=True)
+                click.get_current_context().exit(1)
+            ranker = Ranker(token_budget=token_budget, workers=workers, compactor=TextCompactor.from_env(),
+                            backend=backend)
+            if role and cvs and not (cv or roles):
+                role_text = RoleProcessor.process(role)
+                if not role_text:
+                    click.get_current_context().exit(1)
+                leaderboard = ranker.rank_cvs_for_role(
+                    role_text, {cv_id: text for cv_id, text in CVSource.open(cvs) if text}
+                )
+            elif cv and roles and not (role or cvs):
+                cv_text = PDFProcessor.extract_text(cv)
+                if not cv_text:
+                    click.get_current_context().exit(1)
+                role_paths = BatchRunner.discover(roles, ".txt")
+                role_texts = {os.path.basename(path): RoleProcessor.process(path) for path in role_paths}
+                leaderboard = ranker.rank_roles_for_cv(
+                    cv_text, {role_id: text for role_id, text in role_texts.items() if text}
+                )
+            else:
+                click.echo("Error: Use either --role with --cvs, or --cv with --roles.", err=True)
+                click.get_current_context().exit(1)
+
+            os.makedirs(output_dir, exist_ok=True)
+            output_path = os.path.join(output_dir, "leaderboard.json")
+            with open(output_path, "w", encoding="utf-8") as f:
+                json.dump(leaderboard, f, indent=4, ensure_ascii=False)
+
+            if verbose == 2:
+                for entry in leaderboard:
+                    click.echo(f"{entry['rank'] or '-':>3}. {entry['id']}: "
+                               + (f"{entry['match_score']}" if entry["rank"] else f"failed: {entry['error']}"))
+            if verbose > 0:
+                click.echo(f"Ranking completed: {sum(1 for entry in leaderboard if entry['rank'])} ranked, "
+                           f"{sum(1 for entry in leaderboard if not entry['rank'])} failed. "
+                           f"Leaderboard saved to {output_path}")
+
+        except (FileNotFoundError, NotADirectoryError) as e:
+            click.echo(f"Error: {e}", err=True)
+            click.get_current_context().exit(1)
+        except ValueError as e:
+            click.echo(f"Invalid input error: {e}", err=True)
+            click.get_current_context().exit(1)
+        except PermissionError as e:
+            click.echo(f"Permission error: {e}", err=True)
+            click.echo("You do not have permission to read the input or write to the output directory.", err=True)
+            click.get_current_context().exit(1)
+        except OSError as e:
+            click.echo(f"OS error: {e}", err=True)
+            click.echo("There was an error when creating the output directory.", err=True)
+            click.get_current_context().exit(1)
+
+        return 0
+
+    @staticmethod
+    @click.command(name="benchmark")
+    @click.option(
+        "--cvs", type=click.IntRange(1), default=40, help="Number of synthetic CV PDFs to generate."
+    )
+    @click.option(
+        "--roles", type=click.IntRange(1), default=2, help="Number of synthetic job roles to generate."
+    )
+    @click.option(
+        "--pages", type=click.IntRange(1), default=2, help="Number of pages of each synthetic CV."
+    )
+    @click.option(
+        "--workers", type=click.IntRange(1, 64), default=8, help="Number of concurrent analyses."
+    )
+    @click.option(
+        "--latency", type=click.FloatRange(0.0), default=0.05, help="Latency of each fake LLM call, in seconds."
+    )
+    @click.option(
+        "--jitter", type=click.FloatRange(0.0), default=0.02,
+        help="Maximum random latency added to each fake LLM call, in seconds."
+    )
+    @click.option(
+        "--error-rate", type=click.FloatRange(0.0, 1.0), default=0.02,
+        help="Fraction of fake LLM calls failing with a transient server error."
+    )
+    @click.option(
+        "--malformed-rate", type=click.FloatRange(0.0, 1.0), default=0.05,
+        help="Fraction of fake LLM answers returned as near-valid JSON."
+    )
+    @click.option(
+        "--seed", type=int, default=0, help="Seed of the synthetic corpus and of the injected faults."
+    )
+    @click.option(
+        "--scenario", "scenarios", multiple=True,
+        type=click.Choice(["analyze_core", "analyze_core_async", "batch", "rank", "cli", "local", "routed"]),
+        help="Scenario to run (repeatable, default: all)."
+    )
+    @click.option(
+        "--output", default="benchmark.json", help="Path to the JSON results file."
+    )
+    @click.option(
+        "--compare", "baseline", default=None,
+        help="Path to a previous results file; regressions beyond the tolerance make the command fail."
+    )
+    @click.option(
+        "--tolerance", type=click.FloatRange(0.0), default=0.1,
+        help="Accepted relative loss of throughput or gain of p95 latency when comparing."
+    )
+    @click.option(
+        "--index-size", "index_sizes", type=click.IntRange(1), multiple=True,
+        help="Also measure the embedding index query latency with this many indexed CVs (repeatable)."
+    )
+    def benchmark_cli(cvs, roles, pages, workers, latency, jitter, error_rate, malformed_rate, seed, scenarios,
+                      output, baseline, tolerance, index_sizes):
+        """
+        CV Analyzer: Measures the analysis paths against a fake LLM backend (benchmark CLI entry point).
+
+        Generates a synthetic corpus of CV PDFs and job roles, runs `analyze_core`, `analyze_core_async`, the
+        batch runner, the ranker and the `analyze` command against a deterministic fake Gemini backend with
+        the given latency and fault rates, and writes throughput, p50/p95/p99 latency and peak memory per
+        scenario to a JSON file.
+
+        Args:
+            cvs (int): The number of synthetic CVs.
+            roles (int): The number of synthetic job roles.
+            pages (int): The number of pages of each CV.
+            workers (int): The number of concurrent analyses.
+            latency (float): The latency of each fake LLM call, in seconds.
+            jitter (float): The maximum random latency added to each call, in seconds.
+            error_rate (float): The fraction of calls failing with a transient server error.
+            malformed_rate (float): The fraction of answers returned as near-valid JSON.
+            seed (int): The seed of the corpus and of the injected faults.
+            scenarios (tuple): The scenarios to run, or all if empty.
+            output (str): The path to the JSON results file.
+            baseline (str): The path to a previous results file to compare against.
+            tolerance (float): The accepted relative regression when comparing.
+            index_sizes (tuple): The index sizes at which the embedding index query latency is measured.
+        """
+        import tempfile
+        from cv_to_role_analyzer.batch import BatchRunner
+        from cv_to_role_analyzer.benchmark import BenchmarkHarness, SyntheticCorpus
+        from cv_to_role_analyzer.fakes import FakeGeminiClient
+
+        client = FakeGeminiClient(latency=latency, jitter=jitter, error_rate=error_rate,
+                                  malformed_rate=malformed_rate, seed=seed)
+        harness = BenchmarkHarness(client, workers=workers)
+        with tempfile.TemporaryDirectory() as directory:
+            corpus = SyntheticCorpus(directory, cvs, roles, pages=pages, seed=seed)
+            results = harness.run(corpus, scenarios or BenchmarkHarness.SCENARIOS)
+            if index_sizes:
+                role_texts = [RoleProcessor.process(path) for path in BatchRunner.discover(corpus.role_dir, ".txt")]
+                results["index"] = BenchmarkHarness.index_latency(directory, role_texts, index_sizes, seed=seed)
+
+        try:
+            with open(output, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=4)
+        except OSError as e:
+            click.echo(f"OS error: {e}", err=True)
+            click.get_current_context().exit(1)
+        for name, result in results["scenarios"].items():
+            click.echo(f"{name}: {result['throughput_per_second']}/s, p50 {result['latency_ms']['p50']} ms, "
+                       f"p95 {result['latency_ms']['p95']} ms, p99 {result['latency_ms']['p99']} ms, "
+                       f"{result['errors']} errors")
+            for backend, stats in result.get("backends", {}).items():
+                click.echo(f"  {backend}: {stats['calls']} calls, {stats['throughput_per_second']}/s")
+        for size, result in results.get("index", {}).get("sizes", {}).items():
+            click.echo(f"index {size}: query p50 {result['query_ms']['p50']} ms, p95 {result['query_ms']['p95']} ms, "
+                       f"{result['roles']} roles batched {result['batched_query_ms']} ms")
+        startup = results["startup"]
+        click.echo(f"startup: CLI import {startup['cli_ms']} ms, deferred Gemini SDK, pypdf and pyarrow imports "
+                   f"{startup['deferred_ms']} ms")
+        if startup["eager"]:
+            click.echo(f"Warning: the CLI import already loads {', '.join(startup['eager'])}.", err=True)
+        click.echo(f"Results saved to {output}")
+
+        if baseline:
+            try:
+                with open(baseline, encoding="utf-8") as f:
+                    regressions = BenchmarkHarness.compare(results, json.load(f), tolerance)
+            except (OSError, json.JSONDecodeError) as e:
+                click.echo(f"Error: Could not read the baseline {baseline}: {e}", err=True)
+                click.get_current_context().exit(1)
+            for regression in regressions:
+                click.echo(f"Regression: {regression}", err=True)
+            if regressions:
+                click.get_current_context().exit(1)  # A non-zero exit status lets CI jobs fail on regressions
+            click.echo(f"No regression against {baseline}.")
+        return 0
+
+    @staticmethod
+    @click.command(name="status")
+    @click.argument("job", required=False)
+    def status_cli(job):
+        """
+        CV Analyzer: Shows the progress of a resumable batch job, or of every job when none is named.
+
+        Args:
+            job (str): The name of the job, or None to list every job.
+        """
+        from cv_to_role_analyzer.jobs import JobStore
+
+        store = JobStore()
+        try:
+            if job is None:
+                click.echo(json.dumps(store.jobs(), indent=4))
+                return 0
+            details = store.job(job)
+            if details is None:
+                click.echo(f"Error: No job named '{job}' in {store.path}.", err=True)
+                click.get_current_context().exit(1)
+            failures = [{"cv": cv_id, "role": role_id, "error": error}
+                        for cv_id, role_id, error in store.failed_pairs(job)]
+            click.echo(json.dumps({**details, **store.status(job), "failures": failures}, indent=4,
+                                  ensure_ascii=False))
+            return 0
+        finally:
+            store.close()
+
+    @staticmethod
+    @click.command(name="retry-failed")
+    @click.argument("job")
+    @click.option(
+        "--workers", type=click.IntRange(1, 64), default=4,
+        help="Maximum number of analyses running concurrently."
+    )
+    @click.option(
+        "--verbose", type=click.IntRange(0, 2), default=1,
+        help="Verbosity level (0: silent, 1: summary, 2: per-pair status)."
+    )
+    @click.option(
+        "--no-cache", is_flag=True, help="Do not read or write the result cache."
+    )
+    def retry_failed_cli(job, workers, verbose, no_cache):
+        """
+        CV Analyzer: Analyzes again the failed pairs of a resumable batch job.
+
+        The CVs and job roles are read again from the locations recorded when the job was created, and only
+        the pairs recorded as failed are sent to the LLM. The manifest is rewritten to cover the whole job.
+
+        Args:
+            job (str): The name of the job.
+            workers (int): The maximum number of concurrent analyses.
+            verbose (int): The verbosity level of the output.
+            no_cache (bool): Whether to bypass the result cache.
+        """
+        from cv_to_role_analyzer.batch import BatchRunner
+        from cv_to_role_analyzer.ingestion import CVSource
+        from cv_to_role_analyzer.jobs import JobRunner, JobStore
+        from cv_to_role_analyzer.results import ResultSink
+
+        store = JobStore()
+        try:
+            details = store.job(job)
+            if details is None:
+                click.echo(f"Error: No job named '{job}' in {store.path}.", err=True)
+                click.get_current_context().exit(1)
+            failed_cvs = {cv_id for cv_id, _, _ in store.failed_pairs(job)}
+            if not failed_cvs:
+                click.echo(f"Job '{job}' has no failed pairs.")
+                return 0
+
+            params = details["params"]
+            compactor = TextCompactor(cv_tokens=params["cv_tokens"], role_tokens=params["role_tokens"])
+            analyze = partial(CVAnalyzer.analyze_core, cache=None if no_cache else ResultCache(), compactor=compactor,
+                              backend=BackendRegistry.get(params.get("backend")))
+            sink = ResultSink(os.path.join(params["output_dir"], ResultSink.DEFAULT_NAME)) \
+                if params.get("results_format") == "jsonl" else None
+            runner = JobRunner(store, job, params["output_dir"], redo=("failed",), include_new=False,
+                               max_workers=workers, analyze=analyze, sink=sink)
+            source = CVSource.open(params["cvs"], workers=params["pdf_workers"])
+            records = ((cv_id, cv_text) for cv_id, cv_text in source if cv_id in failed_cvs)
+            prepared_roles = BatchRunner.read_roles(BatchRunner.discover(params["roles"], ".txt"), compactor=compactor)
+            manifest = runner.run(records, prepared_roles)
+
+            if verbose == 2:
+                for cv_id, role_id, error in store.failed_pairs(job):
+                    click.echo(f"[failed] {cv_id} x {role_id}: {error}")
+            if verbose > 0:
+                click.echo(f"Retry completed: {manifest['succeeded']} succeeded, {manifest['filtered']} filtered, "
+                           f"{manifest['failed']} failed. "
+                           f"Manifest saved to {os.path.join(params['output_dir'], BatchRunner.MANIFEST_NAME)}")
+        except (FileNotFoundError, NotADirectoryError, PermissionError) as e:
+            click.echo(f"Error: {e}", err=True)
+            click.echo("The inputs or the output directory of the job are no longer readable.", err=True)
+            click.get_current_context().exit(1)
+        except ValueError as e:
+            click.echo(f"Invalid input error: {e}", err=True)
+            click.get_current_context().exit(1)
+        finally:
+            store.close()
+
+        if manifest["failed"]:
+            click.get_current_context().exit(1)  # Lets scripts and CI jobs detect failures left after the retry
+        return 0
+
+    @staticmethod
+    @click.command(name="results")
+    @click.argument("path")
+    @click.option(
+        "--role", default=None, help="Only query the results of this role (its file name)."
+    )
+    @click.option(
+        "--top", type=click.IntRange(1), default=None, help="Show the N best results of --role by match score."
+    )
+    @click.option(
+        "--gap-categories", is_flag=True, help="Show the most common skill-gap categories."
+    )
+    @click.option(
+        "--export-parquet", default=None, help="Write every result to this Parquet file (requires pyarrow)."
+    )
+    def results_cli(path, role, top, gap_categories, export_parquet):
+        """
+        CV Analyzer: Queries or exports a results.jsonl file written with `--results-format jsonl`.
+
+        The file is streamed, so queries do not load every result in memory.
+
+        Args:
+            path (str): The path to the JSONL results file, or to the output directory holding it.
+            role (str): The role whose results are queried, or None for every role.
+            top (int): The number of best results of the role to show.
+            gap_categories (bool): Whether to show the most common skill-gap categories.
+            export_parquet (str): The path to a Parquet file to export the results to.
+        """
+        from cv_to_role_analyzer.results import ResultSink
+
+        sink = ResultSink(path)
+        if not os.path.isfile(sink.path):
+            click.echo(f"Error: {sink.path} does not exist.", err=True)
+            click.get_current_context().exit(1)
+        if top is not None and role is None:
+            click.echo("Error: --top requires --role.", err=True)
+            click.get_current_context().exit(1)
+        try:
+            if top is not None:
+                click.echo(json.dumps([{key: record[key] for key in ("cv", "role", "match_score")}
+                                       for record in sink.top(role, top)], indent=4, ensure_ascii=False))
+            if gap_categories:
+                click.echo(json.dumps(dict(sink.gap_categories(role)), indent=4, ensure_ascii=False))
+            if export_parquet:
+                click.echo(f"Exported {sink.export_parquet(export_parquet)} results to {export_parquet}")
+            if top is None and not gap_categories and not export_parquet:
+                click.echo(json.dumps({"path": sink.path, "results": sum(1 for _ in sink.records(role))}, indent=4))
+        except ImportError as e:
+            click.echo(f"Error: {e}", err=True)
+            click.get_current_context().exit(1)
+        except (OSError, json.JSONDecodeError) as e:
+            click.echo(f"Error: Could not read {sink.path}: {e}", err=True)
+            click.get_current_context().exit(1)
+        return 0
+
+    @staticmethod
+    @click.command(name="cache")
+    @click.option(
+        "--clear", is_flag=True, help="Remove every cached result."
+    )
+    def cache_cli(clear):
+        """
+        CV Analyzer: Shows the result cache statistics, or clears the cache.
+
+        Args:
+            clear (bool): Whether to remove every cached result.
+        """
+        cache = ResultCache()
+        if clear:
+            cache.clear()
+            click.echo(f"Cache cleared: {cache.path}")
+        else:
+            click.echo(json.dumps({"path": cache.path, **cache.stats()}, indent=4))
+        return 0
+
+    @staticmethod
+    @click.group(name="index")
+    def index_cli():
+        """
+        CV Analyzer: Maintains the local embedding index of the candidate pool, and finds the best CVs for a role.
+
+        The index location defaults to ~/.cache/cv_analyzer/index, or to CV_ANALYZER_INDEX when it is set.
+        """
+
+    @staticmethod
+    @click.command(name="add")
+    @click.option(
+        "--cvs", required=True,
+        help="Path to a directory of CV files (.pdf/.txt), a .zip archive of them, or a .jsonl file of CV records."
+    )
+    @click.option(
+        "--pdf-workers", type=click.IntRange(1, 64), default=1,
+        help="Number of worker processes used to extract the pages of large CVs."
+    )
+    def index_add_cli(cvs, pdf_workers):
+        """
+        CV Analyzer: Adds the CVs of a corpus to the index, replacing the vectors of CVs indexed before.
+
+        Args:
+            cvs (str): The path to the CV corpus.
+            pdf_workers (int): The number of worker processes used to extract large PDFs.
+        """
+        from cv_to_role_analyzer.index import CVIndex
+        from cv_to_role_analyzer.ingestion import CVSource
+
+        index = CVIndex()
+        try:
+            counts = index.add_many(CVSource.open(cvs, workers=pdf_workers))
+        except (FileNotFoundError, ValueError) as e:
+            click.echo(f"Error: {e}", err=True)
+            click.get_current_context().exit(1)
+        finally:
+            index.close()
+        click.echo(f"Indexed {counts['added']} CVs ({counts['skipped']} without text skipped).")
+        return 0
+
+    @staticmethod
+    @click.command(name="delete")
+    @click.argument("cv_ids", nargs=-1, required=True)
+    def index_delete_cli(cv_ids):
+        """
+        CV Analyzer: Removes CVs from the index; `index rebuild` reclaims their space.
+
+        Args:
+            cv_ids (tuple): The identifiers of the CVs (their file names or JSONL ids).
+        """
+        from cv_to_role_analyzer.index import CVIndex
+
+        index = CVIndex()
+        try:
+            deleted = sum(index.delete(cv_id) for cv_id in cv_ids)
+        finally:
+            index.close()
+        click.echo(f"Deleted {deleted} of {len(cv_ids)} CVs.")
+        if deleted < len(cv_ids):
+            click.get_current_context().exit(1)  # Some of the CVs were not indexed
+        return 0
+
+    @staticmethod
+    @click.command(name="query")
+    @click.option(
+        "--role", "roles", required=True, multiple=True, help="Path to a job role text file (repeatable)."
+    )
+    @click.option(
+        "--top", type=click.IntRange(1), default=50, help="Number of CVs shortlisted for each role."
+    )
+    @click.option(
+        "--analyze-cvs", default=None,
+        help="Analyze the shortlisted CVs, read from this corpus (directory, .zip or .jsonl), and write the results "
+             "to --output-dir."
+    )
+    @click.option(
+        "--output-dir", default="analysis_results",
+        help="Path to the output directory of the analyses, with one subdirectory per role."
+    )
+    @click.option(
+        "--workers", type=click.IntRange(1, 64), default=4,
+        help="Maximum number of analyses running concurrently."
+    )
+    @click.option(
+        "--backend", default=None,
+        help="Analysis backend of the shortlist: gemini, local or routed. Defaults to CV_ANALYZER_BACKEND or gemini."
+    )
+    @click.option(
+        "--no-cache", is_flag=True, help="Do not read or write the result cache."
+    )
+    def index_query_cli(roles, top, analyze_cvs, output_dir, workers, backend, no_cache):
+        """
+        CV Analyzer: Shortlists the indexed CVs most similar to each role, and optionally analyzes the shortlist.
+
+        All the roles are scored in one scan of the index. Only the shortlisted CVs are read from the corpus
+        and analyzed, each role's results going to its own subdirectory of the output directory.
+
+        Args:
+            roles (tuple): The paths to the job role text files.
+            top (int): The number of CVs shortlisted for each role.
+            analyze_cvs (str): The path to the CV corpus to analyze the shortlist from, or None to only list it.
+            output_dir (str): The directory where the analyses are written.
+            workers (int): The maximum number of concurrent analyses.
+            backend (str): The name of the analysis backend, or None for the default one.
+            no_cache (bool): Whether to bypass the result cache.
+        """
+        from cv_to_role_analyzer.batch import BatchRunner
+        from cv_to_role_analyzer.index import CVIndex
+        from cv_to_role_analyzer.ingestion import CVSource
+
+        prepared = BatchRunner.read_roles(roles, compactor=TextCompactor.from_env())
+        if not all(prepared.values()):
+            click.get_current_context().exit(1)
+        index = CVIndex()
+        try:
+            with Tracer.span("index.query"):
+                shortlists = dict(zip(prepared, index.query_many([role.text for role in prepared.values()], top)))
+        finally:
+            index.close()
+        if not analyze_cvs:
+            click.echo(json.dumps(shortlists, indent=4))
+            return 0
+
+        try:
+            cache = None if no_cache else ResultCache()
+            analyze = partial(CVAnalyzer.analyze_core, cache=cache, compactor=TextCompactor.from_env(),
+                              backend=BackendRegistry.get(backend))
+            for role_id, role in prepared.items():
+                ids = {match["cv"] for match in shortlists[role_id]}
+                role_dir = os.path.join(output_dir, os.path.splitext(role_id)[0])
+                runner = BatchRunner(role_dir, max_workers=workers, analyze=analyze)
+                manifest = runner.run(CVSource.open(analyze_cvs, ids=ids), {role_id: role})
+                click.echo(f"{role_id}: {manifest['succeeded']} of {len(ids)} shortlisted CVs analyzed, "
+                           f"{manifest['failed']} failed. Results saved to {role_dir}")
+        except (FileNotFoundError, ValueError) as e:
+            click.echo(f"Error: {e}", err=True)
+            click.get_current_context().exit(1)
+        except OSError as e:
+            click.echo(f"OS error: {e}", err=True)
+            click.echo("There was an error when creating the output directory.", err=True)
+            click.get_current_context().exit(1)
+        return 0
+
+    @staticmethod
+    @click.command(name="rebuild")
+    def index_rebuild_cli():
+        """CV Analyzer: Rewrites the index without the rows of deleted or replaced CVs."""
+        from cv_to_role_analyzer.index import CVIndex
+
+        index = CVIndex()
+        try:
+            click.echo(json.dumps(index.rebuild(), indent=4))
+        finally:
+            index.close()
+        return 0
+
+    @staticmethod
+    @click.command(name="stats")
+    def index_stats_cli():
+        """CV Analyzer: Shows the size of the index and the number of live and deleted CVs."""
+        from cv_to_role_analyzer.index import CVIndex
+
+        index = CVIndex()
+        try:
+            click.echo(json.dumps(index.stats(), indent=4))
+        finally:
+            index.close()
+        return 0
+
+    @staticmethod
+    @click.command(name="versions")
+    @click.argument("candidate", required=False)
+    def versions_cli(candidate):
+        """
+        CV Analyzer: Shows the CV versions of a candidate, or the version store statistics and calls avoided.
+
+        Args:
+            candidate (str): The identifier of the candidate, or None for the store statistics.
+        """
+        from cv_to_role_analyzer.versions import CVVersionStore
+
+        versions = CVVersionStore()
+        try:
+            if candidate is None:
+                click.echo(json.dumps({"path": versions.path, **versions.stats()}, indent=4))
+                return 0
+            history = versions.versions(candidate)
+            if not history:
+                click.echo(f"Error: Unknown candidate '{candidate}'.", err=True)
+                click.get_current_context().exit(1)
+            click.echo(json.dumps({"candidate": candidate, "versions": history}, indent=4))
+            return 0
+        finally:
+            versions.close()
+
+    @staticmethod
+    @click.command(name="serve")
+    @click.option(
+        "--host", default="127.0.0.1", help="Interface to listen on."
+    )
+    @click.option(
+        "--port", type=click.IntRange(0, 65535), default=8080, help="Port to listen on."
+    )
+    @click.option(
+        "--workers", type=click.IntRange(1, 64), default=4,
+        help="Maximum number of analyses running concurrently."
+    )
+    @click.option(
+        "--max-queue", type=click.IntRange(0), default=32,
+        help="Maximum number of admitted analyses waiting for a worker before requests are rejected with 503."
+    )
+    @click.option(
+        "--no-cache", is_flag=True, help="Do not read or write the result cache."
+    )
+    @click.option(
+        "--backend", default=None,
+        help="Analysis backend: gemini, local (offline skill-overlap scorer) or routed (local pre-screening, "
+             "Gemini for the shortlist). Defaults to CV_ANALYZER_BACKEND or gemini."
+    )
+    def serve_cli(host, port, workers, max_queue, no_cache, backend):
+        """
+        CV Analyzer: Runs the HTTP analysis service (server CLI entry point).
+
+        Exposes `POST /analyze`, `POST /batch`, `GET /healthz` and `GET /metrics`, and runs the analyses on a
+        bounded worker pool behind an admission-controlled queue.
+
+        Args:
+            host (str): The interface to listen on.
+            port (int): The port to listen on.
+            workers (int): The maximum number of concurrent analyses.
+            max_queue (int): The maximum number of admitted analyses waiting for a worker.
+            no_cache (bool): Whether to bypass the result cache.
+            backend (str): The name of the analysis backend, or None for the default one.
+        """
+        from cv_to_role_analyzer.server import AnalysisServer
+
+        cache = None if no_cache else ResultCache()
+        try:
+            analyze = partial(CVAnalyzer.analyze_core, cache=cache, compactor=TextCompactor.from_env(),
+                              backend=BackendRegistry.get(backend))
+            server = AnalysisServer(host, port, workers=workers, max_queue=max_queue, analyze=analyze)
+        except ValueError as e:
+            click.echo(f"Invalid input error: {e}", err=True)
+            click.get_current_context().exit(1)
+        except OSError as e:
+            click.echo(f"OS error: {e}", err=True)
+            click.echo(f"Could not listen on {host}:{port}.", err=True)
+            click.get_current_context().exit(1)
+
+        click.echo(f"Serving on http://{server.address[0]}:{server.address[1]} with {workers} workers")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            click.echo("Shutting down.")
+        return 0
+
+    @staticmethod
+    @click.command(name="daemon")
+    @click.option(
+        "--socket", "socket_path", default=None, envvar="CV_ANALYZER_DAEMON",
+        help="Path to the Unix socket to listen on. Defaults to CV_ANALYZER_DAEMON or ~/.cache/cv_analyzer/daemon.sock."
+    )
+    @click.option(
+        "--workers", type=click.IntRange(1, 64), default=4,
+        help="Maximum number of analyses running concurrently."
+    )
+    @click.option(
+        "--no-cache", is_flag=True, help="Do not read or write the result cache."
+    )
+    def daemon_cli(socket_path, workers, no_cache):
+        """
+        CV Analyzer: Runs a warm local worker that `analyze --daemon` hands its analyses to (daemon CLI entry point).
+
+        The worker imports the Gemini SDK and pypdf, creates the shared client and opens the result cache once,
+        so each CLI invocation only pays for a light startup and a round trip over the Unix socket.
+
+        Args:
+            socket_path (str): The path to the Unix socket, or None for the default one.
+            workers (int): The maximum number of concurrent analyses.
+            no_cache (bool): Whether to bypass the result cache.
+        """
+        from cv_to_role_analyzer.daemon import DaemonClient, WarmWorker
+
+        socket_path = socket_path or DaemonClient.default_path()
+        try:
+            worker = WarmWorker(socket_path, workers=workers, no_cache=no_cache)
+        except OSError as e:
+            click.echo(f"OS error: {e}", err=True)
+            click.echo(f"Could not listen on {socket_path}.", err=True)
+            click.get_current_context().exit(1)
+
+        if not worker.warm():
+            click.echo("Warning: GEMINI_API_KEY is not set; only offline backends will succeed.", err=True)
+        click.echo(f"Warm worker listening on {socket_path} with {workers} workers")
+        try:
+            worker.serve_forever()
+        except KeyboardInterrupt:
+            click.echo("Shutting down.")
+        return 0
+
+
+CVAnalyzer.cli.add_command(CVAnalyzer.analyze_cli)
+CVAnalyzer.cli.add_command(CVAnalyzer.batch_cli)
+CVAnalyzer.cli.add_command(CVAnalyzer.rank_cli)
+CVAnalyzer.cli.add_command(CVAnalyzer.benchmark_cli)
+CVAnalyzer.cli.add_command(CVAnalyzer.status_cli)
+CVAnalyzer.cli.add_command(CVAnalyzer.retry_failed_cli)
+CVAnalyzer.cli.add_command(CVAnalyzer.results_cli)
+CVAnalyzer.cli.add_command(CVAnalyzer.cache_cli)
+CVAnalyzer.cli.add_command(CVAnalyzer.versions_cli)
+CVAnalyzer.cli.add_command(CVAnalyzer.index_cli)
+CVAnalyzer.index_cli.add_command(CVAnalyzer.index_add_cli)
+CVAnalyzer.index_cli.add_command(CVAnalyzer.index_delete_cli)
+CVAnalyzer.index_cli.add_command(CVAnalyzer.index_query_cli)
+CVAnalyzer.index_cli.add_command(CVAnalyzer.index_rebuild_cli)
+CVAnalyzer.index_cli.add_command(CVAnalyzer.index_stats_cli)
+CVAnalyzer.cli.add_command(CVAnalyzer.serve_cli)
+CVAnalyzer.cli.add_command(CVAnalyzer.daemon_cli)
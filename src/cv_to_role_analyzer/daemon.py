@@ -0,0 +1,272 @@
+import importlib
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+
+
+class DaemonUnavailableError(ConnectionError):
+    """Raised when no warm worker answers on the socket, so the caller can analyze locally instead."""
+
+
+class WarmWorker:
+    """
+    A local analysis worker that keeps a warm process between `cv-analyzer` invocations.
+
+    Each CLI invocation otherwise pays for interpreter startup, the import of the Gemini SDK and pypdf, a new
+    HTTP connection pool and a cold PDF text cache. The worker imports everything once, creates the shared
+    client, opens the result cache, and then serves analyses over a Unix socket. Each connection carries one
+    JSON request line and receives one JSON response line:
+
+        {"op": "analyze", "cv": <path>, "role": <path>, "no_cache", "refresh", "cv_tokens", "role_tokens",
+         "backend"} -> {"report": <JSON report>, "tokens": {...}, "backends": {...}}
+        {"op": "ping"} -> {"ok": true, "pid", "uptime_seconds", "served"}
+
+    Failures are answered with `{"error": <message>, "type": <exception class name>}`. The files are read by the
+    worker, so the paths must be absolute or relative to the worker's working directory.
+
+    Attributes:
+        path (str): The path to the Unix socket.
+        workers (int): The number of analyses running concurrently.
+        cache (ResultCache): The result cache shared by every request, or None to bypass it.
+
+    Methods:
+        warm(): Imports the heavy dependencies and creates the shared Gemini client ahead of the first request.
+        handle(request): Answers one decoded request.
+        start(): Starts serving in a background thread.
+        serve_forever(): Serves requests in the calling thread until shut down.
+        shutdown(): Stops serving and removes the socket.
+    """
+
+    MAX_REQUEST_BYTES = 64 * 1024
+
+    def __init__(self, path, workers=4, no_cache=False):
+        """
+        Initializes the worker and binds its socket, replacing a stale socket left by a worker that exited.
+
+        Args:
+            path (str): The path to the Unix socket.
+            workers (int): The number of analyses running concurrently.
+            no_cache (bool): Whether to bypass the result cache.
+
+        Raises:
+            OSError: If Unix sockets are not supported, or another worker is already listening on the path.
+        """
+        from cv_to_role_analyzer.cache import ResultCache
+
+        if not hasattr(socketserver, "ThreadingUnixStreamServer"):
+            raise OSError("The warm worker needs Unix domain sockets, which this platform does not support.")
+        if os.path.exists(path):
+            try:
+                DaemonClient(path).ping()
+            except DaemonUnavailableError:
+                os.unlink(path)  # Left behind by a worker that did not shut down cleanly
+            else:
+                raise OSError(f"A warm worker is already listening on {path}.")
+        self.path = path
+        self.workers = workers
+        self.cache = None if no_cache else ResultCache()
+        self._slots = threading.BoundedSemaphore(workers)
+        self._served = 0
+        self._served_lock = threading.Lock()
+        self._started = time.monotonic()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._server = socketserver.ThreadingUnixStreamServer(path, _RequestHandler)
+        self._server.daemon_threads = True
+        self._server.worker = self
+        self._thread = None
+
+    def warm(self):
+        """Imports the heavy dependencies and creates the shared Gemini client ahead of the first request.
+
+        A missing API key is not an error here: offline backends still work, and Gemini requests report it.
+
+        Returns:
+            bool: True if the Gemini client was created.
+        """
+        from cv_to_role_analyzer.llm import LLMClient
+
+        for name in ("google.genai", "google.genai.types", "google.genai.errors", "pypdf", "httpx"):
+            importlib.import_module(name)
+        try:
+            LLMClient.get_client()
+        except ValueError:
+            return False
+        return True
+
+    def handle(self, request):
+        """Answers one decoded request.
+
+        Args:
+            request (dict): The request, with an `op` of `analyze` (default) or `ping`.
+
+        Returns:
+            dict: The response.
+        """
+        from cv_to_role_analyzer.backends import BackendRegistry
+        from cv_to_role_analyzer.compaction import TextCompactor
+        from cv_to_role_analyzer.cv_analyzer import CVAnalyzer
+        from cv_to_role_analyzer.utils import PDFProcessor, RoleProcessor
+
+        op = request.get("op", "analyze")
+        if op == "ping":
+            with self._served_lock:
+                served = self._served
+            return {"ok": True, "pid": os.getpid(), "uptime_seconds": round(time.monotonic() - self._started, 3),
+                    "served": served}
+        if op != "analyze":
+            raise ValueError(f"Unknown operation '{op}'.")
+
+        with self._slots:
+            role_text = RoleProcessor.process(request["role"])
+            cv_text = PDFProcessor.extract_text(request["cv"])
+            if not role_text or not cv_text:
+                raise ValueError(f"Could not read the CV {request['cv']} or the role {request['role']}.")
+            compactor = TextCompactor(cv_tokens=request.get("cv_tokens", 6000),
+                                      role_tokens=request.get("role_tokens", 1500))
+            json_report = CVAnalyzer.analyze_core(
+                cv_text, role_text, cache=None if request.get("no_cache") else self.cache,
+                refresh=request.get("refresh", False), compactor=compactor, backend=request.get("backend"),
+            )
+        with self._served_lock:
+            self._served += 1
+        return {"report": json_report, "tokens": compactor.stats(), "backends": BackendRegistry.stats()}
+
+    def start(self):
+        """Starts serving in a background thread.
+
+        Returns:
+            str: The path to the socket.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.path
+
+    def serve_forever(self):
+        """Serves requests in the calling thread until shut down."""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._close()
+
+    def shutdown(self):
+        """Stops serving and removes the socket."""
+        self._server.shutdown()
+        if self._thread is not None:
+            self._thread.join()
+            self._close()
+
+    def _close(self):
+        """Closes the socket and removes its file."""
+        self._server.server_close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Reads one JSON request line from a connection and writes the worker's JSON response line."""
+
+    def handle(self):
+        line = self.rfile.readline(WarmWorker.MAX_REQUEST_BYTES)
+        try:
+            response = self.server.worker.handle(json.loads(line))
+        except Exception as e:
+            response = {"error": str(e), "type": type(e).__name__}
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class DaemonClient:
+    """
+    A client handing analyses to a `WarmWorker` over its Unix socket.
+
+    The client only needs the standard library, so a CLI invocation that uses it never imports the Gemini SDK
+    or pypdf.
+
+    Attributes:
+        path (str): The path to the Unix socket.
+        timeout (float): The maximum number of seconds to wait for a response.
+
+    Methods:
+        default_path(): Returns the socket path from the environment, or the default one.
+        ping(): Checks that the worker is running and returns its status.
+        analyze(cv, role, **options): Analyzes a CV file against a role file in the worker.
+    """
+
+    DEFAULT_TIMEOUT_SECONDS = 300
+    # Errors re-raised as themselves, so the CLI reports a worker failure as it reports a local one
+    ERRORS = {error.__name__: error for error in (FileNotFoundError, IsADirectoryError, PermissionError, ValueError)}
+
+    def __init__(self, path=None, timeout=DEFAULT_TIMEOUT_SECONDS):
+        """
+        Initializes the client without connecting.
+
+        Args:
+            path (str, optional): The path to the Unix socket, defaults to `default_path()`.
+            timeout (float): The maximum number of seconds to wait for a response.
+        """
+        self.path = path or DaemonClient.default_path()
+        self.timeout = timeout
+
+    @staticmethod
+    def default_path():
+        """Returns the socket path set by the CV_ANALYZER_DAEMON environment variable, or the default one.
+
+        Returns:
+            str: The path to the Unix socket.
+        """
+        return os.getenv("CV_ANALYZER_DAEMON") or os.path.join(os.path.expanduser("~"), ".cache", "cv_analyzer",
+                                                               "daemon.sock")
+
+    def ping(self):
+        """Checks that the worker is running.
+
+        Returns:
+            dict: The worker's process ID, uptime and number of analyses served.
+
+        Raises:
+            DaemonUnavailableError: If no worker answers on the socket.
+        """
+        return self._request({"op": "ping"})
+
+    def analyze(self, cv, role, **options):
+        """Analyzes a CV file against a role file in the worker.
+
+        Args:
+            cv (str): The path to the CV PDF file.
+            role (str): The path to the job role text file.
+            **options: `no_cache`, `refresh`, `cv_tokens`, `role_tokens` and `backend`, as for `analyze`.
+
+        Returns:
+            dict: The JSON report (`report`) and the token (`tokens`) and backend (`backends`) statistics.
+
+        Raises:
+            DaemonUnavailableError: If no worker answers on the socket.
+            Exception: The error raised by the worker, as its own type when it is a common input error or as a
+                RuntimeError otherwise.
+        """
+        response = self._request({"op": "analyze", "cv": os.path.abspath(cv), "role": os.path.abspath(role),
+                                  **options})
+        if "error" in response:
+            raise DaemonClient.ERRORS.get(response.get("type"), RuntimeError)(response["error"])
+        return response
+
+    def _request(self, payload):
+        """Sends one request line and returns the decoded response line."""
+        if not hasattr(socket, "AF_UNIX"):
+            raise DaemonUnavailableError("Unix domain sockets are not supported on this platform.")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.settimeout(self.timeout)
+            try:
+                connection.connect(self.path)
+            except OSError as e:  # Missing socket file, or nobody listening on it
+                raise DaemonUnavailableError(f"No warm worker is listening on {self.path}: {e}") from e
+            connection.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+            with connection.makefile("rb") as stream:
+                line = stream.readline()
+        if not line:
+            raise DaemonUnavailableError(f"The warm worker on {self.path} closed the connection.")
+        return json.loads(line)
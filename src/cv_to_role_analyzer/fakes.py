@@ -0,0 +1,170 @@
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+from google.genai import errors
+
+
+class FakeGeminiClient:
+    """
+    A stand-in for the Gemini client that answers locally, for benchmarks and offline runs.
+
+    It exposes the parts of `google.genai.Client` used by the analyzer (`models`, `aio.models` and `caches`)
+    and answers every prompt after a configurable latency, at once or streamed in chunks. Each answer is
+    derived from a hash of the prompt, so the same prompt always gets the same report. A seeded random
+    generator injects transient server errors and malformed JSON at configurable rates; the sequence of
+    injected faults is reproducible for a given seed and call order. Batched ranking prompts get one report
+    per item.
+
+    Attributes:
+        latency (float): The base latency of every call, in seconds.
+        jitter (float): The maximum random latency added to every call, in seconds.
+        error_rate (float): The fraction (0-1) of calls failing with a 503 server error.
+        malformed_rate (float): The fraction (0-1) of answers returned as near-valid JSON.
+        calls (int): The number of calls answered or failed so far.
+
+    Methods:
+        respond(contents): Returns the response to a prompt, or raises the injected error.
+    """
+
+    ITEM_HEADER = re.compile(r"^(?:CV|Role Description) \[(.+?)\]:")
+
+    # Streamed answers are split into this many chunks; the first one arrives after this share of the latency
+    STREAM_CHUNKS = 8
+    FIRST_CHUNK_SHARE = 0.3
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, malformed_rate=0.0, seed=0):
+        """
+        Initializes the fake client.
+
+        Args:
+            latency (float): The base latency of every call, in seconds.
+            jitter (float): The maximum random latency added to every call, in seconds.
+            error_rate (float): The fraction (0-1) of calls failing with a 503 server error.
+            malformed_rate (float): The fraction (0-1) of answers returned as near-valid JSON.
+            seed (int): The seed of the fault injection and jitter.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.models = SimpleNamespace(generate_content=self._generate_content,
+                                      generate_content_stream=self._generate_content_stream)
+        self.aio = SimpleNamespace(models=SimpleNamespace(generate_content=self._generate_content_async,
+                                                          generate_content_stream=self._generate_content_stream_async))
+        self.caches = SimpleNamespace(
+            create=lambda model, config: SimpleNamespace(name=f"cachedContents/fake-{id(config)}"),
+            delete=lambda name: None,
+        )
+
+    def respond(self, contents):
+        """Returns the response to a prompt, or raises the injected error.
+
+        Args:
+            contents (Content): The prompt.
+
+        Returns:
+            SimpleNamespace: An object shaped like `GenerateContentResponse`, with `candidates`, `text` and
+                `usage_metadata`.
+
+        Raises:
+            errors.ServerError: For the calls selected by `error_rate`.
+        """
+        with self._lock:
+            self.calls += 1
+            fail = self._random.random() < self.error_rate
+            malformed = self._random.random() < self.malformed_rate
+            style = self._random.randrange(3)
+
+        if fail:
+            raise errors.ServerError(503, {"error": {"code": 503, "message": "Injected overload.",
+                                                     "status": "UNAVAILABLE"}})
+
+        texts = [part.text for part in contents.parts]
+        items = [match.group(1) for match in map(FakeGeminiClient.ITEM_HEADER.match, texts) if match]
+        prompt = "\n".join(texts)
+        if items:
+            payload = {"results": [{"id": item, **FakeGeminiClient._report(prompt + item)} for item in items]}
+        else:
+            payload = FakeGeminiClient._report(prompt)
+        text = json.dumps(payload)
+        if malformed:
+            text = (f"```json\n{text[:-1]},}}\n```", f"Here is the analysis:\n{text}\nDone.",
+                    text[:int(len(text) * 0.8)])[style]
+
+        part = SimpleNamespace(text=text)
+        return SimpleNamespace(
+            candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))],
+            text=text,
+            usage_metadata=SimpleNamespace(prompt_token_count=len(prompt) // 4, candidates_token_count=len(text) // 4),
+        )
+
+    def _generate_content(self, model, contents, config=None):
+        """Answers a prompt after the configured latency, blocking the calling thread."""
+        time.sleep(self._delay())
+        return self.respond(contents)
+
+    async def _generate_content_async(self, model, contents, config=None):
+        """Answers a prompt after the configured latency, without blocking the event loop."""
+        await asyncio.sleep(self._delay())
+        return self.respond(contents)
+
+    def _generate_content_stream(self, model, contents, config=None):
+        """Streams the answer to a prompt in chunks, the first one after a fraction of the configured latency."""
+        delay = self._delay()
+        time.sleep(delay * self.FIRST_CHUNK_SHARE)
+        chunks = FakeGeminiClient._chunks(self.respond(contents))
+        for chunk in chunks:
+            yield chunk
+            time.sleep(delay * (1 - self.FIRST_CHUNK_SHARE) / len(chunks))
+
+    async def _generate_content_stream_async(self, model, contents, config=None):
+        """Streams the answer to a prompt in chunks, without blocking the event loop."""
+        delay = self._delay()
+
+        async def chunks():
+            await asyncio.sleep(delay * self.FIRST_CHUNK_SHARE)
+            pieces = FakeGeminiClient._chunks(self.respond(contents))
+            for chunk in pieces:
+                yield chunk
+                await asyncio.sleep(delay * (1 - self.FIRST_CHUNK_SHARE) / len(pieces))
+
+        return chunks()
+
+    @staticmethod
+    def _chunks(response):
+        """Splits a response into stream chunks; only the last one carries the usage metadata."""
+        text = response.text
+        size = max(1, -(-len(text) // FakeGeminiClient.STREAM_CHUNKS))
+        pieces = [text[start:start + size] for start in range(0, len(text), size)] or [""]
+        chunks = []
+        for index, piece in enumerate(pieces):
+            part = SimpleNamespace(text=piece)
+            chunks.append(SimpleNamespace(
+                candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))],
+                text=piece,
+                usage_metadata=response.usage_metadata if index == len(pieces) - 1 else None,
+            ))
+        return chunks
+
+    def _delay(self):
+        """Returns the latency of the next call."""
+        with self._lock:
+            return self.latency + self._random.uniform(0, self.jitter)
+
+    @staticmethod
+    def _report(prompt):
+        """Builds a deterministic report from the hash of a prompt."""
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        gaps = [{"category": ("Technical", "Experience", "Education")[byte % 3], "gap": f"Gap {byte}"}
+                for byte in digest[1:1 + digest[0] % 4]]
+        return {"match_score": digest[0] % 101, "skill_gaps": gaps,
+                "recommendations": [f"Address {gap['gap']}" for gap in gaps]}
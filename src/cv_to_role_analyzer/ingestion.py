@@ -0,0 +1,156 @@
+import json
+import os
+import zipfile
+
+import click
+from cv_to_role_analyzer.utils import PDFProcessor
+
+
+class CVSource:
+    """
+    A class that streams CVs as `(cv_id, text)` records without loading a whole corpus into memory.
+
+    Records are produced lazily, one CV at a time, from a directory of `.pdf`/`.txt` files, a ZIP archive of
+    such files, or a JSONL file with one `{"id": ..., "text": ...}` object per line. A record whose text
+    cannot be extracted (a missing, corrupt or non-UTF-8 file) is still yielded, with None as its text, so the
+    consumer can report it while the other records are processed.
+
+    Methods:
+        open(source, workers, ids): Streams the records of a directory, ZIP archive or JSONL file.
+        from_directory(directory, workers, ids): Streams the records of the CV files in a directory.
+        from_zip(archive_path, workers, ids): Streams the records of the CV files in a ZIP archive.
+        from_jsonl(jsonl_path, ids): Streams the records of a JSONL file.
+    """
+
+    EXTENSIONS = (".pdf", ".txt")
+
+    @staticmethod
+    def open(source, workers=1, ids=None):
+        """Streams the records of a directory, ZIP archive or JSONL file, based on the path.
+
+        Args:
+            source (str): The path to a directory, a `.zip` archive or a `.jsonl` file.
+            workers (int): The number of worker processes used to extract the pages of large PDFs.
+            ids (set, optional): The identifiers of the only records to read, e.g. a shortlist; files outside
+                it are not extracted.
+
+        Returns:
+            generator: The `(cv_id, text)` records.
+
+        Raises:
+            FileNotFoundError: If the source does not exist.
+            ValueError: If the source is neither a directory, a ZIP archive nor a JSONL file.
+        """
+        if not os.path.exists(source):
+            raise FileNotFoundError(f"The CV source {source} does not exist.")
+        if os.path.isdir(source):
+            return CVSource.from_directory(source, workers, ids)
+        if source.lower().endswith(".zip"):
+            return CVSource.from_zip(source, workers, ids)
+        if source.lower().endswith(".jsonl"):
+            return CVSource.from_jsonl(source, ids)
+        raise ValueError(f"The CV source {source} must be a directory, a .zip archive or a .jsonl file.")
+
+    @staticmethod
+    def from_directory(directory, workers=1, ids=None):
+        """Streams the records of the `.pdf` and `.txt` files in a directory, in file name order.
+
+        Args:
+            directory (str): The directory to read.
+            workers (int): The number of worker processes used to extract the pages of large PDFs.
+            ids (set, optional): The names of the only files to read.
+
+        Yields:
+            tuple: The file name and its extracted text (or None).
+        """
+        names = sorted(entry.name for entry in os.scandir(directory)
+                       if entry.is_file() and entry.name.lower().endswith(CVSource.EXTENSIONS)
+                       and (ids is None or entry.name in ids))
+        def read_text(path):
+            with open(path, "r", encoding="utf-8") as file:
+                return file.read().strip() or None
+
+        for name in names:
+            path = os.path.join(directory, name)
+            if name.lower().endswith(".pdf"):
+                yield name, CVSource._read(name, PDFProcessor.extract_text, path, workers=workers)
+            else:
+                yield name, CVSource._read(name, read_text, path)
+
+    @staticmethod
+    def from_zip(archive_path, workers=1, ids=None):
+        """Streams the records of the `.pdf` and `.txt` members of a ZIP archive, one member at a time.
+
+        Args:
+            archive_path (str): The path to the ZIP archive.
+            workers (int): The number of worker processes used to extract the pages of large PDFs.
+            ids (set, optional): The names of the only members to read.
+
+        Yields:
+            tuple: The member name and its extracted text (or None).
+        """
+        with zipfile.ZipFile(archive_path) as archive:
+            members = sorted((info for info in archive.infolist()
+                              if not info.is_dir() and info.filename.lower().endswith(CVSource.EXTENSIONS)
+                              and (ids is None or info.filename in ids)),
+                             key=lambda info: info.filename)
+            for info in members:
+                if info.file_size > PDFProcessor.MAX_BYTES:
+                    click.echo(f"Error: The archived file {info.filename} is {info.file_size} bytes, above the "
+                               f"{PDFProcessor.MAX_BYTES} bytes limit.")
+                    yield info.filename, None
+                elif info.filename.lower().endswith(".pdf"):
+                    yield info.filename, CVSource._read(
+                        info.filename, lambda: PDFProcessor.extract_bytes_with_stats(archive.read(info),
+                                                                                   info.filename, workers)[0]
+                    )
+                else:
+                    yield info.filename, CVSource._read(
+                        info.filename, lambda: archive.read(info).decode("utf-8").strip() or None
+                    )
+
+    @staticmethod
+    def from_jsonl(jsonl_path, ids=None):
+        """Streams the records of a JSONL file, one line at a time.
+
+        A line that is not a CV record (invalid JSON or UTF-8, no `id` key, or a `text` that is not a string) is
+        reported and yielded with None as its text, under its record id or, failing that, `<path>:<line number>`.
+
+        Args:
+            jsonl_path (str): The path to a file with one `{"id": ..., "text": ...}` object per line.
+            ids (set, optional): The identifiers of the only records to yield.
+
+        Yields:
+            tuple: The record id and its text (or None).
+        """
+        with open(jsonl_path, "rb") as file:
+            for line_number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                cv_id, text = f"{jsonl_path}:{line_number}", None
+                try:
+                    record = json.loads(line.decode("utf-8"))
+                    if not isinstance(record, dict) or "id" not in record:
+                        raise ValueError("expected a JSON object with an 'id' key")
+                    cv_id, text = str(record["id"]), record.get("text")
+                    if text is not None and not isinstance(text, str):
+                        raise ValueError(f"its text is a {type(text).__name__}, not a string")
+                    text = (text or "").strip() or None
+                except ValueError as e:  # Including JSON and UTF-8 decoding errors
+                    click.echo(f"Error: Line {line_number} of {jsonl_path} is not a CV record: {e}")
+                    text = None
+                if ids is None or cv_id in ids:
+                    yield cv_id, text
+
+    @staticmethod
+    def _read(name, read, *args, **kwargs):
+        """Returns the text read by `read(*args, **kwargs)`, or None after reporting why it could not be read.
+
+        A corrupt PDF (pypdf raises its own errors), an unreadable file or a non-UTF-8 text file only fails its
+        own record, instead of ending the stream of records.
+        """
+        try:
+            return read(*args, **kwargs)
+        except Exception as e:
+            click.echo(f"Error: The CV {name} could not be read: {type(e).__name__}: {e}")
+            return None
@@ -0,0 +1,339 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+from cv_to_role_analyzer.batch import BatchRunner
+
+
+class JobStore:
+    """
+    A persistent store of batch jobs and of the state of each of their CV x role pairs, backed by SQLite.
+
+    Every state change (pending, running, done, failed or filtered) is committed immediately, so a job can
+    be resumed after a crash. The CV and role texts are never stored: a job records where its inputs come
+    from, and each pair records its manifest entry and, once done, its analysis result.
+
+    Attributes:
+        path (str): The path to the SQLite database file.
+
+    Methods:
+        default_path(): Returns the store location, honoring the CV_ANALYZER_JOBS environment variable.
+        save_job(job_id, params): Creates a job or updates its parameters.
+        job(job_id): Returns a job and its parameters.
+        jobs(): Returns every job with its pair counts.
+        get(job_id, cv_id, role_id): Returns the state of a pair.
+        update(job_id, cv_id, role_id, status, entry, result): Records the state of a pair.
+        entries(job_id): Returns the manifest entries of every pair of a job.
+        status(job_id): Returns the number of pairs of a job in each state.
+        failed_pairs(job_id): Returns the failed pairs of a job and their errors.
+    """
+
+    STATUSES = ("pending", "running", "done", "failed", "filtered")
+
+    def __init__(self, path=None):
+        """
+        Opens (and creates if needed) the job store database.
+
+        Args:
+            path (str, optional): The path to the SQLite database file, defaults to `default_path()`.
+        """
+        self.path = path or JobStore.default_path()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")  # Each commit is durable without rewriting the file
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "job_id TEXT PRIMARY KEY, params TEXT NOT NULL, created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS pairs ("
+                "job_id TEXT NOT NULL, cv_id TEXT NOT NULL, role_id TEXT NOT NULL, status TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, entry TEXT, result TEXT, updated_at REAL NOT NULL, "
+                "PRIMARY KEY (job_id, cv_id, role_id))"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS pairs_status ON pairs (job_id, status)")
+
+    @staticmethod
+    def default_path():
+        """Returns the store location, honoring the CV_ANALYZER_JOBS environment variable.
+
+        Returns:
+            str: The path to the SQLite database file.
+        """
+        return os.getenv("CV_ANALYZER_JOBS") or os.path.join(
+            os.path.expanduser("~"), ".cache", "cv_analyzer", "jobs.sqlite3"
+        )
+
+    def save_job(self, job_id, params):
+        """Creates a job or updates its parameters.
+
+        Args:
+            job_id (str): The name of the job.
+            params (dict): The parameters needed to rerun the job (input locations and options).
+        """
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO jobs VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (job_id) DO UPDATE SET params = excluded.params, updated_at = excluded.updated_at",
+                (job_id, json.dumps(params), now, now),
+            )
+
+    def job(self, job_id):
+        """Returns a job and its parameters.
+
+        Args:
+            job_id (str): The name of the job.
+
+        Returns:
+            dict: The job name, parameters and timestamps, or None if the job does not exist.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT params, created_at, updated_at FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"job": job_id, "params": json.loads(row[0]), "created_at": JobStore._iso(row[1]),
+                "updated_at": JobStore._iso(row[2])}
+
+    def jobs(self):
+        """Returns every job with its pair counts, most recently updated first.
+
+        Returns:
+            list: One dict per job, with its name, update time and the number of pairs in each state.
+        """
+        with self._lock:
+            job_ids = [row[0] for row in self._connection.execute("SELECT job_id FROM jobs ORDER BY updated_at DESC")]
+        return [{"job": job_id, **self.status(job_id)} for job_id in job_ids]
+
+    def get(self, job_id, cv_id, role_id):
+        """Returns the state of a pair.
+
+        Args:
+            job_id (str): The name of the job.
+            cv_id (str): The identifier of the CV.
+            role_id (str): The identifier of the job role.
+
+        Returns:
+            dict: The status, attempts, manifest entry and result of the pair, or None if it is unknown.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT status, attempts, entry, result FROM pairs WHERE job_id = ? AND cv_id = ? AND role_id = ?",
+                (job_id, cv_id, role_id),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"status": row[0], "attempts": row[1], "entry": json.loads(row[2]) if row[2] else None,
+                "result": row[3]}
+
+    def update(self, job_id, cv_id, role_id, status, entry=None, result=None):
+        """Records the state of a pair and commits it immediately.
+
+        Moving a pair to `running` counts one more attempt. The previous entry and result are kept unless
+        new ones are given.
+
+        Args:
+            job_id (str): The name of the job.
+            cv_id (str): The identifier of the CV.
+            role_id (str): The identifier of the job role.
+            status (str): The new state, one of `STATUSES`.
+            entry (dict, optional): The manifest entry of the pair.
+            result (str, optional): The JSON analysis report of the pair.
+        """
+        if status not in JobStore.STATUSES:
+            raise ValueError(f"Unknown pair status '{status}'.")
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO pairs VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (job_id, cv_id, role_id) DO UPDATE SET status = excluded.status, "
+                "attempts = pairs.attempts + excluded.attempts, entry = COALESCE(excluded.entry, pairs.entry), "
+                "result = COALESCE(excluded.result, pairs.result), updated_at = excluded.updated_at",
+                (job_id, cv_id, role_id, status, int(status == "running"),
+                 json.dumps(entry, ensure_ascii=False) if entry is not None else None, result, now),
+            )
+            self._connection.execute("UPDATE jobs SET updated_at = ? WHERE job_id = ?", (now, job_id))
+
+    def entries(self, job_id):
+        """Returns the manifest entries of every pair of a job, sorted by CV and role.
+
+        Args:
+            job_id (str): The name of the job.
+
+        Returns:
+            list: The entries; pairs that never finished get an entry with their current status.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT cv_id, role_id, status, attempts, entry FROM pairs WHERE job_id = ? ORDER BY cv_id, role_id",
+                (job_id,),
+            ).fetchall()
+        entries = []
+        for cv_id, role_id, status, attempts, entry in rows:
+            entry = json.loads(entry) if entry and status in ("done", "failed", "filtered") else \
+                {"cv": cv_id, "role": role_id, "output": None, "status": status}
+            entries.append({**entry, "attempts": attempts})
+        return entries
+
+    def status(self, job_id):
+        """Returns the number of pairs of a job in each state.
+
+        Args:
+            job_id (str): The name of the job.
+
+        Returns:
+            dict: The total number of pairs and the number in each state.
+        """
+        with self._lock:
+            counts = dict(self._connection.execute(
+                "SELECT status, COUNT(*) FROM pairs WHERE job_id = ? GROUP BY status", (job_id,)
+            ).fetchall())
+        return {"total": sum(counts.values()), **{status: counts.get(status, 0) for status in JobStore.STATUSES}}
+
+    def failed_pairs(self, job_id):
+        """Returns the failed pairs of a job and their errors.
+
+        Args:
+            job_id (str): The name of the job.
+
+        Returns:
+            list: One `(cv_id, role_id, error)` tuple per failed pair.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT cv_id, role_id, entry FROM pairs WHERE job_id = ? AND status = 'failed' "
+                "ORDER BY cv_id, role_id",
+                (job_id,),
+            ).fetchall()
+        return [(cv_id, role_id, (json.loads(entry) if entry else {}).get("error")) for cv_id, role_id, entry in rows]
+
+    def close(self):
+        """Closes the database connection."""
+        with self._lock:
+            self._connection.close()
+
+    @staticmethod
+    def _iso(timestamp):
+        """Formats a POSIX timestamp as an ISO 8601 UTC date."""
+        return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+class JobRunner(BatchRunner):
+    """
+    A batch runner that checkpoints every pair in a `JobStore` so that an interrupted job can be resumed.
+
+    Each pair is recorded as pending when queued, running when its analysis starts, and done or failed
+    once it ends, with its result committed at once. When the same job is run again, the pairs already
+    done are not analyzed again: their stored entries go straight to the manifest, and their result files
+    are restored if missing. Only unfinished and failed pairs, or only failed ones with `redo=("failed",)`,
+    are analyzed. The manifest covers every pair of the job, including those finished by earlier runs.
+
+    Attributes:
+        store (JobStore): The job store.
+        job_id (str): The name of the job.
+        redo (tuple): The states of the pairs analyzed again.
+        include_new (bool): Whether pairs not yet in the store are analyzed.
+
+    Methods:
+        run(records, roles): Analyzes the pairs that are not done and writes the job manifest.
+    """
+
+    def __init__(self, store, job_id, output_dir, redo=("pending", "running", "failed", "filtered"),
+                 include_new=True, **kwargs):
+        """
+        Initializes the JobRunner.
+
+        Args:
+            store (JobStore): The job store.
+            job_id (str): The name of the job, which must have been saved in the store.
+            output_dir (str): The directory where result files and the manifest are written.
+            redo (tuple): The states of the pairs analyzed again.
+            include_new (bool): Whether pairs not yet in the store are analyzed.
+            **kwargs: The other `BatchRunner` options.
+        """
+        super().__init__(output_dir, **kwargs)
+        self._reports = threading.local()  # The report of the pair analyzed by the current worker thread
+        self.store = store
+        self.job_id = job_id
+        self.redo = redo
+        self.include_new = include_new
+
+    def run(self, records, roles):
+        """Analyzes the pairs that are not done and writes the manifest of the whole job.
+
+        Args:
+            records (iterable): The `(cv_id, cv_text)` records, consumed lazily.
+            roles (dict): The job roles, as texts or PreparedRole objects, keyed by role identifier.
+
+        Returns:
+            dict: The job manifest, also written to `manifest.json` in the output directory.
+        """
+        started_at = datetime.now(timezone.utc).isoformat()
+        super().run(records, roles)
+
+        entries = self.store.entries(self.job_id)
+        manifest = {
+            "job": self.job_id,
+            "started_at": started_at,
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "total": len(entries),
+            "succeeded": sum(1 for entry in entries if entry["status"] == "ok"),
+            "filtered": sum(1 for entry in entries if entry["status"] == "filtered"),
+            "failed": sum(1 for entry in entries if entry["status"] == "failed"),
+            "unfinished": sum(1 for entry in entries if entry["status"] in ("pending", "running")),
+            "results": entries,
+        }
+        with open(os.path.join(self.output_dir, self.MANIFEST_NAME), "w", encoding="utf-8") as f:
+            f.write(json.dumps(manifest, indent=4, ensure_ascii=False))
+        return manifest
+
+    def _submit(self, executor, pending, entries, cv_id, cv_text, role_id, role_text, score):
+        """Queues a pair unless it is done or not selected, recording it as pending."""
+        state = self.store.get(self.job_id, cv_id, role_id)
+        if state is None and not self.include_new:
+            return
+        if state is not None and state["status"] not in self.redo:
+            if state["status"] == "done":
+                self._restore_output(state)
+            return
+        self.store.update(self.job_id, cv_id, role_id, "pending")
+        super()._submit(executor, pending, entries, cv_id, cv_text, role_id, role_text, score)
+
+    def _filtered_entry(self, cv_id, role_id, score, reason):
+        """Returns the entry of a pair skipped by the local prefilter, recording it unless it is done."""
+        entry = BatchRunner._filtered_entry(cv_id, role_id, score, reason)
+        state = self.store.get(self.job_id, cv_id, role_id)
+        if state is None or state["status"] in self.redo:
+            self.store.update(self.job_id, cv_id, role_id, "filtered", entry=entry)
+        return entry
+
+    def _run_pair(self, cv_id, cv_text, role_id, role_text, score=None):
+        """Analyzes a pair, committing its running state first and its outcome and result at the end."""
+        self.store.update(self.job_id, cv_id, role_id, "running")
+        self._reports.value = None
+        entry = super()._run_pair(cv_id, cv_text, role_id, role_text, score)
+        result = self._reports.value if entry["status"] == "ok" else None
+        self.store.update(self.job_id, cv_id, role_id, "done" if result is not None else "failed", entry=entry,
+                          result=result)
+        return entry
+
+    def _write_result(self, entry, json_report):
+        """Writes the report of a pair, keeping it to be committed to the store with the pair's outcome."""
+        super()._write_result(entry, json_report)
+        self._reports.value = json_report
+
+    def _restore_output(self, state):
+        """Rewrites the result file of a done pair if it is missing from the output directory."""
+        path = os.path.join(self.output_dir, state["entry"]["output"])
+        if self.sink is not None:
+            return  # The sink is append-only and already holds the results of earlier runs
+        if state["result"] is not None and not os.path.exists(path):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(state["result"])
@@ -1,12 +1,23 @@
+import asyncio
+import contextlib
 import copy
 import json
 import os
 import re
+import threading
 
 import click
-from dotenv import load_dotenv
-from google.genai import Client, errors
-from google.genai.types import Content, Part
+from cv_to_role_analyzer.ratelimit import RequestScheduler
+from cv_to_role_analyzer.report import AnalysisReport
+from cv_to_role_analyzer.streaming import FieldStream
+from cv_to_role_analyzer.tracing import Tracer
+from cv_to_role_analyzer.utils import LazyModule, TokenCounter
+
+# Imported on first use: the Gemini SDK alone takes most of the CLI's startup time
+dotenv = LazyModule("dotenv")
+genai = LazyModule("google.genai")
+errors = LazyModule("google.genai.errors")
+types = LazyModule("google.genai.types")
 
 
 class LLMClient:
@@ -16,124 +27,743 @@ class LLMClient:
     This class handles the process of generating an optimized prompt, calling the Gemini API to analyze the match,
     refining the prompt if the response is incomplete, and processing the response.
 
+    A single Gemini client is created lazily on first use and shared by every caller in the process, so the
+    `.env` file is read once and HTTP connections are pooled and reused across analyses. Every API call goes
+    through a shared `RequestScheduler`, which enforces the request and token budgets and retries transient
+    transport failures; retries caused by incomplete responses are counted separately.
+
+    The model is asked for JSON following `AnalysisReport.RESPONSE_SCHEMA`. Its output is validated locally
+    in one pass, near-valid JSON is repaired locally, and a refined prompt is only sent when required fields
+    are genuinely missing.
+
+    Attributes:
+        MODEL_NAME (str): The Gemini model used for analysis.
+        PROMPT_VERSION (str): The version of the prompt template, bumped whenever the prompt changes.
+
     Methods:
-        analyze_match(cv_text, role_text):
+        get_client():
+            Returns the shared Gemini client, creating it on first use.
+
+        set_client(client):
+            Replaces the shared Gemini client, e.g. with a stand-in for offline tests.
+
+        get_scheduler():
+            Returns the shared request scheduler, creating it from the environment on first use.
+
+        set_scheduler(scheduler):
+            Replaces the shared request scheduler.
+
+        stats():
+            Returns the counters of the scheduler and of the response parsing paths.
+
+        analyze_match(cv_text, role_text, previous, removed):
             Analyzes the CV against the job description by generating a prompt, calling the Gemini API, and refining
-            the prompt if necessary.
+            the prompt if necessary. With a previous analysis, only the revised sections of the CV are sent.
+
+        analyze_match_async(cv_text, role_text, timeout):
+            Asynchronous counterpart of `analyze_match`, built on the Gemini async client.
+
+        analyze_match_stream(cv_text, role_text, on_field):
+            Streaming counterpart of `analyze_match`, emitting each field of the analysis as soon as it is parsed.
+
+        stream_match_async(cv_text, role_text, timeout):
+            Async iterator counterpart of `analyze_match_stream`.
 
-        _generate_prompt(cv_text, role_text):
+        _generate_prompt(cv_text, role_text, previous, removed):
             Creates an optimized LLM prompt using few-shot learning and structured reasoning.
 
-        _call_llm_api(prompt):
+        _prompt_prefix(role_text):
+            Creates the role-specific prompt parts shared by every CV analyzed against the same role.
+
+        _generation_config(role_text):
+            Returns the generation config requesting schema-conforming JSON output.
+
+        _call_llm_api(prompt, config):
             Calls the Gemini API with the given prompt and parses the response into a dictionary.
 
+        _call_llm_api_async(prompt, timeout, config):
+            Asynchronous counterpart of `_call_llm_api`.
+
+        _call_llm_api_stream(prompt, config, stream, on_field):
+            Streaming counterpart of `_call_llm_api`, parsing the answer incrementally.
+
         _refine_prompt(prompt, response):
             Refines the prompt if the initial LLM response is incomplete.
     """
 
+    MODEL_NAME = "gemini-2.0-flash"
+    PROMPT_VERSION = "3"
+
+    # Expected size of the JSON answer, added to the prompt size when reserving tokens-per-minute budget
+    RESPONSE_TOKENS_ESTIMATE = 800
+
+    _client = None
+    _client_lock = threading.Lock()
+    _scheduler = None
+    _counters = {"valid": 0, "repaired": 0, "invalid": 0, "incomplete_retries": 0}
+
+    @staticmethod
+    def get_client():
+        """
+        Returns the shared Gemini client, creating it on first use.
+
+        The environment (including the `.env` file) is loaded only when the client is created. The client is
+        thread-safe and keeps a pool of HTTP connections that is reused by every subsequent call.
+
+        Returns:
+            Client: The shared Gemini client.
+
+        Raises:
+            ValueError: If the GEMINI_API_KEY environment variable is not set.
+        """
+        if LLMClient._client is None:
+            with LLMClient._client_lock:
+                if LLMClient._client is None:
+                    # Load environment variables from .env file and get API key from environment
+                    dotenv.load_dotenv()
+                    api_key = os.getenv("GEMINI_API_KEY")
+                    if not api_key:
+                        raise ValueError("GEMINI_API_KEY environment variable not set. Please check your "
+                                         "environment configuration.")
+                    LLMClient._client = genai.Client(api_key=api_key)
+        return LLMClient._client
+
     @staticmethod
-    def analyze_match(cv_text, role_text):
+    def set_client(client):
+        """
+        Replaces the shared Gemini client.
+
+        Any object exposing `models.generate_content` can be injected, which allows running the analysis
+        offline with a stand-in client. Passing None resets the client so it is recreated on next use.
+
+        Args:
+            client (Client): The client to share, or None to reset.
+        """
+        with LLMClient._client_lock:
+            LLMClient._client = client
+
+    @staticmethod
+    def get_scheduler():
+        """
+        Returns the shared request scheduler, creating it from the environment on first use.
+
+        Returns:
+            RequestScheduler: The scheduler pacing and retrying every Gemini call of the process.
+        """
+        if LLMClient._scheduler is None:
+            with LLMClient._client_lock:
+                if LLMClient._scheduler is None:
+                    LLMClient._scheduler = RequestScheduler.from_env()
+        return LLMClient._scheduler
+
+    @staticmethod
+    def set_scheduler(scheduler):
+        """
+        Replaces the shared request scheduler.
+
+        Args:
+            scheduler (RequestScheduler): The scheduler to share, or None to recreate it from the environment.
+        """
+        with LLMClient._client_lock:
+            LLMClient._scheduler = scheduler
+
+    @staticmethod
+    def stats():
+        """
+        Returns the counters of the scheduler and of the response parsing paths.
+
+        Returns:
+            dict: The scheduler counters, plus how many responses were valid JSON (`valid`), were repaired
+                locally (`repaired`), could not be parsed (`invalid`), and how many calls were repeated with a
+                refined prompt because required fields were missing (`incomplete_retries`).
+        """
+        with LLMClient._client_lock:
+            counters = dict(LLMClient._counters)
+        return {**LLMClient.get_scheduler().stats(), **counters}
+
+    @staticmethod
+    def _count(name):
+        """Increments one of the LLMClient counters."""
+        with LLMClient._client_lock:
+            LLMClient._counters[name] += 1
+
+    @staticmethod
+    def analyze_match(cv_text, role_text, previous=None, removed=()):
         """
         Generates an optimized prompt and calls Gemini API.
 
+        When the analysis of an earlier version of the CV is given, `cv_text` only holds the sections revised
+        since, and the model is asked to update that analysis rather than to start over.
+
         Args:
-            cv_text (str): The CV text to analyze.
-            role_text (str): The job description text.
+            cv_text (str): The CV text to analyze, or its revised sections.
+            role_text (str or PreparedRole): The job description text, or a role prepared once for many CVs.
+            previous (dict, optional): The analysis of the earlier version of the CV.
+            removed (list): The names of the sections removed since the earlier version.
 
         Returns:
             dict: The response from the Gemini API containing match score, skill gaps, and recommendations.
         """
+        with Tracer.span("prompt.build"):
+            prompt = LLMClient._generate_prompt(cv_text, role_text, previous, removed)
+            config = LLMClient._generation_config(role_text)
+        response = LLMClient._call_llm_api(prompt, config)
 
-        prompt = LLMClient._generate_prompt(cv_text, role_text)
-        response = LLMClient._call_llm_api(prompt)
+        # If response lacks required fields, retry with a refined prompt
+        if LLMClient._needs_refinement(response):
+            LLMClient._count("incomplete_retries")
+            Tracer.count("llm_refine_retries")
+            with Tracer.span("llm.refine"):
+                response = LLMClient._call_llm_api(LLMClient._refine_prompt(prompt, response), config)
+
+        return response
+
+    @staticmethod
+    async def analyze_match_async(cv_text, role_text, timeout=None):
+        """
+        Generates an optimized prompt and calls the Gemini API asynchronously.
+
+        This is the asyncio-native counterpart of `analyze_match`, with the same refine-and-retry semantics.
+        Many analyses can be kept in flight on a single event loop. Cancelling the awaiting task cancels the
+        in-flight API request.
+
+        Args:
+            cv_text (str): The CV text to analyze.
+            role_text (str or PreparedRole): The job description text, or a role prepared once for many CVs.
+            timeout (float, optional): The maximum number of seconds to wait for each API call.
+
+        Returns:
+            dict: The response from the Gemini API containing match score, skill gaps, and recommendations.
+        """
+        with Tracer.span("prompt.build"):
+            prompt = LLMClient._generate_prompt(cv_text, role_text)
+            config = LLMClient._generation_config(role_text)
+        response = await LLMClient._call_llm_api_async(prompt, timeout, config)
 
         # If response lacks required fields, retry with a refined prompt
-        if not response or not {"match_score", "skill_gap", "recommendations"}.issubset(response.keys()):
-            response = LLMClient._call_llm_api(LLMClient._refine_prompt(prompt, response))
-            return response
+        if LLMClient._needs_refinement(response):
+            LLMClient._count("incomplete_retries")
+            Tracer.count("llm_refine_retries")
+            with Tracer.span("llm.refine"):
+                response = await LLMClient._call_llm_api_async(
+                    LLMClient._refine_prompt(prompt, response), timeout, config
+                )
 
-        if len(response["skill_gap"]) > 0 and len(response["recommendations"]) == 0:
-            response = LLMClient._call_llm_api(LLMClient._refine_prompt(prompt, response))
-            return response
+        return response
 
+    @staticmethod
+    def analyze_match_stream(cv_text, role_text, on_field=None):
+        """
+        Analyzes the CV against the job description from the model's streamed output.
+
+        The JSON answer is parsed while it arrives: the match score is emitted as soon as it is complete,
+        followed by each skill gap and recommendation, then by a final `report` event holding the complete
+        analysis. Each event carries the seconds elapsed since the request was sent, so the time to the first
+        field is measured apart from the total latency; both are also recorded as the `llm.first_field` and
+        `llm.call` tracer stages. Incomplete answers are refined and retried as in `analyze_match`.
+
+        Args:
+            cv_text (str): The CV text to analyze.
+            role_text (str or PreparedRole): The job description text, or a role prepared once for many CVs.
+            on_field (callable, optional): Called with each FieldEvent as soon as it is available.
+
+        Returns:
+            dict: The complete analysis, as returned by `analyze_match`.
+        """
+        on_field = on_field or (lambda event: None)
+        with Tracer.span("prompt.build"):
+            prompt = LLMClient._generate_prompt(cv_text, role_text)
+            config = LLMClient._generation_config(role_text)
+        stream = FieldStream()
+        response = LLMClient._call_llm_api_stream(prompt, config, stream, on_field)
+
+        if LLMClient._needs_refinement(response):
+            LLMClient._count("incomplete_retries")
+            Tracer.count("llm_refine_retries")
+            with Tracer.span("llm.refine"):
+                response = LLMClient._call_llm_api(LLMClient._refine_prompt(prompt, response), config)
+
+        for event in stream.finish(response):
+            on_field(event)
         return response
 
     @staticmethod
-    def _generate_prompt(cv_text, role_text):
+    async def stream_match_async(cv_text, role_text, timeout=None):
         """
-        Creates a LLM prompt.
+        Analyzes the CV against the job description from the model's streamed output, as an async iterator.
+
+        This is the asyncio-native counterpart of `analyze_match_stream`: the same FieldEvent objects are
+        yielded as soon as they are available, the last one being the `report` event.
 
         Args:
             cv_text (str): The CV text to analyze.
-            role_text (str): The job description text.
+            role_text (str or PreparedRole): The job description text, or a role prepared once for many CVs.
+            timeout (float, optional): The maximum number of seconds to wait for each chunk of the answer.
+
+        Yields:
+            FieldEvent: The fields of the analysis, then the complete analysis.
+        """
+        with Tracer.span("prompt.build"):
+            prompt = LLMClient._generate_prompt(cv_text, role_text)
+            config = LLMClient._generation_config(role_text)
+        stream = FieldStream()
+        events = asyncio.Queue()
+        call = asyncio.ensure_future(
+            LLMClient._call_llm_api_stream_async(prompt, timeout, config, stream, events.put_nowait)
+        )
+        try:
+            while not call.done() or not events.empty():
+                waiter = asyncio.ensure_future(events.get())
+                await asyncio.wait({waiter, call}, return_when=asyncio.FIRST_COMPLETED)
+                if waiter.done():
+                    yield waiter.result()
+                else:
+                    waiter.cancel()
+            response = call.result()
+        finally:
+            call.cancel()
+
+        if LLMClient._needs_refinement(response):
+            LLMClient._count("incomplete_retries")
+            Tracer.count("llm_refine_retries")
+            with Tracer.span("llm.refine"):
+                response = await LLMClient._call_llm_api_async(LLMClient._refine_prompt(prompt, response), timeout,
+                                                               config)
+
+        for event in stream.finish(response):
+            yield event
+
+    @staticmethod
+    def _needs_refinement(response):
+        """
+        Checks whether a response is incomplete and should be retried with a refined prompt.
+
+        Args:
+            response (dict): The parsed response, or None if the call failed.
+
+        Returns:
+            bool: True if required fields are missing, or if skill gaps come without recommendations.
+        """
+        if not response or not set(AnalysisReport.REQUIRED_FIELDS).issubset(response.keys()):
+            return True
+        return len(response["skill_gaps"]) > 0 and len(response["recommendations"]) == 0
+
+    @staticmethod
+    def _generate_prompt(cv_text, role_text, previous=None, removed=()):
+        """
+        Creates a LLM prompt.
+
+        The role-specific parts come first so that they form a prefix shared by every CV analyzed against the
+        same role. When the role is a `PreparedRole`, its prebuilt prefix is reused, and it is left out of the
+        prompt entirely if it is already held in the provider's context cache. When a previous analysis is
+        given, it follows the prefix as context and the CV text is labeled as the revised sections.
+
+        Args:
+            cv_text (str): The CV text to analyze, or its revised sections.
+            role_text (str or PreparedRole): The job description text, or a role prepared once for many CVs.
+            previous (dict, optional): The analysis of an earlier version of the CV.
+            removed (list): The names of the sections removed since the earlier version.
 
         Returns:
             Content: The optimized LLM prompt.
         """
-        prompt = Content(parts=[
+        if isinstance(role_text, str):
+            prefix = LLMClient._prompt_prefix(role_text)
+        else:
+            prefix = [] if role_text.cached_content else role_text.prompt_prefix
+
+        if previous is None:
+            prompt = types.Content(parts=[
+                *prefix,
+                # CV Text
+                types.Part(text=f"CV Text: \n{cv_text}"),
+            ])
+            return prompt
+
+        prompt = types.Content(parts=[
+            *prefix,
+            # Previous analysis, kept for the sections that did not change
+            types.Part(text=f"Previous analysis of an earlier version of this CV: \n{json.dumps(previous)}"),
+            types.Part(text=(
+                "The candidate revised their CV. Update the previous analysis: keep its findings for the unchanged "
+                "sections, re-evaluate the revised sections below, and answer with the complete updated JSON object."
+                + (f" Sections removed since: {', '.join(removed)}." if removed else "")
+            )),
+            # Revised CV sections
+            types.Part(text=f"Revised CV Sections: \n{cv_text}"),
+        ])
+
+        return prompt
+
+    @staticmethod
+    def _prompt_prefix(role_text):
+        """
+        Creates the role-specific prompt parts, shared by every CV analyzed against the same role.
+
+        Args:
+            role_text (str): The job description text.
+
+        Returns:
+            list: The role, instructions and role description prompt parts.
+        """
+        return [
             # Role
-            Part(text="You are an advanced AI specializing in CV analysis."),
+            types.Part(text="You are an advanced AI specializing in CV analysis."),
             # Instructions
-            Part(text=(
+            types.Part(text=(
                 f"Identify *all* significant skill gaps, even if there are many. Do not omit any important gaps. "
                 f"Evaluate the candidate’s CV against the job description and provide the results in JSON format with "
                 f"the following keys:"
                 f"\n- {repr('match_score')} (integer, 0-100)"
                 f"\n- {repr('skill_gaps')} (list of dictionaries, each with {repr('category')} and {repr('gap')} keys)"
                 f"\n- {repr('recommendations')} (list of strings)"
-                f"\n\nUse structured reasoning before generating the JSON. Ensure the JSON is valid and parsable."
+                f"\n\nReason carefully about the CV and the role, then answer with the JSON object only."
             )),
-            # CV Text
-            Part(text=f"CV Text: \n{cv_text}"),
             # Role Description
-            Part(text=f"Role Description: \n{role_text}"),
-        ])
+            types.Part(text=f"Role Description: \n{role_text}"),
+        ]
 
-        return prompt
+    @staticmethod
+    def _generation_config(role_text):
+        """
+        Returns the generation config requesting schema-conforming JSON output.
+
+        Args:
+            role_text (str or PreparedRole): The job description text, or a role prepared once for many CVs.
+
+        Returns:
+            GenerateContentConfig: The config declaring the response schema and, if the role's prompt prefix is
+                held in the provider's context cache, referencing that cache.
+        """
+        return types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=AnalysisReport.RESPONSE_SCHEMA,
+            cached_content=None if isinstance(role_text, str) else role_text.cached_content,
+        )
 
     @staticmethod
-    def _call_llm_api(prompt):
+    def _call_llm_api(prompt, config=None):
         """
         Calls the Gemini API with the given prompt, parses the JSON response, and returns it as a dictionary.
 
         Args:
             prompt (Content): The prompt content to send to the API.
+            config (GenerateContentConfig, optional): The generation config, e.g. referencing a context cache.
 
         Returns:
             dict: The parsed JSON response from the Gemini API, or None if error.
         """
         try:
-            # Load environment variables from .env file and get API key from environment
-            load_dotenv()
-            api_key = os.getenv("GEMINI_API_KEY")
-            if not api_key:
-                raise ValueError("GEMINI_API_KEY environment variable not set. Please check your environment "
-                                 "configuration.")
-
-            # Initialize Gemini client and generate content
-            client = Client(api_key=api_key)
-            response = client.models.generate_content(model="gemini-2.0-flash", contents=prompt)
-
-            # Extract response text, find JSON object, parse, and return
-            response_text = response.candidates[0].content.parts[0].text
-            match = re.search(r"{.*}", response_text, re.DOTALL)
-            return json.loads(match.group(0))
-
-        except (
+            # Reuse the shared Gemini client and generate content within the request and token budgets
+            client = LLMClient.get_client()
+            with Tracer.span("llm.call"):
+                response = LLMClient.get_scheduler().call(
+                    lambda: client.models.generate_content(model=LLMClient.MODEL_NAME, contents=prompt, config=config),
+                    LLMClient._estimate_tokens(prompt),
+                )
+            LLMClient._record_usage(prompt, response)
+            with Tracer.span("llm.parse"):
+                return LLMClient._parse_response(response)
+        except Exception as e:
+            LLMClient._report_error(e)
+
+    @staticmethod
+    async def _call_llm_api_async(prompt, timeout=None, config=None):
+        """
+        Calls the Gemini API asynchronously with the given prompt and returns the parsed JSON response.
+
+        Args:
+            prompt (Content): The prompt content to send to the API.
+            timeout (float, optional): The maximum number of seconds to wait for the response.
+            config (GenerateContentConfig, optional): The generation config, e.g. referencing a context cache.
+
+        Returns:
+            dict: The parsed JSON response from the Gemini API, or None if error or timeout.
+
+        Raises:
+            asyncio.CancelledError: If the awaiting task is cancelled.
+        """
+        try:
+            client = LLMClient.get_client()
+            with Tracer.span("llm.call"):
+                response = await LLMClient.get_scheduler().call_async(
+                    lambda: asyncio.wait_for(
+                        client.aio.models.generate_content(model=LLMClient.MODEL_NAME, contents=prompt, config=config),
+                        timeout
+                    ),
+                    LLMClient._estimate_tokens(prompt),
+                )
+            LLMClient._record_usage(prompt, response)
+            with Tracer.span("llm.parse"):
+                return LLMClient._parse_response(response)
+        except Exception as e:
+            LLMClient._report_error(e)
+
+    @staticmethod
+    def _call_llm_api_stream(prompt, config, stream, on_field):
+        """
+        Calls the Gemini streaming API with the given prompt, emitting each field as soon as it is parsed.
+
+        Only opening the stream is paced and retried by the scheduler: once fields have been emitted, a failed
+        stream is not replayed.
+
+        Args:
+            prompt (Content): The prompt content to send to the API.
+            config (GenerateContentConfig): The generation config.
+            stream (FieldStream): The parser and clock of the streamed answer.
+            on_field (callable): Called with each FieldEvent.
+
+        Returns:
+            dict: The parsed JSON response from the Gemini API, or None if error.
+        """
+        try:
+            client = LLMClient.get_client()
+            with Tracer.span("llm.call"), contextlib.ExitStack() as first_field:
+                first_field.enter_context(Tracer.span("llm.first_field"))
+
+                def open_stream():
+                    chunks = iter(client.models.generate_content_stream(
+                        model=LLMClient.MODEL_NAME, contents=prompt, config=config
+                    ))
+                    return chunks, next(chunks, None)  # The request is only sent when the first chunk is read
+
+                chunks, chunk = LLMClient.get_scheduler().call(open_stream, LLMClient._estimate_tokens(prompt))
+                last = chunk
+                while chunk is not None:
+                    last = chunk
+                    for event in stream.feed(chunk.text or ""):
+                        first_field.close()
+                        on_field(event)
+                    chunk = next(chunks, None)
+            return LLMClient._finish_stream(prompt, stream, last)
+        except Exception as e:
+            LLMClient._report_error(e)
+
+    @staticmethod
+    async def _call_llm_api_stream_async(prompt, timeout, config, stream, on_field):
+        """
+        Calls the Gemini streaming API asynchronously, emitting each field as soon as it is parsed.
+
+        Args:
+            prompt (Content): The prompt content to send to the API.
+            timeout (float, optional): The maximum number of seconds to wait for each chunk.
+            config (GenerateContentConfig): The generation config.
+            stream (FieldStream): The parser and clock of the streamed answer.
+            on_field (callable): Called with each FieldEvent.
+
+        Returns:
+            dict: The parsed JSON response from the Gemini API, or None if error or timeout.
+
+        Raises:
+            asyncio.CancelledError: If the awaiting task is cancelled.
+        """
+        try:
+            client = LLMClient.get_client()
+            with Tracer.span("llm.call"), contextlib.ExitStack() as first_field:
+                first_field.enter_context(Tracer.span("llm.first_field"))
+
+                async def open_stream():
+                    chunks = await client.aio.models.generate_content_stream(
+                        model=LLMClient.MODEL_NAME, contents=prompt, config=config
+                    )
+                    return chunks, await LLMClient._next_chunk(chunks, timeout)
+
+                chunks, chunk = await LLMClient.get_scheduler().call_async(
+                    lambda: asyncio.wait_for(open_stream(), timeout), LLMClient._estimate_tokens(prompt)
+                )
+                last = chunk
+                while chunk is not None:
+                    last = chunk
+                    for event in stream.feed(chunk.text or ""):
+                        first_field.close()
+                        on_field(event)
+                    chunk = await LLMClient._next_chunk(chunks, timeout)
+            return LLMClient._finish_stream(prompt, stream, last)
+        except Exception as e:
+            LLMClient._report_error(e)
+
+    @staticmethod
+    async def _next_chunk(chunks, timeout):
+        """Returns the next chunk of an async stream, or None at its end."""
+        try:
+            return await asyncio.wait_for(chunks.__anext__(), timeout)
+        except StopAsyncIteration:
+            return None
+
+    @staticmethod
+    def _finish_stream(prompt, stream, last):
+        """Records the usage of a streamed call and parses its complete text."""
+        if last is None:
+            raise json.JSONDecodeError("The streamed response is empty", "", 0)
+        LLMClient._record_usage(prompt, last, stream.parser.text)
+        with Tracer.span("llm.parse"):
+            return AnalysisReport.normalize(LLMClient._parse_json(stream.parser.text))[0]
+
+    @staticmethod
+    def _estimate_tokens(prompt):
+        """
+        Estimates the tokens consumed by a call: the prompt plus the expected size of the answer.
+
+        Args:
+            prompt (Content): The prompt content to send to the API.
+
+        Returns:
+            int: The estimated number of tokens.
+        """
+        return sum(TokenCounter.estimate(part.text) for part in prompt.parts) + LLMClient.RESPONSE_TOKENS_ESTIMATE
+
+    @staticmethod
+    def _record_usage(prompt, response, text=None):
+        """
+        Counts the tokens sent and received by a call, as reported by the API or else estimated.
+
+        Args:
+            prompt (Content): The prompt sent to the API.
+            response (GenerateContentResponse): The response returned by the API, or the last chunk of a stream.
+            text (str, optional): The complete text of a streamed response.
+        """
+        usage = getattr(response, "usage_metadata", None)
+        sent = getattr(usage, "prompt_token_count", None)
+        received = getattr(usage, "candidates_token_count", None)
+        if sent is None:
+            sent = sum(TokenCounter.estimate(part.text) for part in prompt.parts)
+        if received is None:
+            received = TokenCounter.estimate(text if text is not None else response.candidates[0].content.parts[0].text)
+        Tracer.count("llm_tokens_sent", sent)
+        Tracer.count("llm_tokens_received", received)
+
+    @staticmethod
+    def _parse_response(response):
+        """
+        Parses and validates the JSON object of a Gemini API response in a single pass.
+
+        Near-valid JSON (wrapped in a code fence, surrounded by text, with trailing commas or cut off before
+        its closing brackets) is repaired locally instead of calling the model again.
+
+        Args:
+            response (GenerateContentResponse): The response returned by the API.
+
+        Returns:
+            dict: The normalized analysis; fields that are missing or invalid are left out.
+
+        Raises:
+            json.JSONDecodeError: If the response text cannot be parsed even after repair.
+        """
+        return AnalysisReport.normalize(LLMClient._parse_json(response.candidates[0].content.parts[0].text))[0]
+
+    @staticmethod
+    def _parse_json(text):
+        """
+        Parses the JSON object of a response text, repairing it locally if needed, and counts the outcome.
+
+        Args:
+            text (str): The response text.
+
+        Returns:
+            dict: The parsed JSON object.
+
+        Raises:
+            json.JSONDecodeError: If the text cannot be parsed even after repair.
+        """
+        try:
+            data = json.loads(text)
+            outcome = "valid"
+        except json.JSONDecodeError:
+            try:
+                data = LLMClient._repair_json(text)
+            except json.JSONDecodeError:
+                LLMClient._count("invalid")
+                raise
+            outcome = "repaired"
+        LLMClient._count(outcome)
+        return data
+
+    @staticmethod
+    def _repair_json(text):
+        """
+        Repairs near-valid JSON: strips surrounding text and code fences, drops trailing commas, closes
+        unterminated strings, arrays and objects, and drops a last member that was cut off mid-way.
+
+        Args:
+            text (str): The response text.
+
+        Returns:
+            dict: The parsed JSON object.
+
+        Raises:
+            json.JSONDecodeError: If no JSON object can be recovered.
+        """
+        start = text.find("{")
+        if start < 0:
+            raise json.JSONDecodeError("No JSON object found", text, 0)
+        candidate = text[start:]
+
+        # Close the open strings and brackets; if the last member was cut off mid-way, drop it and retry
+        for _ in range(8):
+            try:
+                return json.loads(LLMClient._close_json(candidate))
+            except json.JSONDecodeError as e:
+                error = e
+                cut = max(candidate.rfind(","), candidate.rfind("[") + 1, candidate.rfind("{") + 1)
+                if cut <= 1:
+                    break
+                candidate = candidate[:cut]
+        raise error
+
+    @staticmethod
+    def _close_json(candidate):
+        """Cuts a JSON object after its closing brace, or closes its open strings and brackets if it has none."""
+        closers, in_string, escaped, end = [], False, False, len(candidate)
+        for index, char in enumerate(candidate):
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char in "{[":
+                closers.append("}" if char == "{" else "]")
+            elif char in "}]" and closers:
+                closers.pop()
+                if not closers:
+                    end = index + 1
+                    break
+
+        candidate = candidate[:end]
+        if in_string:
+            candidate += '"'
+        candidate = re.sub(r"[,:]\s*$", "", candidate.rstrip()) + "".join(reversed(closers))
+        return re.sub(r",(\s*[}\]])", r"\1", candidate)
+
+    @staticmethod
+    def _report_error(e):
+        """
+        Reports an error raised while calling the Gemini API or parsing its response.
+
+        Args:
+            e (Exception): The error to report.
+        """
+        if isinstance(e, (
                 errors.ClientError,
                 errors.APIError,
                 errors.FunctionInvocationError,
                 errors.ExperimentalWarning,
                 errors.UnknownFunctionCallArgumentError,
                 errors.UnsupportedFunctionError,
-        ) as e:
+        )):
             click.echo(f"GenAI Error: {type(e).__name__}: {e}. Please verify the API request and retry.", err=True)
-        except json.JSONDecodeError as e:
+        elif isinstance(e, json.JSONDecodeError):
             click.echo(f"Error decoding JSON response: {e}. The response may be not in the expected format.", err=True)
-        except ValueError as e:
+        elif isinstance(e, ValueError):
             click.echo(f"Environment Error: {e}. Please ensure your GEMINI_API_KEY is correctly set in your "
                        f"environment.", err=True)
-        except Exception as e:  # Catch other potential errors (e.g., network issues)
+        elif isinstance(e, asyncio.TimeoutError):
+            click.echo("Timeout Error: The Gemini API did not respond in time. Please retry or raise the timeout.",
+                       err=True)
+        else:  # Catch other potential errors (e.g., network issues)
             click.echo(f"An unexpected error occurred: {e}. Please check your network or API configuration.", err=True)
 
     @staticmethod
@@ -149,6 +779,6 @@ class LLMClient:
             Content: The refined prompt.
         """
         refined_prompt = copy.deepcopy(prompt)
-        refined_prompt.parts.append(Part(text="\nEnsure all required fields are included."))
-        refined_prompt.parts.append(Part(text=f"\nPrevious response: {response}"))
+        refined_prompt.parts.append(types.Part(text="\nEnsure all required fields are included."))
+        refined_prompt.parts.append(types.Part(text=f"\nPrevious response: {response}"))
         return refined_prompt
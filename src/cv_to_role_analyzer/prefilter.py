@@ -0,0 +1,87 @@
+import math
+import re
+from collections import Counter
+
+
+class KeywordPrefilter:
+    """
+    A class that scores CVs against a job description locally, before any LLM call.
+
+    The role text and each CV are turned into sparse term vectors (log-scaled term frequencies, with the
+    role's terms as the vocabulary) and compared with cosine similarity. The score ranges from 0.0 (no
+    shared vocabulary) to 1.0, takes microseconds per CV, and is used to skip CVs that obviously do not
+    match the role. Vectors are plain dictionaries, so no numerical library is required.
+
+    Attributes:
+        role_vector (dict): The weighted term vector of the job description.
+
+    Methods:
+        tokenize(text): Splits a text into lowercase terms, keeping tokens such as "c++", "c#" or "node.js".
+        vectorize(text): Builds the sparse, L2-normalized term vector of a text.
+        score(cv): Returns the cosine similarity between the role and a CV text or vector.
+    """
+
+    TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+    STOP_WORDS = frozenset("""
+        a about above after all also an and any are as at be been being both but by can could did do does
+        during each etc for from had has have having he her his how i if in into is it its just may me more
+        most must my no nor not of on or other our out over own per same she should so some such than that the
+        their them then there these they this those through to too under up us very was we well were what
+        when where which while who will with within would you your
+        ability able candidate candidates company excellent experience good including job looking plus preferred
+        required requirements responsibilities role strong team work working year years
+    """.split())
+
+    def __init__(self, role_text):
+        """
+        Builds the term vector of the job description.
+
+        Args:
+            role_text (str): The job description text.
+        """
+        self.role_vector = KeywordPrefilter.vectorize(role_text)
+
+    @staticmethod
+    def tokenize(text):
+        """Splits a text into lowercase terms, dropping stop words and single characters.
+
+        Args:
+            text (str): The text to tokenize.
+
+        Returns:
+            list: The terms of the text, in order.
+        """
+        return [token for token in KeywordPrefilter.TOKEN_PATTERN.findall((text or "").lower())
+                if token not in KeywordPrefilter.STOP_WORDS and (len(token) > 1 or token in ("c", "r"))]
+
+    @staticmethod
+    def vectorize(text):
+        """Builds the sparse, L2-normalized term vector of a text.
+
+        Args:
+            text (str): The text to vectorize.
+
+        Returns:
+            dict: The weight of each term, using `1 + log(count)` before normalization.
+        """
+        counts = Counter(KeywordPrefilter.tokenize(text))
+        weights = {term: 1.0 + math.log(count) for term, count in counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+        return {term: weight / norm for term, weight in weights.items()} if norm else {}
+
+    def score(self, cv):
+        """Returns the cosine similarity between the job description and a CV.
+
+        Args:
+            cv (str or dict): The CV text, or a vector returned by `vectorize` so that a CV scored against
+                several roles is only vectorized once.
+
+        Returns:
+            float: The similarity, from 0.0 to 1.0, rounded to 4 decimals.
+        """
+        cv_vector = cv if isinstance(cv, dict) else KeywordPrefilter.vectorize(cv)
+        if len(cv_vector) < len(self.role_vector):
+            total = sum(weight * self.role_vector.get(term, 0.0) for term, weight in cv_vector.items())
+        else:
+            total = sum(weight * cv_vector.get(term, 0.0) for term, weight in self.role_vector.items())
+        return round(total, 4)
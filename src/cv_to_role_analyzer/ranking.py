@@ -0,0 +1,299 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from cv_to_role_analyzer.backends import BackendRegistry, GeminiBackend, RoutingBackend
+from cv_to_role_analyzer.llm import LLMClient, errors, types
+from cv_to_role_analyzer.report import AnalysisReport
+from cv_to_role_analyzer.tracing import Tracer
+from cv_to_role_analyzer.utils import TokenCounter
+
+
+class Ranker:
+    """
+    A class that ranks many CVs against one role, or many roles against one CV, with batched LLM requests.
+
+    Analyzing each pair separately costs one full round trip, and one copy of the shared text, per pair.
+    The Ranker instead sends the shared text (the role or the CV) once, followed by as many items as fit in
+    a token budget, and asks for one report per item. Each item's report is validated like a single
+    analysis. A batch that the provider rejects as too large, or whose answer is cut off, is split in half
+    and retried, down to one item per request.
+
+    The pairs go through the selected analysis backend. Packing applies to the Gemini backend, and to the
+    shortlist of the routed backend once its local pre-screening has run; other backends, such as the local
+    scorer, analyze each pair on its own.
+
+    Attributes:
+        token_budget (int): The maximum estimated number of prompt tokens per request.
+        max_output_tokens (int): The maximum number of tokens the model may generate per request.
+        workers (int): The maximum number of requests running concurrently.
+        compactor (TextCompactor): The compactor shrinking the texts to their token budgets, or None.
+        backend (Backend): The analysis backend.
+
+    Methods:
+        rank_cvs_for_role(role_text, cvs): Ranks CVs against one job description.
+        rank_roles_for_cv(cv_text, roles): Ranks job descriptions against one CV.
+        pack(items, shared_tokens): Groups items into batches that fit the token budgets.
+        leaderboard(reports, failures): Sorts reports into a ranked leaderboard.
+    """
+
+    # Response schema declared to the model: one report per item, identified by the id given in the prompt
+    RESPONSE_SCHEMA = {
+        "type": "OBJECT",
+        "properties": {
+            "results": {
+                "type": "ARRAY",
+                "items": {
+                    "type": "OBJECT",
+                    "properties": {"id": {"type": "STRING"}, **AnalysisReport.RESPONSE_SCHEMA["properties"]},
+                    "required": ["id", *AnalysisReport.REQUIRED_FIELDS],
+                    "propertyOrdering": ["id", *AnalysisReport.REQUIRED_FIELDS],
+                },
+            },
+        },
+        "required": ["results"],
+    }
+
+    def __init__(self, token_budget=30_000, max_output_tokens=8192, workers=4, compactor=None, backend=None):
+        """
+        Initializes the ranker.
+
+        Args:
+            token_budget (int): The maximum estimated number of prompt tokens per request.
+            max_output_tokens (int): The maximum number of tokens the model may generate per request, which
+                also bounds the number of items per request.
+            workers (int): The maximum number of requests running concurrently.
+            compactor (TextCompactor, optional): The compactor shrinking the texts to their token budgets, so
+                that more items fit in each request.
+            backend (str or Backend, optional): The analysis backend or its name, defaults to the default
+                backend of the `BackendRegistry`.
+
+        Raises:
+            ValueError: If the output token budget is too small, or the backend is unknown.
+        """
+        if max_output_tokens < LLMClient.RESPONSE_TOKENS_ESTIMATE:
+            raise ValueError("The output token budget is too small for a single report.")
+        self.token_budget = token_budget
+        self.max_output_tokens = max_output_tokens
+        self.workers = workers
+        self.compactor = compactor
+        self.backend = BackendRegistry.get(backend)
+
+    def rank_cvs_for_role(self, role_text, cvs):
+        """Ranks CVs against one job description.
+
+        Args:
+            role_text (str or PreparedRole): The job description text, or a prepared role.
+            cvs (dict): The CV texts, keyed by CV identifier.
+
+        Returns:
+            list: The leaderboard, best match first (see `leaderboard`).
+        """
+        if self.compactor:
+            role_text = role_text if not isinstance(role_text, str) else self.compactor.compact_role(role_text)[0]
+            cvs = {cv_id: self.compactor.compact_cv(text)[0] for cv_id, text in cvs.items()}
+        shared = types.Part(text=f"Role Description: \n{getattr(role_text, 'text', role_text)}")
+        return self._rank("candidate CV", shared, "CV", cvs, lambda cv: (cv, role_text))
+
+    def rank_roles_for_cv(self, cv_text, roles):
+        """Ranks job descriptions against one CV.
+
+        Args:
+            cv_text (str): The CV text.
+            roles (dict): The job description texts or prepared roles, keyed by role identifier.
+
+        Returns:
+            list: The leaderboard, best match first (see `leaderboard`).
+        """
+        items = {role_id: getattr(role, "text", role) for role_id, role in roles.items()}
+        if self.compactor:
+            cv_text = self.compactor.compact_cv(cv_text)[0]
+            items = {role_id: self.compactor.compact_role(text)[0] if isinstance(roles[role_id], str) else text
+                     for role_id, text in items.items()}
+        shared = types.Part(text=f"CV Text: \n{cv_text}")
+        return self._rank("job description", shared, "Role Description", items, lambda role: (cv_text, role))
+
+    def pack(self, items, shared_tokens):
+        """Groups items, in order, into batches that fit the prompt and output token budgets.
+
+        An item larger than the budget on its own still gets a batch of its own.
+
+        Args:
+            items (dict): The item texts, keyed by identifier.
+            shared_tokens (int): The estimated tokens of the prompt parts sent with every batch.
+
+        Returns:
+            list: The batches, each a list of item identifiers.
+        """
+        max_items = self.max_output_tokens // LLMClient.RESPONSE_TOKENS_ESTIMATE
+        batches, batch, batch_tokens = [], [], shared_tokens
+        for item_id, text in items.items():
+            tokens = TokenCounter.estimate(text) + 8  # The item header
+            if batch and (batch_tokens + tokens > self.token_budget or len(batch) >= max_items):
+                batches.append(batch)
+                batch, batch_tokens = [], shared_tokens
+            batch.append(item_id)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
+    @staticmethod
+    def leaderboard(reports, failures=None):
+        """Sorts reports into a ranked leaderboard, best match first, followed by the items that failed.
+
+        Args:
+            reports (dict): The normalized reports, keyed by item identifier.
+            failures (dict, optional): The error messages of the items that failed, keyed by item identifier.
+
+        Returns:
+            list: One dict per item, with `rank`, `id`, `match_score`, `skill_gaps` and `recommendations`,
+                or with `rank` None, `id` and `error` for the items that failed.
+        """
+        ranked = sorted(reports.items(), key=lambda item: (-item[1]["match_score"], item[0]))
+        board = [{"rank": rank, "id": item_id, **report} for rank, (item_id, report) in enumerate(ranked, 1)]
+        board.extend({"rank": None, "id": item_id, "error": error}
+                     for item_id, error in sorted((failures or {}).items()))
+        return board
+
+    def _rank(self, kind, shared, label, items, pair):
+        """Analyzes the items with the backend, packing them into batches for Gemini, and returns the leaderboard.
+
+        `pair(text)` returns the (cv_text, role_text) pair of an item, for backends analyzing pairs one by one.
+        """
+        backend, reports, failures = self.backend, {}, {}
+        if isinstance(backend, RoutingBackend):
+            reports, failures = self._analyze_pairs(backend.prescreen, items, pair)
+            shortlisted = [item_id for item_id in items
+                           if item_id in failures or reports[item_id]["match_score"] >= backend.min_score]
+            for item_id in shortlisted:
+                reports.pop(item_id, None)
+                failures.pop(item_id, None)
+            items, backend = {item_id: items[item_id] for item_id in shortlisted}, backend.shortlist
+
+        if not isinstance(backend, GeminiBackend):
+            pair_reports, pair_failures = self._analyze_pairs(backend, items, pair)
+            reports.update(pair_reports)
+            failures.update(pair_failures)
+            return Ranker.leaderboard(reports, failures)
+
+        prefix = Ranker._prompt_prefix(kind, shared)
+        shared_tokens = sum(TokenCounter.estimate(part.text) for part in prefix)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for batch_reports, batch_failures in executor.map(
+                    lambda batch: self._analyze_batch(prefix, label, {item_id: items[item_id] for item_id in batch}),
+                    self.pack(items, shared_tokens)):
+                reports.update(batch_reports)
+                failures.update(batch_failures)
+        return Ranker.leaderboard(reports, failures)
+
+    def _analyze_pairs(self, backend, items, pair):
+        """
+        Analyzes each item on its own with a backend, concurrently.
+
+        Returns:
+            tuple: The reports and the error messages of the failed items, keyed by identifier.
+        """
+        def analyze(item_id):
+            try:
+                return item_id, backend.analyze_match(*pair(items[item_id])), None
+            except Exception as e:
+                return item_id, None, str(e)
+
+        reports, failures = {}, {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for item_id, report, error in executor.map(analyze, items):
+                if report is not None:
+                    reports[item_id] = report
+                else:
+                    failures[item_id] = error or f"The {backend.name} backend returned no analysis."
+        return reports, failures
+
+    def _analyze_batch(self, prefix, label, items):
+        """
+        Analyzes one batch of items, splitting it in half when it is too large or some reports are missing.
+
+        Returns:
+            tuple: The normalized reports and the error messages of the failed items, keyed by identifier.
+        """
+        prompt = types.Content(parts=[
+            *prefix,
+            *(types.Part(text=f"{label} [{item_id}]: \n{text}") for item_id, text in items.items()),
+        ])
+        config = types.GenerateContentConfig(response_mime_type="application/json",
+                                             response_schema=Ranker.RESPONSE_SCHEMA,
+                                             max_output_tokens=self.max_output_tokens)
+        reports, error = {}, "The model returned no complete report for this item."
+        try:
+            client = LLMClient.get_client()
+            with Tracer.span("llm.call", items=len(items)):
+                response = LLMClient.get_scheduler().call(
+                    lambda: client.models.generate_content(model=LLMClient.MODEL_NAME, contents=prompt, config=config),
+                    LLMClient._estimate_tokens(prompt) + LLMClient.RESPONSE_TOKENS_ESTIMATE * (len(items) - 1),
+                )
+            LLMClient._record_usage(prompt, response)
+            with Tracer.span("llm.parse"):
+                reports = Ranker._parse_reports(response.candidates[0].content.parts[0].text, items)
+        except errors.APIError as e:
+            if len(items) == 1 or not Ranker._is_too_large(e):
+                LLMClient._report_error(e)
+                return {}, {item_id: str(e) for item_id in items}
+        except Exception as e:
+            LLMClient._report_error(e)
+            error = str(e)
+
+        missing = [item_id for item_id in items if item_id not in reports]
+        if not missing:
+            return reports, {}
+        if len(missing) == 1 and len(items) == 1:
+            return reports, {missing[0]: error}
+
+        # Retry the items without a complete report in two smaller requests
+        failures = {}
+        middle = (len(missing) + 1) // 2
+        for half in (missing[:middle], missing[middle:]):
+            if half:
+                half_reports, half_failures = self._analyze_batch(
+                    prefix, label, {item_id: items[item_id] for item_id in half}
+                )
+                reports.update(half_reports)
+                failures.update(half_failures)
+        return reports, failures
+
+    @staticmethod
+    def _prompt_prefix(kind, shared):
+        """Creates the prompt parts sent once per batch: the role, the instructions and the shared text."""
+        return [
+            types.Part(text="You are an advanced AI specializing in CV analysis."),
+            types.Part(text=(
+                f"Evaluate each {kind} below independently, as a separate match between a CV and a job description. "
+                f"Identify *all* significant skill gaps of each match. Provide the results in JSON format with a "
+                f"{repr('results')} key holding one entry per {kind}, each with the following keys:"
+                f"\n- {repr('id')} (the identifier given in square brackets, unchanged)"
+                f"\n- {repr('match_score')} (integer, 0-100)"
+                f"\n- {repr('skill_gaps')} (list of dictionaries, each with {repr('category')} and {repr('gap')} keys)"
+                f"\n- {repr('recommendations')} (list of strings)"
+                f"\n\nReason carefully about each match, then answer with the JSON object only."
+            )),
+            shared,
+        ]
+
+    @staticmethod
+    def _parse_reports(text, items):
+        """Parses the per-item reports of a batched response, keeping only complete reports of requested items."""
+        data = LLMClient._parse_json(text)
+        results = data.get("results", []) if isinstance(data, dict) else data
+        reports = {}
+        for result in results if isinstance(results, list) else []:
+            item_id = str(result.get("id", "")).strip() if isinstance(result, dict) else ""
+            if item_id in items:
+                report, missing = AnalysisReport.normalize(result)
+                if not missing:
+                    reports[item_id] = report
+        return reports
+
+    @staticmethod
+    def _is_too_large(error):
+        """Checks whether the provider rejected a request because it exceeds the context window."""
+        message = str(error).lower()
+        return error.code in (400, 413) and any(
+            word in message for word in ("token", "too long", "too large", "exceed")
+        )
@@ -0,0 +1,268 @@
+import asyncio
+import os
+import random
+import re
+import threading
+import time
+
+from cv_to_role_analyzer.tracing import Tracer
+from cv_to_role_analyzer.utils import LazyModule
+
+httpx = LazyModule("httpx")  # Installed with google-genai, which uses it as its transport
+errors = LazyModule("google.genai.errors")
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket that refills continuously up to its capacity.
+
+    Attributes:
+        capacity (float): The maximum number of tokens held by the bucket.
+        refill_per_second (float): The number of tokens added per second at full speed.
+
+    Methods:
+        reserve(amount, speed): Takes `amount` tokens and returns how long the caller must wait for them.
+    """
+
+    def __init__(self, capacity, refill_per_second):
+        """
+        Initializes a full bucket.
+
+        Args:
+            capacity (float): The maximum number of tokens held by the bucket.
+            refill_per_second (float): The number of tokens added per second at full speed.
+        """
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount, speed=1.0):
+        """Takes `amount` tokens, going into debt if needed, and returns the wait until they are available.
+
+        Reserving instead of polling keeps callers in first-come, first-served order.
+
+        Args:
+            amount (float): The number of tokens to take, capped at the bucket capacity.
+            speed (float): The fraction (0-1] of the nominal refill rate currently in effect.
+
+        Returns:
+            float: The number of seconds to wait before using the tokens.
+        """
+        rate = self.refill_per_second * speed
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * rate)
+            self._updated_at = now
+            self._tokens -= min(amount, self.capacity)
+            return max(0.0, -self._tokens / rate)
+
+
+class RequestScheduler:
+    """
+    A shared scheduler that paces Gemini calls and retries transient failures.
+
+    Every call first reserves one request from a requests-per-minute bucket and its estimated tokens from a
+    tokens-per-minute bucket, waiting as long as needed. Transient failures (429 quota errors, 5xx server
+    errors, transport timeouts and connection errors) are retried with jittered exponential backoff,
+    honoring any retry delay sent by the API; a caller's own deadline (`asyncio.wait_for`) is not retried.
+    Each 429 also halves the pace of every caller, which then recovers gradually with each success.
+
+    Only transport-level failures are retried here; retrying because the model returned incomplete JSON is
+    handled separately by `LLMClient` and counted on its own.
+
+    Attributes:
+        rpm (int): The requests-per-minute budget.
+        tpm (int): The tokens-per-minute budget.
+        max_retries (int): The number of retries of a transient failure.
+        base_delay (float): The backoff delay before the first retry, in seconds.
+        max_delay (float): The maximum backoff delay, in seconds.
+
+    Methods:
+        from_env(): Creates a scheduler from the GEMINI_RPM, GEMINI_TPM and GEMINI_MAX_RETRIES variables.
+        call(function, tokens): Runs a blocking API call under the budgets, with retries.
+        call_async(function, tokens): Awaits an API call under the budgets, with retries.
+        is_transient(error): Checks whether an error is worth retrying.
+        retry_after(error): Extracts the retry delay requested by the API, if any.
+        stats(): Returns the scheduler counters.
+    """
+
+    RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+    MIN_SPEED = 0.1
+    SPEED_RECOVERY = 0.05
+
+    def __init__(self, rpm=60, tpm=1_000_000, max_retries=4, base_delay=1.0, max_delay=60.0):
+        """
+        Initializes the scheduler.
+
+        Args:
+            rpm (int): The requests-per-minute budget.
+            tpm (int): The tokens-per-minute budget.
+            max_retries (int): The number of retries of a transient failure.
+            base_delay (float): The backoff delay before the first retry, in seconds.
+            max_delay (float): The maximum backoff delay, in seconds.
+        """
+        if rpm < 1 or tpm < 1:
+            raise ValueError("The requests and tokens per minute budgets must be at least 1.")
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._requests = TokenBucket(rpm, rpm / 60.0)
+        self._tokens = TokenBucket(tpm, tpm / 60.0)
+        self._speed = 1.0
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "transport_retries": 0, "rate_limited": 0, "failures": 0,
+                       "throttle_wait_seconds": 0.0}
+
+    @staticmethod
+    def from_env():
+        """Creates a scheduler from the GEMINI_RPM, GEMINI_TPM and GEMINI_MAX_RETRIES environment variables.
+
+        Returns:
+            RequestScheduler: The configured scheduler.
+        """
+        return RequestScheduler(
+            rpm=int(os.getenv("GEMINI_RPM", "60")),
+            tpm=int(os.getenv("GEMINI_TPM", "1000000")),
+            max_retries=int(os.getenv("GEMINI_MAX_RETRIES", "4")),
+        )
+
+    def call(self, function, tokens=0):
+        """Runs a blocking API call under the budgets, retrying transient failures.
+
+        Args:
+            function (callable): The API call, invoked without arguments.
+            tokens (int): The estimated number of tokens consumed by the call.
+
+        Returns:
+            object: The result of the call.
+
+        Raises:
+            Exception: The last error, once it is not transient or the retries are exhausted.
+        """
+        attempt = 0
+        while True:
+            time.sleep(self._reserve(tokens))
+            try:
+                result = function()
+            except Exception as e:
+                delay = self._on_failure(e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self._on_success()
+            return result
+
+    async def call_async(self, function, tokens=0):
+        """Awaits an API call under the budgets, retrying transient failures without blocking the event loop.
+
+        Args:
+            function (callable): A function returning a new awaitable of the API call on each invocation.
+            tokens (int): The estimated number of tokens consumed by the call.
+
+        Returns:
+            object: The result of the call.
+
+        Raises:
+            Exception: The last error, once it is not transient or the retries are exhausted.
+        """
+        attempt = 0
+        while True:
+            await asyncio.sleep(self._reserve(tokens))
+            try:
+                result = await function()
+            except Exception as e:
+                delay = self._on_failure(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            self._on_success()
+            return result
+
+    @staticmethod
+    def is_transient(error):
+        """Checks whether an error is worth retrying.
+
+        Args:
+            error (Exception): The error raised by the API call.
+
+        Returns:
+            bool: True for retryable HTTP status codes and for transport errors such as connection failures.
+        """
+        if isinstance(error, errors.APIError):
+            return error.code in RequestScheduler.RETRYABLE_STATUS_CODES
+        return isinstance(error, (httpx.TransportError, ConnectionError))
+
+    @staticmethod
+    def retry_after(error):
+        """Extracts the retry delay requested by the API, from the Retry-After header or a RetryInfo detail.
+
+        Args:
+            error (Exception): The error raised by the API call.
+
+        Returns:
+            float: The requested delay in seconds, or None if the API did not request one.
+        """
+        response = getattr(error, "response", None)
+        header = getattr(response, "headers", {}).get("retry-after") if response is not None else None
+        if header:
+            try:
+                return max(0.0, float(header))
+            except ValueError:
+                pass
+        match = re.search(r"['\"]retryDelay['\"]\s*:\s*['\"]([\d.]+)s['\"]", str(getattr(error, "details", "")))
+        return float(match.group(1)) if match else None
+
+    def stats(self):
+        """Returns the scheduler counters.
+
+        Returns:
+            dict: The number of requests, transport retries, 429 responses and final failures, the total
+                time spent waiting for the budgets, and the current pace (0-1).
+        """
+        with self._lock:
+            return {**self._stats, "throttle_wait_seconds": round(self._stats["throttle_wait_seconds"], 3),
+                    "speed": round(self._speed, 3)}
+
+    def _reserve(self, tokens):
+        """Reserves one request and `tokens` tokens, and returns the time to wait for both."""
+        with self._lock:
+            speed = self._speed
+            self._stats["requests"] += 1
+        wait = max(self._requests.reserve(1, speed), self._tokens.reserve(tokens, speed))
+        if wait:
+            with self._lock:
+                self._stats["throttle_wait_seconds"] += wait
+        return wait
+
+    def _on_success(self):
+        """Gradually restores the pace after a successful call."""
+        with self._lock:
+            self._speed = min(1.0, self._speed + self.SPEED_RECOVERY)
+
+    def _on_failure(self, error, attempt):
+        """Records a failed call and returns the delay before retrying it, or None if it must not be retried."""
+        rate_limited = isinstance(error, errors.APIError) and error.code == 429
+        if rate_limited:
+            Tracer.count("llm_rate_limited")
+        with self._lock:
+            if rate_limited:
+                self._stats["rate_limited"] += 1
+                self._speed = max(self.MIN_SPEED, self._speed / 2)
+            if attempt >= self.max_retries or not RequestScheduler.is_transient(error):
+                self._stats["failures"] += 1
+                return None
+            self._stats["transport_retries"] += 1
+        Tracer.count("llm_transport_retries")
+
+        backoff = min(self.max_delay, self.base_delay * 2 ** attempt)
+        delay = random.uniform(backoff / 2, backoff)  # Jitter spreads out callers that failed together
+        requested = RequestScheduler.retry_after(error)
+        return min(self.max_delay, max(delay, requested)) if requested is not None else delay
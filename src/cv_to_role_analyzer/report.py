@@ -11,9 +11,31 @@ class AnalysisReport:
         recommendations (list): A list of recommendations for the candidate.
 
     Methods:
+        normalize(data): Validates raw model output against the report schema and coerces it into shape.
         to_json(): Converts the analysis report into a well-formatted JSON string.
     """
 
+    REQUIRED_FIELDS = ("match_score", "skill_gaps", "recommendations")
+
+    # Response schema declared to the model, in the OpenAPI subset accepted by the Gemini API
+    RESPONSE_SCHEMA = {
+        "type": "OBJECT",
+        "properties": {
+            "match_score": {"type": "INTEGER", "minimum": 0, "maximum": 100},
+            "skill_gaps": {
+                "type": "ARRAY",
+                "items": {
+                    "type": "OBJECT",
+                    "properties": {"category": {"type": "STRING"}, "gap": {"type": "STRING"}},
+                    "required": ["category", "gap"],
+                },
+            },
+            "recommendations": {"type": "ARRAY", "items": {"type": "STRING"}},
+        },
+        "required": list(REQUIRED_FIELDS),
+        "propertyOrdering": list(REQUIRED_FIELDS),
+    }
+
     def __init__(self, analysis_data):
         """
         Initializes the AnalysisReport with the provided analysis data.
@@ -25,6 +47,49 @@ class AnalysisReport:
         self.skill_gaps = analysis_data.get("skill_gaps", [])
         self.recommendations = analysis_data.get("recommendations", [])
 
+    @staticmethod
+    def normalize(data):
+        """
+        Validates raw model output against the report schema and coerces near-valid values into shape.
+
+        The match score is converted to an integer clamped to 0-100, skill gaps given as plain strings get a
+        generic category, skill gaps without a description are dropped, and recommendations are converted to
+        strings. Fields that are missing or cannot be coerced are left out and reported, so that only genuinely
+        missing fields need a new model call.
+
+        Parameters:
+            data (dict): The parsed model output.
+
+        Returns:
+            tuple: The normalized analysis (dict) and the list of missing or invalid field names.
+        """
+        if not isinstance(data, dict):
+            return {}, list(AnalysisReport.REQUIRED_FIELDS)
+        normalized, missing = {}, []
+
+        try:
+            normalized["match_score"] = min(100, max(0, int(round(float(data["match_score"])))))
+        except (KeyError, TypeError, ValueError):
+            missing.append("match_score")
+
+        gaps = data.get("skill_gaps", data.get("skill_gap"))
+        if isinstance(gaps, list):
+            normalized["skill_gaps"] = [
+                {"category": str(gap.get("category") or "General"), "gap": str(gap["gap"])}
+                if isinstance(gap, dict) else {"category": "General", "gap": str(gap)}
+                for gap in gaps if gap and (not isinstance(gap, dict) or gap.get("gap"))
+            ]
+        else:
+            missing.append("skill_gaps")
+
+        recommendations = data.get("recommendations")
+        if isinstance(recommendations, list):
+            normalized["recommendations"] = [str(recommendation) for recommendation in recommendations]
+        else:
+            missing.append("recommendations")
+
+        return normalized, missing
+
     def to_json(self):
         """
         Converts the analysis results into a JSON string.
@@ -0,0 +1,164 @@
+import heapq
+import json
+import os
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+
+
+class ResultSink:
+    """
+    An append-only store of analysis results, one compact JSON record per line (JSONL).
+
+    Large screening runs append every result to a single file instead of writing one pretty-printed file per
+    pair. Each record holds the CV and role identifiers, the match score, the skill gaps and recommendations,
+    and metadata such as the time it was recorded. Queries stream the file line by line, so their memory use
+    does not grow with the number of results, and lines of other roles are skipped before being decoded.
+    The results can also be exported to a columnar Parquet file when pyarrow is installed.
+
+    Attributes:
+        path (str): The path to the JSONL file.
+
+    Methods:
+        append(cv_id, role_id, report, **metadata): Appends a result.
+        records(role_id): Streams the records, optionally only those of one role.
+        top(role_id, n): Returns the N best records of a role by match score.
+        gap_categories(role_id, n): Returns the most common skill-gap categories.
+        export_parquet(path, batch_size): Writes the records to a Parquet file.
+    """
+
+    DEFAULT_NAME = "results.jsonl"
+
+    def __init__(self, path):
+        """
+        Opens the sink, creating its directory if needed.
+
+        Args:
+            path (str): The path to the JSONL file, or to a directory holding a `results.jsonl` file.
+        """
+        if os.path.isdir(path):
+            path = os.path.join(path, ResultSink.DEFAULT_NAME)
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def append(self, cv_id, role_id, report, **metadata):
+        """Appends a result as one compact JSON line, flushed at once.
+
+        Args:
+            cv_id (str): The identifier of the CV.
+            role_id (str): The identifier of the job role.
+            report (dict or str): The analysis report, or its JSON string.
+            **metadata: Additional fields stored with the result, such as the backend or prefilter score.
+
+        Returns:
+            dict: The appended record.
+        """
+        if isinstance(report, str):
+            report = json.loads(report)
+        record = {
+            "role": role_id,  # First, so that lines of other roles can be skipped before decoding them
+            "cv": cv_id,
+            "match_score": report.get("match_score"),
+            "skill_gaps": report.get("skill_gaps", []),
+            "recommendations": report.get("recommendations", []),
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            **metadata,
+        }
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+        return record
+
+    def records(self, role_id=None):
+        """Streams the records, optionally only those of one role.
+
+        Args:
+            role_id (str, optional): The identifier of the role whose records are returned.
+
+        Yields:
+            dict: The records, in the order they were appended.
+        """
+        if not os.path.exists(self.path):
+            return
+        prefix = None
+        if role_id is not None:
+            prefix = '{"role":' + json.dumps(role_id, ensure_ascii=False, separators=(",", ":")) + ","
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if prefix is not None and not line.startswith(prefix):
+                    continue
+                if line.strip():
+                    yield json.loads(line)
+
+    def top(self, role_id, n=50):
+        """Returns the N best records of a role by match score, keeping only N records in memory.
+
+        Args:
+            role_id (str): The identifier of the role.
+            n (int): The number of records to return.
+
+        Returns:
+            list: The records, by decreasing match score.
+        """
+        scored = ((record.get("match_score") or 0, -position, record)
+                  for position, record in enumerate(self.records(role_id)))
+        return [record for _, _, record in heapq.nlargest(n, scored, key=lambda item: item[:2])]
+
+    def gap_categories(self, role_id=None, n=None):
+        """Returns the most common skill-gap categories.
+
+        Args:
+            role_id (str, optional): The identifier of the role whose records are counted, or None for all.
+            n (int, optional): The number of categories to return, or None for all.
+
+        Returns:
+            list: The `(category, count)` pairs, most common first.
+        """
+        counts = Counter()
+        for record in self.records(role_id):
+            counts.update(gap.get("category") or "General" for gap in record.get("skill_gaps", []))
+        return counts.most_common(n)
+
+    def export_parquet(self, path, batch_size=10000):
+        """Writes the records to a columnar Parquet file, converting them in batches.
+
+        The skill gaps are stored as a list of `{category, gap}` structs, together with a list column of
+        their categories for fast aggregation.
+
+        Args:
+            path (str): The path to the Parquet file.
+            batch_size (int): The number of records converted at a time.
+
+        Returns:
+            int: The number of records written.
+
+        Raises:
+            ImportError: If pyarrow is not installed.
+        """
+        try:  # pyarrow is optional, only needed here, and slow to import, so it is not imported with the module
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError("Exporting to Parquet requires pyarrow: pip install pyarrow") from e
+        gap_type = pyarrow.struct([("category", pyarrow.string()), ("gap", pyarrow.string())])
+        schema = pyarrow.schema([
+            ("role", pyarrow.string()), ("cv", pyarrow.string()), ("match_score", pyarrow.int32()),
+            ("gap_categories", pyarrow.list_(pyarrow.string())), ("skill_gaps", pyarrow.list_(gap_type)),
+            ("recommendations", pyarrow.list_(pyarrow.string())), ("recorded_at", pyarrow.string()),
+        ])
+        written = 0
+        with pyarrow.parquet.ParquetWriter(path, schema) as writer:
+            batch = []
+            for record in self.records():
+                batch.append({
+                    **{name: record.get(name) for name in schema.names},
+                    "gap_categories": [gap.get("category") for gap in record.get("skill_gaps", [])],
+                })
+                if len(batch) >= batch_size:
+                    writer.write_table(pyarrow.Table.from_pylist(batch, schema=schema))
+                    written, batch = written + len(batch), []
+            if batch:
+                writer.write_table(pyarrow.Table.from_pylist(batch, schema=schema))
+                written += len(batch)
+        return written
@@ -0,0 +1,145 @@
+import re
+
+import click
+from cv_to_role_analyzer.llm import LLMClient
+from cv_to_role_analyzer.prefilter import KeywordPrefilter
+from cv_to_role_analyzer.utils import LazyModule, RoleProcessor
+
+types = LazyModule("google.genai.types")
+
+
+class PreparedRole:
+    """
+    A job description parsed and indexed once, then reused across every candidate analyzed against it.
+
+    Screening N candidates for one role otherwise rebuilds the same prompt parts and role-derived data N
+    times. A PreparedRole holds the normalized text, the required skills, the local keyword vector and the
+    prompt prefix. Optionally, the prefix can be stored in the provider's context cache so that it is not
+    re-sent and re-billed with every candidate.
+
+    Attributes:
+        role_id (str): The identifier of the role, usually its file name.
+        text (str): The normalized job description text.
+        skills (list): The required and preferred skills listed in the job description.
+        prefilter (KeywordPrefilter): The local keyword scorer of the role.
+        prompt_prefix (list): The role-specific prompt parts shared by every analysis.
+        cached_content (str): The name of the provider-side context cache holding the prefix, or None.
+
+    Methods:
+        from_file(role_path, role_id, compactor): Reads and prepares a job description file.
+        normalize(role_text): Normalizes the whitespace of a job description.
+        extract_skills(role_text): Extracts the skill items listed under skill or qualification headings.
+        enable_context_cache(ttl_seconds): Stores the prompt prefix in the provider's context cache.
+        release_context_cache(): Deletes the provider-side context cache.
+    """
+
+    SKILL_HEADING = re.compile(r"qualification|requirement|skill|must have|nice to have|what you bring", re.I)
+    BULLET = re.compile(r"^\s*(?:[*\-•●▪‣]|\d+[.)])\s+(.+)$")
+
+    def __init__(self, role_text, role_id=None, compactor=None):
+        """
+        Prepares a job description for repeated analyses.
+
+        Args:
+            role_text (str): The job description text.
+            role_id (str, optional): The identifier of the role.
+            compactor (TextCompactor, optional): The compactor shrinking the role to its token budget.
+
+        Raises:
+            ValueError: If the job description is empty.
+        """
+        if not role_text or not role_text.strip():
+            raise ValueError("The job description is empty.")
+        self.role_id = role_id
+        self.text = PreparedRole.normalize(compactor.compact_role(role_text)[0] if compactor else role_text)
+        self.skills = PreparedRole.extract_skills(self.text)
+        self.prefilter = KeywordPrefilter(self.text)
+        self.prompt_prefix = LLMClient._prompt_prefix(self.text)
+        self.cached_content = None
+
+    @staticmethod
+    def from_file(role_path, role_id=None, compactor=None):
+        """Reads and prepares a job description file.
+
+        Args:
+            role_path (str): The path to the job role text file.
+            role_id (str, optional): The identifier of the role, defaults to the path.
+            compactor (TextCompactor, optional): The compactor shrinking the role to its token budget.
+
+        Returns:
+            PreparedRole: The prepared role, or None if the file could not be read or is empty.
+        """
+        role_text = RoleProcessor.process(role_path)
+        return PreparedRole(role_text, role_id or role_path, compactor) if role_text else None
+
+    @staticmethod
+    def normalize(role_text):
+        """Strips trailing spaces, collapses runs of spaces and blank lines, and trims the text.
+
+        Args:
+            role_text (str): The job description text.
+
+        Returns:
+            str: The normalized text.
+        """
+        lines = [re.sub(r"[ \t]+", " ", line).strip() for line in role_text.splitlines()]
+        return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+    @staticmethod
+    def extract_skills(role_text):
+        """Extracts the bullet items listed under skill, requirement or qualification headings.
+
+        Args:
+            role_text (str): The normalized job description text.
+
+        Returns:
+            list: The skill items, in order of appearance.
+        """
+        skills = []
+        in_skill_section = False
+        for line in role_text.splitlines():
+            bullet = PreparedRole.BULLET.match(line)
+            if bullet:
+                if in_skill_section:
+                    skills.append(bullet.group(1).strip())
+            elif line:
+                in_skill_section = bool(PreparedRole.SKILL_HEADING.search(line)) and len(line) < 80
+        return skills
+
+    def enable_context_cache(self, ttl_seconds=3600):
+        """Stores the prompt prefix in the provider's context cache.
+
+        Subsequent analyses against this role send only the CV text and reference the cached prefix. The
+        provider rejects prefixes below its minimum cacheable size, in which case the prefix keeps being sent
+        inline and nothing else changes.
+
+        Args:
+            ttl_seconds (int): How long the provider keeps the cache.
+
+        Returns:
+            bool: True if the prefix is now cached, False if caching was not possible.
+        """
+        try:
+            cache = LLMClient.get_client().caches.create(
+                model=LLMClient.MODEL_NAME,
+                config=types.CreateCachedContentConfig(
+                    contents=[types.Content(role="user", parts=self.prompt_prefix)],
+                    ttl=f"{int(ttl_seconds)}s",
+                    display_name=f"cv-analyzer-role-{self.role_id or 'unnamed'}"[:128],
+                ),
+            )
+            self.cached_content = cache.name
+            return True
+        except Exception as e:
+            click.echo(f"Context caching unavailable for role {self.role_id}: {e}. Sending the role inline.", err=True)
+            return False
+
+    def release_context_cache(self):
+        """Deletes the provider-side context cache, if any."""
+        if not self.cached_content:
+            return
+        try:
+            LLMClient.get_client().caches.delete(name=self.cached_content)
+        except Exception as e:
+            click.echo(f"Could not delete context cache {self.cached_content}: {e}", err=True)
+        self.cached_content = None
@@ -0,0 +1,239 @@
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+
+
+class AnalysisScheduler:
+    """
+    A priority scheduler running analyses on a fixed pool of worker threads.
+
+    Each request belongs to a priority class and a tenant. Workers take queued interactive requests before batch
+    requests, so a recruiter's analysis does not wait behind a bulk import. So that a steady flow of interactive
+    requests cannot hold the batch class back forever, one in every `batch_every` analyses started while batch
+    requests are queued goes to the batch class. Within a class, the tenants with queued requests are served in
+    turn, one request each, so a tenant's large import does not hold back the others. Identical requests (same
+    CV and role text) submitted while one is queued or running are coalesced: they share its future, so a single
+    upstream call delivers its result, or its error, to every waiter. An interactive duplicate of a queued batch
+    request promotes it to the interactive class. Requests with keyword arguments, such as the field callback of
+    a streamed analysis, are never coalesced.
+
+    Attributes:
+        analyze (callable): The function analyzing a (cv_text, role_text) pair, with optional keyword arguments.
+        workers (int): The number of worker threads.
+        batch_every (int): The guaranteed share of the batch class: one in every `batch_every` analyses started
+            while batch requests wait.
+        metrics (ServiceMetrics): The metrics receiving the queue depth, wait time and coalescing of each class.
+
+    Methods:
+        submit(cv_text, role_text, priority, tenant, **kwargs): Queues an analysis and returns its future.
+        stats(): Returns the queue depth, number of requests and coalescing rate of each class.
+        shutdown(wait): Stops the workers once the queued analyses are done.
+    """
+
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+    PRIORITIES = (INTERACTIVE, BATCH)  # Highest first
+    DEFAULT_TENANT = "default"
+    BATCH_EVERY = 5
+
+    def __init__(self, analyze, workers=4, metrics=None, batch_every=BATCH_EVERY):
+        """
+        Initializes the scheduler and starts its workers.
+
+        Args:
+            analyze (callable): The function analyzing a (cv_text, role_text) pair.
+            workers (int): The number of worker threads.
+            metrics (ServiceMetrics, optional): The metrics to record in, defaults to new ones.
+            batch_every (int): One in every `batch_every` analyses started while batch requests wait goes to the
+                batch class.
+
+        Raises:
+            ValueError: If `batch_every` is below 1.
+        """
+        if batch_every < 1:
+            raise ValueError("batch_every must be at least 1.")
+        if metrics is None:
+            from cv_to_role_analyzer.server import ServiceMetrics
+            metrics = ServiceMetrics()
+        self.analyze = analyze
+        self.workers = workers
+        self.batch_every = batch_every
+        self.metrics = metrics
+        self._condition = threading.Condition()
+        self._queues = {priority: OrderedDict() for priority in AnalysisScheduler.PRIORITIES}
+        self._depth = dict.fromkeys(AnalysisScheduler.PRIORITIES, 0)
+        self._requests = dict.fromkeys(AnalysisScheduler.PRIORITIES, 0)
+        self._coalesced = dict.fromkeys(AnalysisScheduler.PRIORITIES, 0)
+        self._in_flight = {}
+        self._streak = 0  # Interactive analyses started in a row while batch requests waited
+        self._closed = False
+        for priority in AnalysisScheduler.PRIORITIES:
+            self.metrics.set_gauge("cv_analyzer_queue_depth", 0, {"class": priority})
+        self._threads = [threading.Thread(target=self._work, name=f"analysis-{position}", daemon=True)
+                         for position in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, cv_text, role_text, priority=INTERACTIVE, tenant=None, **kwargs):
+        """Queues an analysis, or joins the identical analysis already queued or running.
+
+        Args:
+            cv_text (str): The CV text.
+            role_text (str): The job description text.
+            priority (str): The priority class, `interactive` or `batch`.
+            tenant (str, optional): The tenant the request is queued for, defaults to `default`.
+            **kwargs: Additional arguments passed to the analysis function.
+
+        Returns:
+            Future: The future of the analysis result, shared by coalesced requests.
+
+        Raises:
+            ValueError: If the priority class is unknown.
+            RuntimeError: If the scheduler is shut down.
+        """
+        if priority not in AnalysisScheduler.PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}', expected one of: "
+                             f"{', '.join(AnalysisScheduler.PRIORITIES)}.")
+        key = None if kwargs else json.dumps([cv_text, role_text])
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("The scheduler is shut down.")
+            self._requests[priority] += 1
+            self.metrics.increment("cv_analyzer_scheduled_total", {"class": priority})
+            job = self._in_flight.get(key) if key is not None else None
+            if job is not None:
+                self._coalesced[priority] += 1
+                self.metrics.increment("cv_analyzer_coalesced_total", {"class": priority})
+                if not job.started and self._rank(priority) < self._rank(job.priority):
+                    self._depth[job.priority] -= 1  # Its entry in the lower class is skipped when reached
+                    self._record_depth(job.priority)
+                    job.priority = priority
+                    self._enqueue(job, tenant)
+                    self._condition.notify()
+            else:
+                job = _Job(key, cv_text, role_text, kwargs, priority)
+                if key is not None:
+                    self._in_flight[key] = job
+                self._enqueue(job, tenant)
+                self._condition.notify()
+            self.metrics.set_gauge("cv_analyzer_coalescing_ratio",
+                                   round(self._coalesced[priority] / self._requests[priority], 4), {"class": priority})
+        return job.future
+
+    def stats(self):
+        """Returns the queue depth, number of requests and coalescing rate of each class.
+
+        Returns:
+            dict: For each priority class, the number of `queued` analyses, of `requests` submitted and of
+                requests `coalesced` into another, and their `coalescing_rate`.
+        """
+        with self._condition:
+            return {priority: {"queued": self._depth[priority], "requests": self._requests[priority],
+                               "coalesced": self._coalesced[priority],
+                               "coalescing_rate": round(self._coalesced[priority] / self._requests[priority], 4)
+                               if self._requests[priority] else 0.0}
+                    for priority in AnalysisScheduler.PRIORITIES}
+
+    def shutdown(self, wait=True):
+        """Stops accepting analyses, and stops the workers once the queued analyses are done.
+
+        Args:
+            wait (bool): Whether to wait for the workers to stop.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _enqueue(self, job, tenant):
+        """Appends a job to its tenant's queue in its class; the caller holds the condition."""
+        self._queues[job.priority].setdefault(tenant or AnalysisScheduler.DEFAULT_TENANT, deque()).append(job)
+        self._depth[job.priority] += 1
+        self._record_depth(job.priority)
+
+    def _next(self):
+        """Pops the next job: highest class first unless the batch share is due; the caller holds the condition."""
+        batch_waiting = self._depth[AnalysisScheduler.BATCH] > 0
+        order = AnalysisScheduler.PRIORITIES
+        if batch_waiting and self._streak >= self.batch_every - 1:
+            order = tuple(reversed(order))
+        for priority in order:
+            job = self._pop(priority)
+            if job is not None:
+                self._streak = self._streak + 1 if batch_waiting and priority != AnalysisScheduler.BATCH else 0
+                return job
+        return None
+
+    def _pop(self, priority):
+        """Pops the next job of a class, tenants in turn; the caller holds the condition."""
+        tenants = self._queues[priority]
+        while tenants:
+            tenant, jobs = next(iter(tenants.items()))
+            job = jobs.popleft()
+            if jobs:
+                tenants.move_to_end(tenant)
+            else:
+                del tenants[tenant]
+            if not job.started and job.priority == priority:  # Skips the old entry of a promoted job
+                job.started = True
+                self._depth[priority] -= 1
+                self._record_depth(priority)
+                return job
+        return None
+
+    def _work(self):
+        """Runs queued jobs until the scheduler is shut down and its queues are empty."""
+        while True:
+            with self._condition:
+                job = self._next()
+                while job is None:
+                    if self._closed:
+                        return
+                    self._condition.wait()
+                    job = self._next()
+            self.metrics.observe("cv_analyzer_queue_wait_seconds", time.monotonic() - job.submitted,
+                                 {"class": job.priority})
+            try:
+                result = self.analyze(job.cv_text, job.role_text, **job.kwargs)
+            except BaseException as e:
+                self._finish(job)
+                job.future.set_exception(e)
+            else:
+                self._finish(job)
+                job.future.set_result(result)
+
+    def _finish(self, job):
+        """Stops coalescing new requests into a finished job."""
+        if job.key is not None:
+            with self._condition:
+                if self._in_flight.get(job.key) is job:
+                    del self._in_flight[job.key]
+
+    def _record_depth(self, priority):
+        """Updates the queue depth gauge of a class; the caller holds the condition."""
+        self.metrics.set_gauge("cv_analyzer_queue_depth", self._depth[priority], {"class": priority})
+
+    @staticmethod
+    def _rank(priority):
+        """Returns the rank of a priority class, 0 being the highest."""
+        return AnalysisScheduler.PRIORITIES.index(priority)
+
+
+class _Job:
+    """A queued or running analysis, and the future shared by the requests coalesced into it."""
+
+    __slots__ = ("key", "cv_text", "role_text", "kwargs", "priority", "future", "submitted", "started")
+
+    def __init__(self, key, cv_text, role_text, kwargs, priority):
+        self.key = key
+        self.cv_text = cv_text
+        self.role_text = role_text
+        self.kwargs = kwargs
+        self.priority = priority
+        self.future = Future()
+        self.submitted = time.monotonic()
+        self.started = False
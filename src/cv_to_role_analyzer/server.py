@@ -0,0 +1,503 @@
+import base64
+import json
+import queue
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cv_to_role_analyzer.scheduler import AnalysisScheduler
+from cv_to_role_analyzer.tracing import PrometheusSink, Tracer
+from cv_to_role_analyzer.utils import PDFProcessor
+from cv_to_role_analyzer.validation import AnalysisRequest
+
+
+class ServiceMetrics:
+    """
+    A class holding the counters and gauges of the HTTP service, rendered in the Prometheus text format.
+
+    Methods:
+        increment(name, labels, value): Increments a counter.
+        set_gauge(name, value, labels): Sets a gauge.
+        observe(name, seconds, labels): Records a duration in a summary (count and sum).
+        render(): Returns every metric in the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        """Initializes empty metrics."""
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._summaries = {}
+
+    def increment(self, name, labels=None, value=1):
+        """Increments a counter.
+
+        Args:
+            name (str): The metric name.
+            labels (dict, optional): The metric labels.
+            value (float): The amount to add.
+        """
+        key = ServiceMetrics._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, labels=None):
+        """Sets a gauge.
+
+        Args:
+            name (str): The metric name.
+            value (float): The current value.
+            labels (dict, optional): The metric labels.
+        """
+        with self._lock:
+            self._gauges[ServiceMetrics._key(name, labels)] = value
+
+    def observe(self, name, seconds, labels=None):
+        """Records a duration in a summary.
+
+        Args:
+            name (str): The metric name.
+            seconds (float): The observed duration.
+            labels (dict, optional): The metric labels.
+        """
+        key = ServiceMetrics._key(name, labels)
+        with self._lock:
+            count, total = self._summaries.get(key, (0, 0.0))
+            self._summaries[key] = (count + 1, total + seconds)
+
+    def render(self):
+        """Returns every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics, one sample per line.
+        """
+        lines = []
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                lines.append(f"{name}{ServiceMetrics._labels(labels)} {value}")
+            for (name, labels), value in sorted(self._gauges.items()):
+                lines.append(f"{name}{ServiceMetrics._labels(labels)} {value}")
+            for (name, labels), (count, total) in sorted(self._summaries.items()):
+                lines.append(f"{name}_count{ServiceMetrics._labels(labels)} {count}")
+                lines.append(f"{name}_sum{ServiceMetrics._labels(labels)} {round(total, 6)}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _key(name, labels):
+        """Returns the key of a metric and its labels."""
+        return name, tuple(sorted((labels or {}).items()))
+
+    @staticmethod
+    def _labels(labels):
+        """Formats the labels of a metric key, or nothing when it has none."""
+        return "{" + ",".join(f'{key}="{label}"' for key, label in labels) + "}" if labels else ""
+
+
+class AnalysisServer:
+    """
+    A long-running HTTP service that analyzes CVs on a bounded worker pool.
+
+    The service keeps the interpreter, imports and Gemini client warm across requests. Analyses run on a
+    fixed pool of workers behind a bounded queue: when `workers + max_queue` analyses of a priority class are
+    already admitted, new requests of that class are rejected immediately with `503 Service Unavailable`
+    instead of piling up. An `AnalysisScheduler` runs interactive requests before batch ones, serves tenants
+    in turn, and coalesces identical in-flight requests into one analysis.
+
+    Requests are interactive by default, except `/batch`; the `X-Priority` header (`interactive` or `batch`)
+    overrides the class and the `X-Tenant` header names the tenant.
+
+    Endpoints:
+        POST /analyze: Analyzes one CV, sent as a multipart upload (`cv` PDF file and `role` text field) or as
+            JSON (`role_text` with `cv_text` or base64 `cv_pdf`). Returns the JSON report, or `504 Gateway
+            Timeout` if the analysis does not finish within `REQUEST_TIMEOUT_SECONDS`.
+        POST /analyze/stream: Same input as `/analyze`; streams NDJSON lines `{"field", "value", "elapsed"}` as each
+            field is parsed (`match_score`, then each `skill_gap` and `recommendation`), ending with `report`.
+        POST /batch: Analyzes several CVs against one role, sent as JSON (`role_text` and `cvs`, a list of
+            `{"id", "text"}` or `{"id", "pdf"}` objects). Returns one result per CV; the analyses
+            unfinished after `REQUEST_TIMEOUT_SECONDS` have the `timeout` status, and the response is `504` if
+            none finished.
+        GET /healthz: Returns the service status.
+        GET /metrics: Returns the service metrics (including the queue depth, queue wait and coalesced requests
+            of each class), and the per-stage durations and counters recorded by the tracer, in the Prometheus
+            text format.
+
+    Attributes:
+        workers (int): The number of analyses running concurrently.
+        max_queue (int): The number of admitted analyses of each class allowed to wait for a worker.
+        analyze (callable): The function used to analyze a (cv_text, role_text) pair into a JSON string.
+        metrics (ServiceMetrics): The service metrics.
+        scheduler (AnalysisScheduler): The scheduler running the analyses on the worker pool.
+        stages (PrometheusSink): The trace sink aggregating the analysis stages, registered while serving.
+
+    Methods:
+        start(): Starts serving in a background thread and returns the bound address.
+        serve_forever(): Serves requests in the calling thread until shut down.
+        shutdown(): Stops serving and releases the worker pool.
+    """
+
+    MAX_BODY_BYTES = PDFProcessor.MAX_BYTES + 1024 * 1024
+    REQUEST_TIMEOUT_SECONDS = 120
+
+    def __init__(self, host="127.0.0.1", port=8080, workers=4, max_queue=32, analyze=None):
+        """
+        Initializes the service and binds its socket.
+
+        Args:
+            host (str): The interface to listen on.
+            port (int): The port to listen on, or 0 to pick a free port.
+            workers (int): The number of analyses running concurrently.
+            max_queue (int): The number of admitted analyses of each class allowed to wait for a worker.
+            analyze (callable, optional): The analysis function, defaults to `CVAnalyzer.analyze_core`.
+        """
+        if analyze is None:
+            from cv_to_role_analyzer.cv_analyzer import CVAnalyzer
+            analyze = CVAnalyzer.analyze_core
+        self.workers = workers
+        self.max_queue = max_queue
+        self.analyze = analyze
+        self.metrics = ServiceMetrics()
+        self.stages = PrometheusSink()
+        Tracer.add_sink(self.stages)
+        self._admitted = dict.fromkeys(AnalysisScheduler.PRIORITIES, 0)
+        self._admission_lock = threading.Lock()
+        self.scheduler = AnalysisScheduler(self._run_analysis, workers, self.metrics)
+        self._httpd = ThreadingHTTPServer((host, port), _RequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.service = self
+        self._thread = None
+        self.metrics.set_gauge("cv_analyzer_queue_capacity", workers + max_queue)
+        for priority in AnalysisScheduler.PRIORITIES:
+            self.metrics.set_gauge("cv_analyzer_admitted", 0, {"class": priority})
+
+    @property
+    def address(self):
+        """tuple: The (host, port) the service is bound to."""
+        return self._httpd.server_address[:2]
+
+    def start(self):
+        """Starts serving in a background thread.
+
+        Returns:
+            tuple: The (host, port) the service is bound to.
+        """
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.address
+
+    def serve_forever(self):
+        """Serves requests in the calling thread until shut down."""
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._close()
+
+    def shutdown(self):
+        """Stops serving and releases the worker pool."""
+        self._httpd.shutdown()
+        if self._thread is not None:
+            self._thread.join()
+            self._close()
+
+    def _close(self):
+        """Closes the socket and waits for the running analyses to finish."""
+        self._httpd.server_close()
+        self.scheduler.shutdown(wait=True)
+        Tracer.remove_sink(self.stages)
+
+    def admit(self, count, priority=AnalysisScheduler.INTERACTIVE):
+        """Admits `count` analyses if the queue of their class has room for all of them.
+
+        Args:
+            count (int): The number of analyses to admit.
+            priority (str): The priority class of the analyses.
+
+        Returns:
+            bool: True if admitted, False if the service is at capacity for the class.
+        """
+        with self._admission_lock:
+            if self._admitted[priority] + count > self.workers + self.max_queue:
+                return False
+            self._admitted[priority] += count
+            self.metrics.set_gauge("cv_analyzer_admitted", self._admitted[priority], {"class": priority})
+            return True
+
+    def release(self, priority=AnalysisScheduler.INTERACTIVE, count=1):
+        """Releases admitted analyses.
+
+        Args:
+            priority (str): The priority class of the analyses.
+            count (int): The number of analyses to release.
+        """
+        with self._admission_lock:
+            self._admitted[priority] -= count
+            self.metrics.set_gauge("cv_analyzer_admitted", self._admitted[priority], {"class": priority})
+
+    def submit(self, cv_text, role_text, on_field=None, priority=AnalysisScheduler.INTERACTIVE, tenant=None):
+        """Schedules an admitted analysis, and releases it once its result is available.
+
+        Args:
+            cv_text (str): The CV text, or None if it could not be extracted.
+            role_text (str): The job description text.
+            on_field (callable, optional): Called with each FieldEvent of a streamed analysis.
+            priority (str): The priority class of the analysis.
+            tenant (str, optional): The tenant the analysis is queued for.
+
+        Returns:
+            Future: The future of the analysis report (a dictionary), shared with identical in-flight requests.
+
+        Raises:
+            RuntimeError: If the service is shutting down. The analysis is released in that case too.
+        """
+        kwargs = {"on_field": on_field} if on_field is not None else {}
+        try:
+            future = self.scheduler.submit(cv_text, role_text, priority, tenant, **kwargs)
+        except BaseException:
+            self.release(priority)
+            raise
+        future.add_done_callback(lambda _: self.release(priority))
+        return future
+
+    def _run_analysis(self, cv_text, role_text, on_field=None):
+        """Validates and analyzes one CV on a worker, recording its outcome and duration."""
+        start = time.perf_counter()
+        try:
+            AnalysisRequest.process_record("request", cv_text, role_text)
+            if on_field is None:
+                report = json.loads(self.analyze(cv_text, role_text))
+            else:
+                report = json.loads(self.analyze(cv_text, role_text, on_field=on_field))
+            self.metrics.increment("cv_analyzer_analyses_total", {"status": "ok"})
+            return report
+        except Exception:
+            self.metrics.increment("cv_analyzer_analyses_total", {"status": "failed"})
+            raise
+        finally:
+            self.metrics.observe("cv_analyzer_analysis_seconds", time.perf_counter() - start)
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """Routes the HTTP requests of an `AnalysisServer`."""
+
+    ROUTES = ("/analyze", "/analyze/stream", "/batch")  # The POST endpoints, and the path labels of the metrics
+    FILE_FIELDS = ("cv", "cv_pdf")  # The multipart uploads kept as bytes; the other fields are UTF-8 text
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        """Silences the default per-request logging on stderr."""
+
+    def do_GET(self):
+        service = self.server.service
+        if self.path == "/healthz":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/metrics":
+            self._send(200, (service.metrics.render() + service.stages.render()).encode("utf-8"),
+                       "text/plain; version=0.0.4")
+        else:
+            self._send_json(404, {"error": f"Unknown endpoint {self.path}."})
+
+    def do_POST(self):
+        service = self.server.service
+        start = time.perf_counter()
+        try:
+            if self.path == "/analyze":
+                status, payload = self._analyze(service)
+            elif self.path == "/analyze/stream":
+                status, payload = self._analyze_stream(service)
+            elif self.path == "/batch":
+                status, payload = self._batch(service)
+            else:
+                status, payload = 404, {"error": f"Unknown endpoint {self.path}."}
+        except ValueError as e:
+            status, payload = 400, {"error": str(e)}
+        except Exception as e:
+            status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+        service.metrics.observe("cv_analyzer_request_seconds", time.perf_counter() - start)
+        route = self.path if self.path in _RequestHandler.ROUTES else "unknown"  # Bounds the metric series
+        service.metrics.increment("cv_analyzer_requests_total", {"path": route, "status": str(status)})
+        if payload is not None:  # A streamed response has already been sent
+            headers = {"Retry-After": "1"} if status == 503 else {}
+            self._send_json(status, payload, headers)
+
+    def _analyze(self, service):
+        """Handles POST /analyze."""
+        fields = self._read_fields()
+        role_text = fields.get("role_text") or fields.get("role")
+        cv_text = fields.get("cv_text") or self._extract_pdf(fields.get("cv_pdf") or fields.get("cv"), "cv")
+        priority, tenant = self._scheduling(AnalysisScheduler.INTERACTIVE)
+        if not service.admit(1, priority):
+            return 503, {"error": "The service is at capacity, please retry later."}
+        future = service.submit(cv_text, role_text, priority=priority, tenant=tenant)
+        try:
+            return 200, future.result(timeout=service.REQUEST_TIMEOUT_SECONDS)
+        except FutureTimeoutError:
+            if future.done():  # The analysis itself raised a timeout error
+                raise
+            return 504, {"error": f"The analysis did not finish within {service.REQUEST_TIMEOUT_SECONDS} seconds."}
+
+    def _analyze_stream(self, service):
+        """Handles POST /analyze/stream, sending each field as an NDJSON line as soon as it is parsed."""
+        fields = self._read_fields()
+        role_text = fields.get("role_text") or fields.get("role")
+        cv_text = fields.get("cv_text") or self._extract_pdf(fields.get("cv_pdf") or fields.get("cv"), "cv")
+        priority, tenant = self._scheduling(AnalysisScheduler.INTERACTIVE)
+        if not service.admit(1, priority):
+            return 503, {"error": "The service is at capacity, please retry later."}
+        events = queue.Queue()
+        future = service.submit(cv_text, role_text, on_field=events.put, priority=priority, tenant=tenant)
+        future.add_done_callback(lambda _: events.put(None))
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        deadline = time.monotonic() + service.REQUEST_TIMEOUT_SECONDS
+        try:
+            while True:
+                event = events.get(timeout=max(0.0, deadline - time.monotonic()))
+                if event is None:
+                    break
+                self._send_chunk({"field": event.field, "value": event.value, "elapsed": round(event.elapsed, 3)})
+            future.result(timeout=0)
+        except queue.Empty:
+            self._send_chunk({"field": "error", "value": "The analysis did not finish in time."})
+            self.close_connection = True
+        except Exception as e:
+            self._send_chunk({"field": "error", "value": f"{type(e).__name__}: {e}"})
+            self.close_connection = True
+        self.wfile.write(b"0\r\n\r\n")
+        return 200, None
+
+    def _send_chunk(self, payload):
+        """Sends one NDJSON line as an HTTP chunk."""
+        line = json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n"
+        self.wfile.write(f"{len(line):X}\r\n".encode("ascii") + line + b"\r\n")
+        self.wfile.flush()
+
+    def _batch(self, service):
+        """Handles POST /batch."""
+        fields = self._read_fields()
+        role_text = fields.get("role_text")
+        cvs = fields.get("cvs")
+        if not isinstance(cvs, list) or not cvs:
+            raise ValueError("The request must contain a non-empty 'cvs' list.")
+        priority, tenant = self._scheduling(AnalysisScheduler.BATCH)
+        if not service.admit(len(cvs), priority):
+            return 503, {"error": f"The service cannot queue {len(cvs)} analyses now, please retry later."}
+
+        futures = []
+        unsubmitted = len(cvs)  # Admitted analyses not handed to `service.submit` yet, released here on failure
+        try:
+            for position, cv in enumerate(cvs):
+                cv_id = str(cv.get("id", position)) if isinstance(cv, dict) else str(position)
+                try:
+                    cv_text = (cv.get("text") or self._extract_pdf(cv.get("pdf"), cv_id)
+                               if isinstance(cv, dict) else None)
+                except ValueError:
+                    cv_text = None
+                unsubmitted -= 1  # `service.submit` releases its analysis, even when it fails
+                futures.append((cv_id, service.submit(cv_text, role_text, priority=priority, tenant=tenant)))
+        except BaseException:
+            service.release(priority, unsubmitted)
+            raise
+
+        results = []
+        deadline = time.monotonic() + service.REQUEST_TIMEOUT_SECONDS
+        for cv_id, future in futures:
+            try:
+                results.append({"id": cv_id, "status": "ok",
+                                "report": future.result(timeout=max(0.0, deadline - time.monotonic()))})
+            except Exception as e:
+                if isinstance(e, FutureTimeoutError) and not future.done():  # The request deadline passed
+                    results.append({"id": cv_id, "status": "timeout", "error": "The analysis did not finish within "
+                                    f"{service.REQUEST_TIMEOUT_SECONDS} seconds."})
+                else:
+                    results.append({"id": cv_id, "status": "failed", "error": f"{type(e).__name__}: {e}"})
+        timed_out = all(result["status"] == "timeout" for result in results)
+        return 504 if timed_out else 200, {"results": results}
+
+    def _scheduling(self, default):
+        """Returns the priority class and tenant of the request, from its `X-Priority` and `X-Tenant` headers.
+
+        Raises:
+            ValueError: If the priority class is unknown.
+        """
+        priority = (self.headers.get("X-Priority") or default).strip().lower()
+        if priority not in AnalysisScheduler.PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}', expected one of: "
+                             f"{', '.join(AnalysisScheduler.PRIORITIES)}.")
+        return priority, (self.headers.get("X-Tenant") or "").strip() or None
+
+    def _read_fields(self):
+        """Reads the request body as JSON or multipart form data.
+
+        Returns:
+            dict: The request fields; the `cv` and `cv_pdf` multipart file uploads are returned as bytes, and the
+                other fields as text, even when sent as file uploads.
+
+        Raises:
+            ValueError: If the body is missing, too large or malformed.
+        """
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0:
+            raise ValueError("The request body is empty.")
+        if length > self.server.service.MAX_BODY_BYTES:
+            self.close_connection = True
+            raise ValueError(f"The request body exceeds {self.server.service.MAX_BODY_BYTES} bytes.")
+        body = self.rfile.read(length)
+        content_type = self.headers.get("Content-Type", "")
+
+        if content_type.startswith("multipart/form-data"):
+            message = BytesParser(policy=HTTP).parsebytes(
+                f"Content-Type: {content_type}\r\n\r\n".encode("latin-1") + body
+            )
+            fields = {}
+            for part in message.iter_parts():
+                name = part.get_param("name", header="content-disposition")
+                payload = part.get_payload(decode=True) or b""
+                if name in _RequestHandler.FILE_FIELDS and part.get_filename():
+                    fields[name] = payload
+                    continue
+                try:
+                    fields[name] = payload.decode("utf-8")
+                except UnicodeDecodeError as e:
+                    raise ValueError(f"The field '{name}' is not valid UTF-8 text: {e}") from e
+            return fields
+        try:
+            fields = json.loads(body)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise ValueError(f"The request body is not valid JSON: {e}") from e
+        if not isinstance(fields, dict):
+            raise ValueError("The request body must be a JSON object.")
+        return fields
+
+    @staticmethod
+    def _extract_pdf(data, name):
+        """Extracts the text of an uploaded PDF, given as bytes or as a base64 string."""
+        if not data:
+            return None
+        if isinstance(data, str):
+            try:
+                data = base64.b64decode(data, validate=True)
+            except ValueError as e:
+                raise ValueError(f"The PDF of {name} is not valid base64: {e}") from e
+        try:
+            text, _ = PDFProcessor.extract_bytes_with_stats(data, name)
+        except Exception as e:  # pypdf raises its own errors on malformed documents
+            raise ValueError(f"The PDF of {name} could not be read: {e}") from e
+        return text
+
+    def _send_json(self, status, payload, headers=None):
+        self._send(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json", headers)
+
+    def _send(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
@@ -0,0 +1,194 @@
+import json
+import time
+from collections import namedtuple
+
+from cv_to_role_analyzer.report import AnalysisReport
+
+
+class IncrementalJSONParser:
+    """
+    A parser reporting the fields of a JSON object while its text is still arriving in chunks.
+
+    The text is scanned once, character by character, across chunks. A value is reported as soon as it is
+    complete: each top-level field of the object with the path `(key,)`, and each item of a top-level array
+    with the path `(key, index)`, before the array itself is closed. Numbers and literals are complete at the
+    delimiter that follows them. Text before the opening brace, such as a code fence, is skipped.
+
+    Attributes:
+        text (str): The text received so far.
+        done (bool): Whether the top-level object has been closed.
+
+    Methods:
+        feed(chunk): Consumes a chunk of text and returns the values completed by it.
+    """
+
+    WHITESPACE = " \t\r\n"
+
+    def __init__(self):
+        """Initializes an empty parser."""
+        self.text = ""
+        self._position = 0
+        self._stack = []  # One [kind, key or index, expecting a key, start offset] frame per open container
+        self._string_start = None
+        self._escaped = False
+        self._literal_start = None
+        self.done = False
+
+    def feed(self, chunk):
+        """Consumes a chunk of text and returns the values completed by it.
+
+        Args:
+            chunk (str): The next chunk of the response text.
+
+        Returns:
+            list: The `(path, value)` pairs completed by the chunk, in order of completion.
+        """
+        self.text += chunk
+        events = []
+        text = self.text
+        for index in range(self._position, len(text)):
+            if self.done:
+                break
+            char = text[index]
+            if self._string_start is not None:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    start, self._string_start = self._string_start, None
+                    frame = self._stack[-1]
+                    if frame[0] == "object" and frame[2]:
+                        frame[1] = json.loads(text[start:index + 1])
+                    else:
+                        self._complete(text[start:index + 1], events)
+                continue
+
+            if self._literal_start is not None and (char in ",]}" or char in self.WHITESPACE):
+                self._complete(text[self._literal_start:index], events)
+                self._literal_start = None
+
+            if not self._stack:
+                if char == "{":
+                    self._stack.append(["object", None, True, index])
+            elif char == '"':
+                self._string_start = index
+            elif char in "{[":
+                self._stack.append(["object", None, True, index] if char == "{" else ["array", 0, False, index])
+            elif char in "}]":
+                frame = self._stack.pop()
+                if self._stack:
+                    self._complete(text[frame[3]:index + 1], events)
+                else:
+                    self.done = True
+            elif char == ":":
+                self._stack[-1][2] = False
+            elif char == ",":
+                frame = self._stack[-1]
+                if frame[0] == "object":
+                    frame[2] = True
+                else:
+                    frame[1] += 1
+            elif char not in self.WHITESPACE and self._literal_start is None:
+                self._literal_start = index
+        self._position = len(text)
+        return events
+
+    def _complete(self, value_text, events):
+        """Reports a completed value if it is a top-level field or an item of a top-level array."""
+        depth = len(self._stack)
+        if depth == 1 or (depth == 2 and self._stack[1][0] == "array"):
+            try:
+                value = json.loads(value_text)
+            except json.JSONDecodeError:
+                return  # Malformed values are left to the repair of the full text
+            events.append((tuple(frame[1] for frame in self._stack), value))
+
+
+class FieldEvent(namedtuple("FieldEvent", "field value elapsed")):
+    """
+    A field of an analysis report, emitted as soon as it is available.
+
+    Attributes:
+        field (str): `match_score`, `skill_gap` (one gap), `recommendation` (one recommendation), or `report`
+            for the final, complete analysis.
+        value: The field value: an integer, a `{"category", "gap"}` dictionary, a string, or the analysis.
+        elapsed (float): The seconds elapsed since the request was sent.
+    """
+
+    __slots__ = ()
+
+
+class FieldStream:
+    """
+    Turns a streamed response text into field events, each field emitted once, and times them.
+
+    Attributes:
+        parser (IncrementalJSONParser): The parser of the response text.
+        first_field_seconds (float): The seconds until the first field was emitted, or None.
+
+    Methods:
+        feed(chunk): Returns the events of the fields completed by a chunk of the response text.
+        finish(analysis): Returns the events of the fields not emitted yet, then the final report event.
+    """
+
+    ITEM_FIELDS = {"skill_gaps": "skill_gap", "skill_gap": "skill_gap", "recommendations": "recommendation"}
+
+    def __init__(self):
+        """Starts the clock of a streamed request."""
+        self.parser = IncrementalJSONParser()
+        self.first_field_seconds = None
+        self._start = time.perf_counter()
+        self._emitted = {"match_score": 0, "skill_gap": 0, "recommendation": 0}
+
+    def feed(self, chunk):
+        """Returns the events of the fields completed by a chunk of the response text.
+
+        Args:
+            chunk (str): The next chunk of the response text.
+
+        Returns:
+            list: The new FieldEvent objects.
+        """
+        events = []
+        for path, value in self.parser.feed(chunk):
+            if path == ("match_score",):
+                normalized, _ = AnalysisReport.normalize({"match_score": value})
+                events.extend(self._events("match_score", [normalized.get("match_score")]))
+            elif len(path) == 2 and path[0] in self.ITEM_FIELDS:
+                key = "recommendations" if path[0] == "recommendations" else "skill_gaps"
+                normalized, _ = AnalysisReport.normalize({key: [value]})
+                events.extend(self._events(self.ITEM_FIELDS[path[0]], normalized[key]))
+        return events
+
+    def finish(self, analysis):
+        """Returns the events of the fields not emitted yet, then the final report event.
+
+        Fields can be missing from the stream when the text had to be repaired or the analysis was retried.
+
+        Args:
+            analysis (dict): The complete analysis, or None if it failed.
+
+        Returns:
+            list: The FieldEvent objects, the last one being the `report` event.
+        """
+        analysis = analysis or {}
+        events = []
+        if not self._emitted["match_score"] and "match_score" in analysis:
+            events.extend(self._events("match_score", [analysis["match_score"]]))
+        for key, field in (("skill_gaps", "skill_gap"), ("recommendations", "recommendation")):
+            events.extend(self._events(field, analysis.get(key, [])[self._emitted[field]:]))
+        return events + [FieldEvent("report", analysis or None, time.perf_counter() - self._start)]
+
+    def _events(self, field, values):
+        """Wraps values in events, recording the time to the first one."""
+        events = []
+        for value in values:
+            if value is None:
+                continue
+            elapsed = time.perf_counter() - self._start
+            if self.first_field_seconds is None:
+                self.first_field_seconds = elapsed
+            self._emitted[field] += 1
+            events.append(FieldEvent(field, value, elapsed))
+        return events
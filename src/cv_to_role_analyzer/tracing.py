@@ -0,0 +1,347 @@
+import contextlib
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+
+
+class Span:
+    """
+    A timed stage of an analysis, such as the PDF extraction or the LLM call.
+
+    Attributes:
+        name (str): The stage name, e.g. `llm.call`.
+        trace_id (str): The identifier shared by every span of one analysis (32 hex digits).
+        span_id (str): The identifier of the span (16 hex digits).
+        parent_id (str): The identifier of the enclosing span, or None for a root span.
+        start (float): The start time, in seconds since the epoch.
+        duration (float): The duration, in seconds.
+        attributes (dict): The attributes of the stage, such as page or token counts.
+    """
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start", "duration", "attributes", "_started")
+
+    def __init__(self, name, parent, attributes):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.start = time.time()
+        self.duration = 0.0
+        self.attributes = attributes
+        self._started = time.perf_counter()
+
+    def set(self, **attributes):
+        """Adds attributes to the span."""
+        self.attributes.update(attributes)
+
+
+class _NoSpan:
+    """The span handed out when tracing is disabled; it records nothing."""
+
+    def set(self, **attributes):
+        pass
+
+
+class Tracer:
+    """
+    The process-wide tracer recording spans and counters of every analysis stage.
+
+    Stages are wrapped in `Tracer.span(name)` blocks, which nest: spans opened inside another span, in the
+    same thread or asyncio task, share its trace. Counters (retries, cache hits, tokens, bytes of text) are
+    recorded with `Tracer.count`. Finished spans and counters are handed to the registered sinks; with no
+    sink registered, tracing costs a single check per stage.
+
+    Methods:
+        add_sink(sink): Registers a sink.
+        remove_sink(sink): Unregisters a sink.
+        span(name, **attributes): Times a block of code as a span.
+        count(name, value, **labels): Increments a counter.
+        sink_from_spec(spec): Creates a sink from a `log`, `prometheus:<path>` or `otel:<path>` specification.
+    """
+
+    _sinks = ()
+    _lock = threading.Lock()
+    _current = contextvars.ContextVar("cv_analyzer_span", default=None)
+
+    @staticmethod
+    def add_sink(sink):
+        """Registers a sink.
+
+        Args:
+            sink (TraceSink): The sink receiving the finished spans and the counters.
+        """
+        with Tracer._lock:
+            Tracer._sinks = (*Tracer._sinks, sink)
+
+    @staticmethod
+    def remove_sink(sink):
+        """Unregisters a sink.
+
+        Args:
+            sink (TraceSink): The sink to remove.
+        """
+        with Tracer._lock:
+            Tracer._sinks = tuple(registered for registered in Tracer._sinks if registered is not sink)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def span(name, **attributes):
+        """Times a block of code as a span, nested in the current span if any.
+
+        Args:
+            name (str): The stage name.
+            **attributes: The attributes of the stage.
+
+        Yields:
+            Span: The open span, to which more attributes can be added.
+        """
+        sinks = Tracer._sinks
+        if not sinks:
+            yield _NoSpan()
+            return
+        span = Span(name, Tracer._current.get(), attributes)
+        token = Tracer._current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.attributes["error"] = type(e).__name__
+            raise
+        finally:
+            span.duration = time.perf_counter() - span._started
+            Tracer._current.reset(token)
+            for sink in sinks:
+                sink.on_span(span)
+
+    @staticmethod
+    def count(name, value=1, **labels):
+        """Increments a counter.
+
+        Args:
+            name (str): The counter name, e.g. `llm_tokens_sent`.
+            value (float): The amount to add.
+            **labels: The counter labels.
+        """
+        for sink in Tracer._sinks:
+            sink.on_count(name, value, labels)
+
+    @staticmethod
+    def sink_from_spec(spec):
+        """Creates a sink from its specification.
+
+        Args:
+            spec (str): `log` for log lines on stderr, `prometheus:<path>` for a Prometheus text dump, or
+                `otel:<path>` for OpenTelemetry (OTLP/JSON) lines appended to a file.
+
+        Returns:
+            TraceSink: The sink.
+
+        Raises:
+            ValueError: If the specification is not recognized.
+        """
+        kind, _, path = spec.partition(":")
+        if kind == "log" and not path:
+            return LogSink()
+        if kind == "prometheus" and path:
+            return PrometheusSink(path)
+        if kind == "otel" and path:
+            return OTelFileSink(path)
+        raise ValueError(f"Unknown trace sink '{spec}'. Use log, prometheus:<path> or otel:<path>.")
+
+
+class TraceSink:
+    """
+    The interface of the destinations of spans and counters.
+
+    Methods:
+        on_span(span): Receives a finished span.
+        on_count(name, value, labels): Receives a counter increment.
+        close(): Flushes and releases the sink.
+    """
+
+    def on_span(self, span):
+        pass
+
+    def on_count(self, name, value, labels):
+        pass
+
+    def close(self):
+        pass
+
+
+class LogSink(TraceSink):
+    """A sink writing one log line per span and counter increment."""
+
+    def __init__(self, stream=None):
+        """
+        Initializes the sink.
+
+        Args:
+            stream (file, optional): The stream to write to, defaults to stderr.
+        """
+        self.stream = stream or sys.stderr
+        self._lock = threading.Lock()
+
+    def on_span(self, span):
+        attributes = "".join(f" {key}={value}" for key, value in span.attributes.items())
+        self._write(f"trace span={span.name} duration_ms={span.duration * 1000:.3f} trace_id={span.trace_id} "
+                    f"span_id={span.span_id} parent_id={span.parent_id or '-'}{attributes}")
+
+    def on_count(self, name, value, labels):
+        self._write(f"trace counter={name} value={value}" + "".join(f" {key}={label}" for key, label in labels.items()))
+
+    def _write(self, line):
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+class StageAggregator(TraceSink):
+    """
+    A sink aggregating the spans per stage and the counters, as the base of the summary sinks.
+
+    Attributes:
+        stages (dict): The count, total and maximum duration of each stage, keyed by stage name.
+        counters (dict): The total of each counter, keyed by name and labels.
+    """
+
+    def __init__(self):
+        """Initializes empty aggregates."""
+        self._lock = threading.Lock()
+        self.stages = {}
+        self.counters = {}
+
+    def on_span(self, span):
+        with self._lock:
+            count, total, longest = self.stages.get(span.name, (0, 0.0, 0.0))
+            self.stages[span.name] = (count + 1, total + span.duration, max(longest, span.duration))
+
+    def on_count(self, name, value, labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+
+class PrometheusSink(StageAggregator):
+    """A sink rendering the stage durations and counters in the Prometheus text format."""
+
+    def __init__(self, path=None):
+        """
+        Initializes the sink.
+
+        Args:
+            path (str, optional): The file the metrics are written to when the sink is closed.
+        """
+        super().__init__()
+        self.path = path
+
+    def render(self):
+        """Returns the stage durations and counters in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics, one sample per line.
+        """
+        lines = ["# TYPE cv_analyzer_stage_seconds summary"]
+        with self._lock:
+            for name, (count, total, _) in sorted(self.stages.items()):
+                lines.append(f'cv_analyzer_stage_seconds_count{{stage="{name}"}} {count}')
+                lines.append(f'cv_analyzer_stage_seconds_sum{{stage="{name}"}} {round(total, 6)}')
+            for (name, labels), value in sorted(self.counters.items()):
+                label_text = ",".join(f'{key}="{label}"' for key, label in labels)
+                lines.append(f"cv_analyzer_{name}_total{{{label_text}}} {value}" if label_text
+                             else f"cv_analyzer_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        if self.path:
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write(self.render())
+
+
+class ProfileSink(StageAggregator):
+    """A sink summarizing where the time went, for the `--profile` option."""
+
+    def report(self):
+        """Returns the per-stage breakdown and the counters as a text table.
+
+        Returns:
+            str: One line per stage (calls, total, mean and maximum milliseconds), then one line per counter.
+        """
+        lines = [f"{'Stage':<20}{'Calls':>8}{'Total ms':>12}{'Mean ms':>12}{'Max ms':>12}"]
+        with self._lock:
+            for name, (count, total, longest) in sorted(self.stages.items(), key=lambda item: -item[1][1]):
+                lines.append(f"{name:<20}{count:>8}{total * 1000:>12.1f}{total * 1000 / count:>12.1f}"
+                             f"{longest * 1000:>12.1f}")
+            for (name, labels), value in sorted(self.counters.items()):
+                label_text = ",".join(f"{key}={label}" for key, label in labels)
+                lines.append(f"{name}{f' ({label_text})' if label_text else ''}: {value}")
+        return "\n".join(lines)
+
+
+class OTelFileSink(StageAggregator):
+    """
+    A sink exporting spans as OpenTelemetry (OTLP/JSON) lines appended to a local file.
+
+    Each line is an `ExportTraceServiceRequest` holding one span, the format read by the OpenTelemetry
+    Collector file receiver. The counters are appended as one `ExportMetricsServiceRequest` line of
+    cumulative sums when the sink is closed.
+    """
+
+    RESOURCE = {"attributes": [{"key": "service.name", "value": {"stringValue": "cv-analyzer"}}]}
+    SCOPE = {"name": "cv_to_role_analyzer"}
+
+    def __init__(self, path):
+        """
+        Initializes the sink.
+
+        Args:
+            path (str): The file the OTLP/JSON lines are appended to.
+        """
+        super().__init__()
+        self.path = path
+        self._started = time.time_ns()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def on_span(self, span):
+        start = int(span.start * 1e9)
+        record = {
+            "traceId": span.trace_id, "spanId": span.span_id, "parentSpanId": span.parent_id or "",
+            "name": span.name, "kind": 1, "startTimeUnixNano": str(start),
+            "endTimeUnixNano": str(start + int(span.duration * 1e9)),
+            "attributes": [OTelFileSink._attribute(key, value) for key, value in span.attributes.items()],
+            "status": {"code": 2 if "error" in span.attributes else 1},
+        }
+        line = json.dumps({"resourceSpans": [{"resource": OTelFileSink.RESOURCE,
+                                              "scopeSpans": [{"scope": OTelFileSink.SCOPE, "spans": [record]}]}]})
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self):
+        now = str(time.time_ns())
+        with self._lock:
+            metrics = [{
+                "name": f"cv_analyzer.{name}",
+                "sum": {"aggregationTemporality": 2, "isMonotonic": True, "dataPoints": [{
+                    "asDouble": float(value), "startTimeUnixNano": str(self._started), "timeUnixNano": now,
+                    "attributes": [OTelFileSink._attribute(key, label) for key, label in labels],
+                }]},
+            } for (name, labels), value in sorted(self.counters.items())]
+            if metrics:
+                self._file.write(json.dumps({"resourceMetrics": [{
+                    "resource": OTelFileSink.RESOURCE,
+                    "scopeMetrics": [{"scope": OTelFileSink.SCOPE, "metrics": metrics}],
+                }]}) + "\n")
+            self._file.close()
+
+    @staticmethod
+    def _attribute(key, value):
+        """Converts an attribute to its OTLP/JSON form."""
+        if isinstance(value, bool):
+            return {"key": key, "value": {"boolValue": value}}
+        if isinstance(value, int):
+            return {"key": key, "value": {"intValue": str(value)}}
+        if isinstance(value, float):
+            return {"key": key, "value": {"doubleValue": value}}
+        return {"key": key, "value": {"stringValue": str(value)}}
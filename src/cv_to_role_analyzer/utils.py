@@ -1,5 +1,82 @@
-import pypdf
+import hashlib
+import importlib
+import io
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
 import click
+from cv_to_role_analyzer.tracing import Tracer
+
+
+class LazyModule:
+    """
+    A stand-in for a module that is imported the first time one of its attributes is used.
+
+    Heavy third-party packages (the Gemini SDK, pypdf, python-dotenv) are bound to lazy modules at the top of
+    the modules using them, so `--help`, `--version`, input validation and offline backends start without
+    paying for their import. The import itself goes through `importlib`, which is thread-safe.
+
+    Attributes:
+        name (str): The dotted name of the wrapped module.
+
+    Methods:
+        loaded(): Checks whether the wrapped module has been imported.
+    """
+
+    def __init__(self, name):
+        """
+        Initializes the lazy module without importing it.
+
+        Args:
+            name (str): The dotted name of the module, e.g. `google.genai.types`.
+        """
+        self.name = name
+        self._module = None
+
+    def __getattr__(self, attribute):
+        if self._module is None:
+            self._module = importlib.import_module(self.name)
+        return getattr(self._module, attribute)
+
+    def loaded(self):
+        """Checks whether the wrapped module has been imported, by this object or elsewhere in the process.
+
+        Returns:
+            bool: True if the module is in `sys.modules`.
+        """
+        return self._module is not None or self.name in sys.modules
+
+
+pypdf = LazyModule("pypdf")
+
+
+class TokenCounter:
+    """
+    A class for estimating the number of LLM tokens in a text without calling the provider.
+
+    Methods:
+        estimate(text): Estimates the number of tokens in a text.
+    """
+
+    CHARS_PER_TOKEN = 4
+
+    @staticmethod
+    def estimate(text):
+        """Estimates the number of tokens in a text, using the usual ~4 characters per token of English text.
+
+        Args:
+            text (str): The text to measure.
+
+        Returns:
+            int: The estimated number of tokens.
+        """
+        return -(-len(text or "") // TokenCounter.CHARS_PER_TOKEN)  # Ceiling division
 
 
 class RoleProcessor:
@@ -36,20 +113,71 @@ class RoleProcessor:
             return None
 
 
+def _extract_page_range(data, start, stop):
+    """Extracts the text of pages [start, stop) from PDF bytes; runs inside a worker process.
+
+    Args:
+        data (bytes): The content of the PDF file.
+        start (int): The index of the first page to extract.
+        stop (int): The index after the last page to extract.
+
+    Returns:
+        list: The non-empty page texts, in page order.
+    """
+    reader = pypdf.PdfReader(io.BytesIO(data))
+    texts = []
+    for index in range(start, stop):
+        page_text = reader.pages[index].extract_text()
+        if page_text:
+            texts.append(page_text)
+    return texts
+
+
 class PDFProcessor:
     """
     A class responsible for extracting text from PDF files.
 
+    Extracted text is cached in memory by the SHA-256 of the file content, so reprocessing the same PDF
+    does not extract it again. Large documents can have their pages split across a process pool, and hard
+    caps on file size and page count keep pathological PDFs from stalling a worker.
+
+    Attributes:
+        MAX_BYTES (int): The largest accepted PDF file, in bytes (FR1.1: 10MB).
+        MAX_PAGES (int): The maximum number of pages extracted from a single PDF.
+        PARALLEL_MIN_PAGES (int): The page count from which extraction is split across worker processes.
+        CACHE_SIZE (int): The number of extracted documents kept in the in-memory cache.
+        PAGE_BREAK (str): The separator placed between the texts of consecutive pages.
+
     Methods:
-        extract_text(pdf_path): Extracts text from a given PDF file and returns it as a string.
+        extract_text(pdf_path, workers, max_pages, max_bytes): Extracts text from a given PDF file and
+            returns it as a string.
+        extract_text_with_stats(pdf_path, workers, max_pages, max_bytes): Extracts text from a given PDF file
+            and returns it together with per-document statistics and timing.
+        extract_bytes_with_stats(data, name, workers, max_pages, max_bytes): Same as `extract_text_with_stats`
+            for the content of a PDF file held in memory.
     """
 
+    MAX_BYTES = 10 * 1024 * 1024
+    MAX_PAGES = 100
+    PARALLEL_MIN_PAGES = 8
+    CACHE_SIZE = 256
+    PAGE_BREAK = "\f"  # Form feed, so that per-page headers and footers can be told apart later
+
+    _cache = OrderedDict()
+    _cache_lock = threading.Lock()
+    _pool = None
+    _pool_workers = 0
+    _pool_lock = threading.Lock()
+
     @staticmethod
-    def extract_text(pdf_path):
+    def extract_text(pdf_path, workers=1, max_pages=MAX_PAGES, max_bytes=MAX_BYTES):
         """Extracts text from a given PDF file.
 
         Args:
             pdf_path (str): The file path to the PDF document.
+            workers (int): The number of worker processes used to extract the pages of large documents.
+            max_pages (int): The maximum number of pages to extract; later pages are skipped.
+            max_bytes (int): The largest accepted file size, in bytes.
 
         Returns:
             str: The extracted text from the PDF, or None if no text could be extracted.
@@ -58,18 +186,145 @@ class PDFProcessor:
             FileNotFoundError: If the PDF file at the specified path is not found.
             IOError: If an error occurs while reading the PDF file.
         """
+        return PDFProcessor.extract_text_with_stats(pdf_path, workers, max_pages, max_bytes)[0]
+
+    @staticmethod
+    def extract_text_with_stats(pdf_path, workers=1, max_pages=MAX_PAGES, max_bytes=MAX_BYTES):
+        """Extracts text from a given PDF file and reports per-document statistics.
+
+        Args:
+            pdf_path (str): The file path to the PDF document.
+            workers (int): The number of worker processes used to extract the pages of large documents.
+            max_pages (int): The maximum number of pages to extract; later pages are skipped.
+            max_bytes (int): The largest accepted file size, in bytes.
+
+        Returns:
+            tuple: The extracted text (or None) and a dictionary with the file size, content hash, page
+                counts, whether the result came from the cache, the number of workers used and the elapsed
+                seconds.
+        """
+        start = time.perf_counter()
         try:
+            size = os.path.getsize(pdf_path)
+            if size > max_bytes:
+                click.echo(f"Error: The PDF file {pdf_path} is {size} bytes, above the {max_bytes} bytes limit.")
+                return None, PDFProcessor._new_stats(pdf_path, size, start)
             with open(pdf_path, "rb") as file:
-                reader = pypdf.PdfReader(file)
-                text = []
-                for page in reader.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text.append(page_text)
-                return " ".join(text) if text else None
+                data = file.read()
+            return PDFProcessor.extract_bytes_with_stats(data, pdf_path, workers, max_pages, max_bytes)
         except FileNotFoundError:
             click.echo(f"Error: The PDF file at {pdf_path} was not found.")
-            return None
+            return None, PDFProcessor._new_stats(pdf_path, 0, start)
         except IOError as e:
             click.echo(f"Error reading the PDF file {pdf_path}: {e}")
-            return None
+            return None, PDFProcessor._new_stats(pdf_path, 0, start)
+
+    @staticmethod
+    def extract_bytes_with_stats(data, name="<bytes>", workers=1, max_pages=MAX_PAGES, max_bytes=MAX_BYTES):
+        """Extracts text from the content of a PDF file held in memory and reports per-document statistics.
+
+        Args:
+            data (bytes): The content of the PDF document.
+            name (str): The name of the document, used in messages and statistics.
+            workers (int): The number of worker processes used to extract the pages of large documents.
+            max_pages (int): The maximum number of pages to extract; later pages are skipped.
+            max_bytes (int): The largest accepted document size, in bytes.
+
+        Returns:
+            tuple: The extracted text (or None) and the per-document statistics dictionary.
+        """
+        with Tracer.span("pdf.extract", bytes=len(data)) as span:
+            text, stats = PDFProcessor._extract_bytes(data, name, workers, max_pages, max_bytes)
+            span.set(pages=stats["pages_extracted"], cached=stats["cached"])
+        if stats["cached"]:
+            Tracer.count("pdf_cache_hits")
+        Tracer.count("extracted_text_bytes", len(text.encode("utf-8")) if text else 0)
+        return text, stats
+
+    @staticmethod
+    def _extract_bytes(data, name, workers, max_pages, max_bytes):
+        """Extracts the text of in-memory PDF content, from the cache or page by page."""
+        start = time.perf_counter()
+        stats = PDFProcessor._new_stats(name, len(data), start)
+        if len(data) > max_bytes:
+            click.echo(f"Error: The PDF file {name} is {len(data)} bytes, above the {max_bytes} bytes limit.")
+            return None, stats
+
+        key = (hashlib.sha256(data).hexdigest(), max_pages)
+        stats["sha256"] = key[0]
+        with PDFProcessor._cache_lock:
+            cached = PDFProcessor._cache.get(key)
+            if cached is not None:
+                PDFProcessor._cache.move_to_end(key)
+        if cached is not None:
+            text, stats["pages"], stats["pages_extracted"] = cached
+            stats["cached"] = True
+            stats["seconds"] = round(time.perf_counter() - start, 6)
+            return text, stats
+
+        page_count = len(pypdf.PdfReader(io.BytesIO(data)).pages)
+        extracted = min(page_count, max_pages)
+        if page_count > max_pages:
+            click.echo(f"Warning: Only the first {max_pages} of {page_count} pages of {name} are extracted.")
+
+        if workers > 1 and extracted >= PDFProcessor.PARALLEL_MIN_PAGES:
+            texts = PDFProcessor._extract_parallel(data, extracted, workers)
+            stats["workers"] = workers
+        else:
+            texts = _extract_page_range(data, 0, extracted)
+
+        text = PDFProcessor.PAGE_BREAK.join(texts) if texts else None
+        stats["pages"], stats["pages_extracted"] = page_count, extracted
+        with PDFProcessor._cache_lock:
+            PDFProcessor._cache[key] = (text, page_count, extracted)
+            while len(PDFProcessor._cache) > PDFProcessor.CACHE_SIZE:
+                PDFProcessor._cache.popitem(last=False)
+        stats["seconds"] = round(time.perf_counter() - start, 6)
+        return text, stats
+
+    @staticmethod
+    def _new_stats(name, size, start):
+        """Creates the statistics dictionary of a document whose processing began at `start`."""
+        return {"path": name, "bytes": size, "sha256": None, "pages": 0, "pages_extracted": 0,
+                "cached": False, "workers": 1, "seconds": round(time.perf_counter() - start, 6)}
+
+    @staticmethod
+    def _extract_parallel(data, page_count, workers):
+        """Splits the pages into contiguous ranges and extracts them on the shared process pool.
+
+        Args:
+            data (bytes): The content of the PDF file.
+            page_count (int): The number of pages to extract.
+            workers (int): The number of worker processes.
+
+        Returns:
+            list: The non-empty page texts, in page order.
+
+        Raises:
+            BrokenProcessPool: If a worker process died; the pool is replaced on the next call.
+        """
+        with PDFProcessor._pool_lock:
+            if PDFProcessor._pool is None or PDFProcessor._pool_workers != workers:
+                PDFProcessor._discard_pool(PDFProcessor._pool)
+                PDFProcessor._pool = ProcessPoolExecutor(max_workers=workers,
+                                                         mp_context=multiprocessing.get_context("spawn"))
+                PDFProcessor._pool_workers = workers
+            pool = PDFProcessor._pool
+
+        chunk = -(-page_count // workers)  # Ceiling division
+        try:
+            futures = [pool.submit(_extract_page_range, data, first, min(first + chunk, page_count))
+                       for first in range(0, page_count, chunk)]
+            return [text for future in futures for text in future.result()]
+        except BrokenProcessPool:
+            with PDFProcessor._pool_lock:
+                if PDFProcessor._pool is pool:
+                    PDFProcessor._discard_pool(pool)
+                    PDFProcessor._pool = None
+            raise
+
+    @staticmethod
+    def _discard_pool(pool):
+        """Shuts a replaced process pool down and waits for its workers, so that they never outlive it."""
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
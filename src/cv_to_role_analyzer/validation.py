@@ -8,6 +8,8 @@ class AnalysisRequest:
     Methods:
         validate(cv, role_text): Validates that the CV and job description files exist.
         process(cv, role_text): Validates the inputs and processes the data into a dictionary.
+        process_record(cv_id, cv_text, role_text): Validates a streamed CV record and processes it into a
+            dictionary.
     """
 
     @staticmethod
@@ -42,3 +44,29 @@ class AnalysisRequest:
         """
         AnalysisRequest.validate(cv, role_text)
         return {"cv": cv, "role_text": role_text}
+
+    @staticmethod
+    def process_record(cv_id, cv_text, role_text):
+        """Validates a streamed CV record against a job description and processes it into a dictionary.
+
+        This applies the same checks as `process` to in-memory texts, so that each record of a streamed
+        corpus is validated on its own instead of once per CLI invocation.
+
+        Args:
+            cv_id (str): The identifier of the CV record.
+            cv_text (str): The text extracted from the CV, or None if extraction failed.
+            role_text (str): The text of the job description.
+
+        Returns:
+            dict: A dictionary containing the CV identifier, the CV text and the role description text.
+
+        Raises:
+            ValueError: If the record has no identifier, or if the CV or role description text is empty.
+        """
+        if not cv_id:
+            raise ValueError("The CV record has no identifier.")
+        if not cv_text or not cv_text.strip():
+            raise ValueError(f"No text could be extracted from the CV {cv_id}.")
+        if not role_text or not role_text.strip():
+            raise ValueError("The job description is empty.")
+        return {"cv_id": cv_id, "cv_text": cv_text, "role_text": role_text}
@@ -0,0 +1,269 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from cv_to_role_analyzer.compaction import TextCompactor
+
+
+class CVVersionStore:
+    """
+    A persistent store of the successive versions of each candidate's CV and of their analyses, backed by SQLite.
+
+    Each version keeps the extracted text and a fingerprint of each of its sections, and each (candidate, role)
+    pair keeps its last analysis together with the version it was computed on. When a revised CV arrives, its
+    sections are compared with that version: cosmetic edits (whitespace, case, punctuation, bullet glyphs)
+    leave the fingerprints unchanged so the analysis is reused, while real edits name the sections to
+    re-analyze. Every outcome is logged, so the number of LLM calls avoided can be reported.
+
+    Attributes:
+        path (str): The path to the SQLite database file.
+
+    Methods:
+        default_path(): Returns the store location, honoring the CV_ANALYZER_VERSIONS environment variable.
+        sections(text): Splits a CV text into its sections.
+        fingerprint(text): Returns the fingerprint of a section, insensitive to cosmetic edits.
+        diff(before, after): Compares the section fingerprints of two versions.
+        add_version(candidate_id, text): Records a version unless it only differs cosmetically from the last one.
+        version(candidate_id, version): Returns one version of a candidate's CV.
+        versions(candidate_id): Returns the versions of a candidate's CV, without their text.
+        report(candidate_id, role_key): Returns the last analysis of a candidate against a role.
+        save_report(candidate_id, role_key, version, report, outcome): Records an analysis and its outcome.
+        stats(): Returns the number of candidates, versions and analyses, and the calls avoided.
+    """
+
+    OUTCOMES = ("new", "reused", "revised")
+    PREAMBLE = "header"  # The name of the lines before the first heading (name, title, contact details)
+
+    def __init__(self, path=None):
+        """
+        Opens (and creates if needed) the version store database.
+
+        Args:
+            path (str, optional): The path to the SQLite database file, defaults to `default_path()`.
+        """
+        self.path = path or CVVersionStore.default_path()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS versions ("
+                "candidate_id TEXT NOT NULL, version INTEGER NOT NULL, text TEXT NOT NULL, sections TEXT NOT NULL, "
+                "created_at REAL NOT NULL, PRIMARY KEY (candidate_id, version))"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS reports ("
+                "candidate_id TEXT NOT NULL, role_key TEXT NOT NULL, version INTEGER NOT NULL, report TEXT NOT NULL, "
+                "updated_at REAL NOT NULL, PRIMARY KEY (candidate_id, role_key))"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS analyses ("
+                "candidate_id TEXT NOT NULL, role_key TEXT NOT NULL, version INTEGER NOT NULL, outcome TEXT NOT NULL, "
+                "created_at REAL NOT NULL)"
+            )
+
+    @staticmethod
+    def default_path():
+        """Returns the store location, honoring the CV_ANALYZER_VERSIONS environment variable.
+
+        Returns:
+            str: The path to the SQLite database file.
+        """
+        return os.getenv("CV_ANALYZER_VERSIONS") or os.path.join(
+            os.path.expanduser("~"), ".cache", "cv_analyzer", "versions.sqlite3"
+        )
+
+    @staticmethod
+    def sections(text):
+        """Splits a CV text into its sections, at the headings known to the compactor.
+
+        Args:
+            text (str): The CV text.
+
+        Returns:
+            OrderedDict: The section texts by heading, in order. The lines before the first heading are under
+                `header`, and repeated headings are numbered (`experience (2)`).
+        """
+        sections = OrderedDict()
+        name, lines = CVVersionStore.PREAMBLE, []
+        for line in (text or "").splitlines():
+            heading = re.sub(r"[^\w&' ]+", "", line).strip().lower() if len(line) <= 40 else ""
+            if heading in TextCompactor.HEADINGS:
+                if lines or name != CVVersionStore.PREAMBLE:
+                    sections[name] = "\n".join(lines).strip()
+                name, lines = heading, []
+                count = 2
+                while name in sections:
+                    name, count = f"{heading} ({count})", count + 1
+                continue
+            lines.append(line)
+        sections[name] = "\n".join(lines).strip()
+        return sections
+
+    @staticmethod
+    def fingerprint(text):
+        """Returns the fingerprint of a section, insensitive to cosmetic edits.
+
+        Unicode compatibility forms, case, punctuation, bullet glyphs and whitespace are normalized away, while
+        words, numbers and the `+`/`#` of names such as C++ and C# are kept.
+
+        Args:
+            text (str): The section text.
+
+        Returns:
+            str: The hexadecimal SHA-256 digest of the normalized text.
+        """
+        normalized = re.sub(r"[^\w+#]+", " ", unicodedata.normalize("NFKC", text).lower()).strip()
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def diff(before, after):
+        """Compares the section fingerprints of two versions.
+
+        Args:
+            before (dict): The fingerprints of the earlier version, by section name.
+            after (dict): The fingerprints of the later version, by section name.
+
+        Returns:
+            dict: The `added`, `removed` and `changed` section names, each in document order. All three are
+                empty when the versions only differ cosmetically.
+        """
+        return {
+            "added": [name for name in after if name not in before],
+            "removed": [name for name in before if name not in after],
+            "changed": [name for name in after if name in before and before[name] != after[name]],
+        }
+
+    def add_version(self, candidate_id, text):
+        """Records a version of a candidate's CV, unless it only differs cosmetically from the last one.
+
+        Args:
+            candidate_id (str): The identifier of the candidate.
+            text (str): The extracted CV text.
+
+        Returns:
+            dict: The recorded (or unchanged last) version, with its number, text, section fingerprints and a
+                `created` flag.
+        """
+        fingerprints = {name: CVVersionStore.fingerprint(section)
+                        for name, section in CVVersionStore.sections(text).items()}
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT version, sections FROM versions WHERE candidate_id = ? ORDER BY version DESC LIMIT 1",
+                (candidate_id,),
+            ).fetchone()
+            if row is not None and json.loads(row[1]) == fingerprints:
+                return {**self._version(candidate_id, row[0]), "created": False}
+            version = row[0] + 1 if row is not None else 1
+            self._connection.execute("INSERT INTO versions VALUES (?, ?, ?, ?, ?)",
+                                     (candidate_id, version, text, json.dumps(fingerprints), time.time()))
+        return {"version": version, "text": text, "sections": fingerprints, "created": True}
+
+    def version(self, candidate_id, version):
+        """Returns one version of a candidate's CV.
+
+        Args:
+            candidate_id (str): The identifier of the candidate.
+            version (int): The version number.
+
+        Returns:
+            dict: The version number, text and section fingerprints, or None if the version does not exist.
+        """
+        with self._lock:
+            return self._version(candidate_id, version)
+
+    def versions(self, candidate_id):
+        """Returns the versions of a candidate's CV, without their text.
+
+        Args:
+            candidate_id (str): The identifier of the candidate.
+
+        Returns:
+            list: One dict per version, oldest first, with its number, creation date and section names.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT version, sections, created_at FROM versions WHERE candidate_id = ? ORDER BY version",
+                (candidate_id,),
+            ).fetchall()
+        return [{"version": version, "created_at": CVVersionStore._iso(created_at),
+                 "sections": list(json.loads(sections))} for version, sections, created_at in rows]
+
+    def report(self, candidate_id, role_key):
+        """Returns the last analysis of a candidate against a role.
+
+        Args:
+            candidate_id (str): The identifier of the candidate.
+            role_key (str): The key of the role and of the backend that analyzed it.
+
+        Returns:
+            dict: The `version` the analysis was computed on and the `report` itself, or None if there is none.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT version, report FROM reports WHERE candidate_id = ? AND role_key = ?", (candidate_id, role_key)
+            ).fetchone()
+        return {"version": row[0], "report": json.loads(row[1])} if row is not None else None
+
+    def save_report(self, candidate_id, role_key, version, report, outcome):
+        """Records an analysis of a candidate against a role, and logs its outcome.
+
+        Args:
+            candidate_id (str): The identifier of the candidate.
+            role_key (str): The key of the role and of the backend that analyzed it.
+            version (int): The version of the CV the analysis holds for.
+            report (dict): The analysis.
+            outcome (str): `new` (full analysis), `reused` (no call) or `revised` (focused re-analysis).
+        """
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO reports VALUES (?, ?, ?, ?, ?) ON CONFLICT (candidate_id, role_key) DO UPDATE SET "
+                "version = excluded.version, report = excluded.report, updated_at = excluded.updated_at",
+                (candidate_id, role_key, version, json.dumps(report), now),
+            )
+            self._connection.execute("INSERT INTO analyses VALUES (?, ?, ?, ?, ?)",
+                                     (candidate_id, role_key, version, outcome, now))
+
+    def stats(self):
+        """Returns the number of candidates, versions and analyses, and the calls avoided.
+
+        Returns:
+            dict: The number of candidates and versions, the number of analyses by outcome, and the number of
+                LLM calls avoided by reusing an analysis.
+        """
+        with self._lock:
+            candidates, versions = self._connection.execute(
+                "SELECT COUNT(DISTINCT candidate_id), COUNT(*) FROM versions"
+            ).fetchone()
+            outcomes = dict(self._connection.execute("SELECT outcome, COUNT(*) FROM analyses GROUP BY outcome"))
+        analyses = {outcome: outcomes.get(outcome, 0) for outcome in CVVersionStore.OUTCOMES}
+        return {"candidates": candidates, "versions": versions, "analyses": analyses,
+                "calls_avoided": analyses["reused"]}
+
+    def close(self):
+        """Closes the database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def _version(self, candidate_id, version):
+        """Returns one version of a candidate's CV; the caller holds the lock."""
+        row = self._connection.execute(
+            "SELECT text, sections FROM versions WHERE candidate_id = ? AND version = ?", (candidate_id, version)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"version": version, "text": row[0], "sections": json.loads(row[1])}
+
+    @staticmethod
+    def _iso(timestamp):
+        """Formats a POSIX timestamp as an ISO 8601 UTC date."""
+        return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
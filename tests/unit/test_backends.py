@@ -0,0 +1,101 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+from cv_to_role_analyzer.backends import Backend, BackendRegistry, GeminiBackend, RoutingBackend, SkillOverlapBackend
+from cv_to_role_analyzer.cv_analyzer import CVAnalyzer
+from cv_to_role_analyzer.fakes import FakeGeminiClient
+from cv_to_role_analyzer.llm import LLMClient
+
+ROLE = """Backend Engineer
+
+Qualifications
+* 3+ years of experience with Python and Django.
+* Bachelor's degree in Computer Science.
+* Knowledge of Kubernetes.
+"""
+
+
+def test_skill_overlap_backend_is_deterministic_and_report_shaped():
+    """
+    Unit test for the `analyze_match` function in the `SkillOverlapBackend` class.
+
+    This test checks that the local backend scores a CV from the skills it covers, reports the other skills
+    as categorized gaps with recommendations, and records its throughput.
+    """
+    backend = SkillOverlapBackend()
+    strong = backend.analyze_match("Python and Django developer, 5 years. BSc Computer Science degree. "
+                                   "Kubernetes in production.", ROLE)
+    weak = backend.analyze_match("Python developer.", ROLE)
+
+    assert strong == backend.analyze_match("Python and Django developer, 5 years. BSc Computer Science degree. "
+                                           "Kubernetes in production.", ROLE)
+    assert strong["skill_gaps"] == [] and strong["match_score"] > weak["match_score"]
+    assert [gap["category"] for gap in weak["skill_gaps"]] == ["Experience", "Education", "Technical"]
+    assert len(weak["recommendations"]) == len(weak["skill_gaps"])
+    assert backend.stats()["calls"] == 3 and backend.stats()["throughput_per_second"] > 0
+
+
+def test_routing_backend_only_shortlists_promising_pairs():
+    """
+    Unit test for the `analyze_match` function in the `RoutingBackend` class.
+
+    This test checks that pairs scored below the threshold by the local backend never reach Gemini, and
+    that the others are analyzed by Gemini.
+    """
+    client = FakeGeminiClient()
+    LLMClient.set_client(client)
+    try:
+        routing = RoutingBackend(SkillOverlapBackend(), GeminiBackend(), min_score=50)
+        screened_out = routing.analyze_match("Florist with a passion for roses.", ROLE)
+        calls_after_screening = client.calls
+        shortlisted = routing.analyze_match("Python and Django developer, Computer Science degree, Kubernetes.",
+                                            ROLE)
+    finally:
+        LLMClient.set_client(None)
+
+    assert screened_out["match_score"] < 50 and calls_after_screening == 0
+    assert client.calls == 1 and set(shortlisted) == {"match_score", "skill_gaps", "recommendations"}
+    assert routing.prescreen.stats()["calls"] == 2 and routing.shortlist.stats()["calls"] == 1
+
+
+def test_analyze_cli_runs_offline_with_the_local_backend(tmp_path, monkeypatch):
+    """
+    System test for the `--backend` option of the `analyze` command.
+
+    This test checks that the local backend analyzes a pair without any Gemini API key, and that unknown
+    backends are rejected.
+
+    Args:
+        tmp_path (pathlib.Path): Fixture providing a temporary directory for the output files.
+        monkeypatch (pytest.MonkeyPatch): Fixture used to remove the Gemini API key.
+    """
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.setattr("cv_to_role_analyzer.llm.dotenv.load_dotenv", lambda: None)
+    result = CliRunner().invoke(CVAnalyzer.cli, [
+        "--cv", "samples/sample_cv.pdf", "--role", "samples/sample_role.txt", "--output-dir", str(tmp_path),
+        "--no-cache", "--backend", "local", "--verbose", "2",
+    ])
+
+    assert result.exit_code == 0, result.output
+    report = json.loads((tmp_path / "analysis_result.json").read_text(encoding="utf-8"))
+    assert set(report) == {"match_score", "skill_gaps", "recommendations"}
+    assert "'local': {'calls': 1" in result.output
+
+    result = CliRunner().invoke(CVAnalyzer.cli, ["--cv", "samples/sample_cv.pdf", "--role", "samples/sample_role.txt",
+                                                 "--no-cache", "--backend", "missing"])
+    assert "Unknown backend 'missing'" in result.output
+    assert "local" in BackendRegistry.names()
+
+
+def test_backend_requires_analyze():
+    """
+    Unit test for the `Backend` interface.
+
+    This test checks that a backend without `_analyze` cannot be created, instead of failing at its first call.
+    """
+    class Incomplete(Backend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError, match="_analyze"):
+        Incomplete()
@@ -0,0 +1,183 @@
+import json
+import os
+
+from cv_to_role_analyzer.batch import BatchRunner
+from cv_to_role_analyzer.ingestion import CVSource
+
+
+def test_batch_runner_isolates_failures(tmp_path):
+    """
+    Unit test for the `run` function in the `BatchRunner` class.
+
+    This test checks that every CV x role pair gets a stable result file and a manifest entry, and that
+    a pair whose analysis raises an error, or whose CV has no text, is recorded as failed without aborting
+    the other pairs.
+
+    Args:
+        tmp_path (pathlib.Path): Fixture providing a temporary directory for the output files.
+    """
+    roles = {"backend.txt": "backend role", "frontend.txt": "frontend role"}
+    records = [("good.pdf", "CV good"), ("bad.pdf", "CV bad"), ("empty.pdf", None)]
+
+    def analyze(cv_text, role_text):
+        if "bad" in cv_text and "frontend" in role_text:
+            raise RuntimeError("LLM Error")
+        return json.dumps({"match_score": 70, "skill_gaps": [], "recommendations": []})
+
+    output_dir = tmp_path / "results"
+    runner = BatchRunner(str(output_dir), max_workers=2, analyze=analyze)
+    manifest = runner.run(iter(records), roles)
+
+    assert manifest["total"] == 6
+    assert manifest["succeeded"] == 3
+    assert manifest["failed"] == 3
+    errors = {(entry["cv"], entry["role"]): entry["error"]
+              for entry in manifest["results"] if entry["status"] == "failed"}
+    assert "LLM Error" in errors[("bad.pdf", "frontend.txt")]
+    assert "No text could be extracted" in errors[("empty.pdf", "backend.txt")]
+
+    assert sorted(os.listdir(output_dir)) == [
+        "bad.pdf__backend.txt.json", "good.pdf__backend.txt.json", "good.pdf__frontend.txt.json",
+        BatchRunner.MANIFEST_NAME
+    ]
+    with open(output_dir / BatchRunner.MANIFEST_NAME, encoding="utf-8") as f:
+        assert json.load(f) == manifest
+
+
+def test_batch_result_names_do_not_collide(tmp_path):
+    """
+    Unit test for the `result_name` function in the `BatchRunner` class, and for duplicate CV identifiers.
+
+    This test checks that identifiers differing only by extension, by the part after a dot or by sanitized
+    characters get different result files, and that a duplicated identifier is recorded as failed instead of
+    overwriting the earlier result.
+
+    Args:
+        tmp_path (pathlib.Path): Fixture providing a temporary directory for the output files.
+    """
+    ids = ["alice.pdf", "alice.txt", "john.smith", "john.doe", "jane doe", "jane_doe", "a__b"]
+    names = {BatchRunner.result_name(cv_id, "r.txt") for cv_id in ids}
+    assert len(names) == len(ids)
+    assert BatchRunner.result_name("alice.pdf", "r.txt") == "alice.pdf__r.txt.json"
+
+    runner = BatchRunner(str(tmp_path), analyze=lambda cv_text, role_text: json.dumps(
+        {"match_score": len(cv_text), "skill_gaps": [], "recommendations": []}))
+    manifest = runner.run(iter([("alice.pdf", "first"), ("alice.txt", "second"), ("alice.pdf", "third!")]),
+                          {"r.txt": "role"})
+    assert (manifest["succeeded"], manifest["failed"]) == (2, 1)
+    assert "already used" in [entry for entry in manifest["results"] if entry["status"] == "failed"][0]["error"]
+    with open(tmp_path / "alice.pdf__r.txt.json", encoding="utf-8") as f:
+        assert json.load(f)["match_score"] in (len("first"), len("third!"))
+
+
+def test_batch_runner_applies_backpressure(tmp_path):
+    """
+    Unit test for the bounded consumption of the record stream by `BatchRunner.run`.
+
+    This test checks that the runner never pulls more records from the stream than it has free slots for.
+
+    Args:
+        tmp_path (pathlib.Path): Fixture providing a temporary directory for the output files.
+    """
+    pulled = []
+    in_flight = []
+
+    def records():
+        for i in range(50):
+            pulled.append(i)
+            yield f"cv{i}.txt", f"CV {i}"
+
+    def analyze(cv_text, role_text):
+        index = int(cv_text.split()[1])
+        in_flight.append(len(pulled) - index)
+        return json.dumps({"match_score": index})
+
+    runner = BatchRunner(str(tmp_path), max_workers=2, analyze=analyze, max_pending=4)
+    manifest = runner.run(records(), {"role.txt": "Role"})
+
+    assert manifest["succeeded"] == 50
+    assert max(in_flight) <= 4 + 1
+
+
+def test_batch_runner_prefilters_pairs(tmp_path):
+    """
+    Unit test for the local prefilter stage of `BatchRunner.run`.
+
+    This test checks that only the best-scoring CVs reach the analysis function, and that the local score
+    of every pair, including the filtered ones, is kept in the manifest.
+
+    Args:
+        tmp_path (pathlib.Path): Fixture providing a temporary directory for the output files.
+    """
+    with open("tests/data/test_role.txt", encoding="utf-8") as f:
+        roles = {"engineer.txt": f.read()}
+    with open("tests/data/test_cv.txt", encoding="utf-8") as f:
+        records = [
+            ("engineer.txt", f.read()),
+            ("developer.txt", "Java developer, Agile methodologies, Spring Boot, computer science degree."),
+            ("chef.txt", "Pastry chef with experience in French cuisine and bakery management."),
+        ]
+    analyzed = []
+
+    def analyze(cv_text, role_text):
+        analyzed.append(cv_text)
+        return json.dumps({"match_score": 80})
+
+    manifest = BatchRunner(str(tmp_path), analyze=analyze, min_score=0.05, top_k=1).run(records, roles)
+
+    entries = {entry["cv"]: entry for entry in manifest["results"]}
+    assert (manifest["succeeded"], manifest["filtered"], manifest["failed"]) == (1, 2, 0)
+    assert entries["engineer.txt"]["status"] == "ok"
+    assert entries["developer.txt"]["reason"] == "outside top_k"
+    assert entries["chef.txt"]["reason"] == "below min_score"
+    assert entries["engineer.txt"]["prefilter_score"] > entries["developer.txt"]["prefilter_score"] > 0.05
+    assert entries["chef.txt"]["prefilter_score"] < 0.05
+    assert len(analyzed) == 1
+
+
+def test_batch_survives_unreadable_cv_files(tmp_path):
+    """
+    Unit test for `BatchRunner.run` over a `CVSource` directory with unreadable files.
+
+    A corrupt PDF and a latin-1 encoded text file are recorded as failed pairs, while the other CVs of the
+    directory are still analyzed.
+
+    Args:
+        tmp_path (pathlib.Path): Fixture providing a temporary directory for the input and output files.
+    """
+    cv_dir = tmp_path / "cvs"
+    cv_dir.mkdir()
+    (cv_dir / "corrupt.pdf").write_bytes(b"%PDF-1.4\n" + os.urandom(512))
+    (cv_dir / "latin1.txt").write_bytes("Développeur Python à Zürich".encode("latin-1"))
+    (cv_dir / "good.txt").write_text("Python developer", encoding="utf-8")
+
+    runner = BatchRunner(str(tmp_path / "results"), analyze=lambda cv_text, role_text: json.dumps(
+        {"match_score": 50, "skill_gaps": [], "recommendations": []}))
+    manifest = runner.run(CVSource.open(str(cv_dir)), {"role.txt": "Python role"})
+
+    statuses = {entry["cv"]: entry["status"] for entry in manifest["results"]}
+    assert statuses == {"corrupt.pdf": "failed", "good.txt": "ok", "latin1.txt": "failed"}
+
+
+def test_batch_survives_malformed_jsonl_lines(tmp_path):
+    """
+    Unit test for `BatchRunner.run` over a `CVSource` JSONL file with malformed lines.
+
+    A line that is not JSON in the middle of the file, and a record whose text is not a string, are recorded as
+    failed pairs, and the manifest still covers every line.
+
+    Args:
+        tmp_path (pathlib.Path): Fixture providing a temporary directory for the input and output files.
+    """
+    jsonl_path = tmp_path / "cvs.jsonl"
+    jsonl_path.write_text("\n".join([json.dumps({"id": "first", "text": "Python developer"}), "{not json",
+                                      json.dumps({"id": "listed", "text": ["Python"]}),
+                                      json.dumps({"id": "last", "text": "Django developer"})]), encoding="utf-8")
+
+    runner = BatchRunner(str(tmp_path / "results"), analyze=lambda cv_text, role_text: json.dumps(
+        {"match_score": 50, "skill_gaps": [], "recommendations": []}))
+    manifest = runner.run(CVSource.open(str(jsonl_path)), {"role.txt": "Python role"})
+
+    statuses = {entry["cv"]: entry["status"] for entry in manifest["results"]}
+    assert statuses == {"first": "ok", f"{jsonl_path}:2": "failed", "listed": "failed", "last": "ok"}
+    assert os.path.exists(tmp_path / "results" / "manifest.json")
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+from cv_to_role_analyzer.benchmark import BenchmarkHarness
+from cv_to_role_analyzer.cv_analyzer import CVAnalyzer
+from cv_to_role_analyzer.fakes import FakeGeminiClient
+from google.genai import errors
+from google.genai.types import Content, Part
+
+
+def test_fake_client_is_deterministic_and_injects_faults():
+    """
+    Unit test for the `respond` function in the `FakeGeminiClient` class.
+
+    This test checks that the same prompt always gets the same report, and that faults are injected at the
+    configured rates.
+    """
+    prompt = Content(parts=[Part(text="Role Description: \nBackend"), Part(text="CV Text: \nPython")])
+    first = json.loads(FakeGeminiClient().respond(prompt).text)
+    assert json.loads(FakeGeminiClient(seed=1).respond(prompt).text) == first
+    assert 0 <= first["match_score"] <= 100
+
+    with pytest.raises(errors.ServerError, match="503"):
+        FakeGeminiClient(error_rate=1.0).respond(prompt)
+
+    malformed = FakeGeminiClient(malformed_rate=1.0).respond(prompt).text
+    assert malformed != json.dumps(first)
+
+
+def test_benchmark_command_writes_results(tmp_path):
+    """
+    System test for the `benchmark` command.
+
+    This test checks that every scenario runs against the fake backend without errors, that the results are
+    written as JSON with throughput and latency percentiles, and that comparing a run against itself reports
+    no regression.
+
+    Args:
+        tmp_path (pathlib.Path): Fixture providing a temporary directory for the results file.
+    """
+    output = tmp_path / "benchmark.json"
+    result = CliRunner().invoke(CVAnalyzer.cli, ["benchmark", "--cvs", "4", "--roles", "1", "--latency", "0",
+                                                 "--jitter", "0", "--output", str(output)])
+    assert result.exit_code == 0, result.output
+
+    results = json.loads(output.read_text(encoding="utf-8"))
+    assert set(results["scenarios"]) == set(BenchmarkHarness.SCENARIOS)
+    for scenario in results["scenarios"].values():
+        assert scenario["errors"] == 0
+        assert scenario["throughput_per_second"] > 0
+        assert scenario["latency_ms"]["p50"] <= scenario["latency_ms"]["p99"]
+    assert BenchmarkHarness.compare(results, results) == []
+    assert 0 < results["startup"]["cli_ms"] and "startup: CLI import" in result.output
+    assert results["startup"]["eager"] == []
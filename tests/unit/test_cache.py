@@ -0,0 +1,77 @@
+import asyncio
+import json
+
+from cv_to_role_analyzer.cache import ResultCache
+from cv_to_role_analyzer.cv_analyzer import CVAnalyzer
+
+MOCK_ANALYSIS = {"match_score": 85, "skill_gaps": [{"category": "Tech", "gap": "Java"}], "recommendations": ["Learn Java"]}
+
+
+def test_cache_hit_skips_llm(mocker, tmp_path):
+    """
+    Unit test for `analyze_core` with a `ResultCache`.
+
+    This test checks that a repeated analysis of the same texts (up to whitespace) is served from the cache
+    without calling the LLM, that `refresh` forces a new call, and that hits and misses are counted.
+
+    Args:
+        mocker (pytest_mock.MockerFixture): Fixture to mock functions for testing.
+        tmp_path (pathlib.Path): Fixture providing a temporary directory for the cache database.
+    """
+    analyze_match = mocker.patch("cv_to_role_analyzer.llm.LLMClient.analyze_match", return_value=MOCK_ANALYSIS)
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"))
+
+    first = CVAnalyzer.analyze_core("Mock CV Text", "Mock Role Text", cache=cache)
+    second = CVAnalyzer.analyze_core("Mock  CV\nText ", "Mock Role Text", cache=cache)
+    assert json.loads(first) == json.loads(second) == MOCK_ANALYSIS
+    assert analyze_match.call_count == 1
+
+    CVAnalyzer.analyze_core("Mock CV Text", "Mock Role Text", cache=cache, refresh=True)
+    assert analyze_match.call_count == 2
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_cache_expiry_and_eviction(tmp_path):
+    """
+    Unit test for the TTL expiry and the size-based eviction of `ResultCache`.
+
+    Args:
+        tmp_path (pathlib.Path): Fixture providing a temporary directory for the cache database.
+    """
+    expired = ResultCache(str(tmp_path / "expired.sqlite3"), ttl_seconds=-1)
+    expired.set("key", MOCK_ANALYSIS)
+    assert expired.get("key") is None
+    assert expired.stats()["entries"] == 0
+
+    bounded = ResultCache(str(tmp_path / "bounded.sqlite3"), max_entries=2)
+    for key in ["a", "b", "c"]:
+        bounded.set(key, MOCK_ANALYSIS)
+    assert bounded.stats()["entries"] == 2
+    assert bounded.get("a") is None
+    assert bounded.get("c") == MOCK_ANALYSIS
+
+
+def test_cache_skips_partial_analyses(mocker, tmp_path):
+    """
+    Unit test for the analyses stored by `analyze_core` and `analyze_core_async` in a `ResultCache`.
+
+    This test checks that an analysis missing a required field is not cached, so the next request calls the
+    LLM again, while a complete analysis is cached by the asynchronous path too.
+
+    Args:
+        mocker (pytest_mock.MockerFixture): Fixture to mock functions for testing.
+        tmp_path (pathlib.Path): Fixture providing a temporary directory for the cache database.
+    """
+    partial_analysis = {"match_score": 40, "skill_gaps": []}  # Recommendations are missing
+    analyze_match = mocker.patch("cv_to_role_analyzer.llm.LLMClient.analyze_match", return_value=partial_analysis)
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"))
+
+    CVAnalyzer.analyze_core("Mock CV Text", "Mock Role Text", cache=cache)
+    CVAnalyzer.analyze_core("Mock CV Text", "Mock Role Text", cache=cache)
+    assert analyze_match.call_count == 2 and cache.stats()["entries"] == 0
+
+    analyze_match_async = mocker.patch("cv_to_role_analyzer.llm.LLMClient.analyze_match_async",
+                                       side_effect=[partial_analysis, MOCK_ANALYSIS, MOCK_ANALYSIS])
+    for _ in range(3):
+        asyncio.run(CVAnalyzer.analyze_core_async("Mock CV Text", "Mock Role Text", cache=cache))
+    assert analyze_match_async.call_count == 2 and cache.stats()["entries"] == 1
@@ -0,0 +1,78 @@
+from cv_to_role_analyzer.compaction import TextCompactor
+from cv_to_role_analyzer.utils import PDFProcessor
+
+
+def test_compact_cv_removes_page_furniture_and_low_value_sections():
+    """
+    Unit test for the `compact_cv` function in the `TextCompactor` class.
+
+    This test checks that repeated page headers, page numbers, contact lines, extra whitespace and low-value
+    sections are removed, while the content that informs the match is kept, and that token counts are reported.
+    """
+    pages = [
+        "Jane Doe - Curriculum Vitae\njane.doe@example.com | +1 (555) 123-4567\nSummary\nBackend   engineer.\n\n\n"
+        "Skills\n* Python\n* PostgreSQL\nPage 1 of 3",
+        "Jane Doe - Curriculum Vitae\nExperience\nEngineer | Acme | 2018 - 2024\n* Built APIs in Python\nPage 2 of 3",
+        "Jane Doe - Curriculum Vitae\nHobbies\nChess and hiking\nReferences\nAvailable on request\n"
+        "Education\nBSc Computer Science\nPage 3 of 3",
+    ]
+    compactor = TextCompactor()
+
+    text, stats = compactor.compact_cv(PDFProcessor.PAGE_BREAK.join(pages))
+
+    assert text == ("Summary\nBackend engineer.\n\nSkills\n* Python\n* PostgreSQL\nExperience\n"
+                    "Engineer | Acme | 2018 - 2024\n* Built APIs in Python\nEducation\nBSc Computer Science")
+    assert stats["sections_dropped"] == ["Hobbies", "References"]
+    assert stats["tokens_after"] < stats["tokens_before"]
+    assert not stats["truncated"]
+    assert compactor.stats()["texts"] == 1
+
+
+def test_compact_enforces_token_budget():
+    """
+    Unit test for the token budget enforced by the `compact` function in the `TextCompactor` class.
+
+    This test checks that a text over budget is cut at a line boundary and marked as truncated.
+    """
+    compactor = TextCompactor(cv_tokens=50)
+    text, stats = compactor.compact_cv("\n".join(f"* Achievement number {i} at a previous job" for i in range(100)))
+
+    assert stats["truncated"]
+    assert stats["tokens_after"] <= 50
+    assert text.endswith("\n[truncated]")
+    assert compactor.stats()["truncated"] == 1
+
+
+def test_compact_cv_keeps_lines_with_links():
+    """
+    Unit test for the contact lines dropped by the `compact_cv` function in the `TextCompactor` class.
+
+    This test checks that only the lines made of contact details are dropped, while a project or portfolio
+    line holding a URL or an e-mail address is kept.
+    """
+    lines = ["Email: jane.doe@example.com | Phone: +44 20 7946 0958", "linkedin.com/in/janedoe - www.janedoe.dev",
+             "Projects", "* Job board in Django: https://github.com/janedoe/jobs",
+             "Portfolio: https://janedoe.dev", "* Support inbox automation for help@acme.com"]
+
+    text, stats = TextCompactor().compact_cv("\n".join(lines))
+
+    assert text == "\n".join(lines[2:])
+    assert stats["lines_removed"] == 2
+
+
+def test_compact_cv_keeps_content_lines_looking_like_page_furniture():
+    """
+    Unit test for the page headers and page numbers removed by the `compact_cv` function in the `TextCompactor`
+    class.
+
+    This test checks that date lines differing only by their digits on two pages, and numbers inside a page,
+    are kept: only the edge lines of a page are page furniture.
+    """
+    pages = ["Experience\nEngineer | Acme\n2019 - 2021\n* Built APIs", "Developer | Initech\n2016 - 2019\n"
+             "Languages\nEnglish\n100%\n2024\nPython"]
+
+    text, stats = TextCompactor().compact_cv(PDFProcessor.PAGE_BREAK.join(pages))
+
+    assert "2019 - 2021" in text and "2016 - 2019" in text
+    assert "100%" in text and "2024" in text
+    assert stats["lines_removed"] == 0
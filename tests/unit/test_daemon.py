@@ -0,0 +1,60 @@
+import json
+import subprocess
+import sys
+
+import pytest
+from click.testing import CliRunner
+from cv_to_role_analyzer.cv_analyzer import CVAnalyzer
+from cv_to_role_analyzer.daemon import DaemonClient, DaemonUnavailableError, WarmWorker
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="The warm worker needs Unix domain sockets")
+
+
+def test_cli_startup_defers_heavy_imports():
+    """
+    Unit test for the lazy imports of the CLI.
+
+    This test runs `--help` in a fresh interpreter and checks that neither the Gemini SDK, pypdf nor
+    python-dotenv were imported.
+    """
+    code = ("import sys; from cv_to_role_analyzer.cv_analyzer import CVAnalyzer; "
+            "CVAnalyzer.cli(['--help'], standalone_mode=False); "
+            "print([name for name in ('google.genai', 'pypdf', 'dotenv', 'httpx') if name in sys.modules])")
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert "Usage:" in output and output.splitlines()[-1] == "[]"
+
+
+def test_analyze_hands_work_to_the_warm_worker(tmp_path):
+    """
+    Unit test for the `--daemon` option of the `analyze` command and the `WarmWorker` class.
+
+    This test checks that the analysis runs in the worker, that the CLI still writes the report, and that
+    a missing worker falls back to a local analysis.
+
+    Args:
+        tmp_path (pathlib.Path): Fixture providing a temporary directory for the socket and output files.
+    """
+    socket_path = str(tmp_path / "worker.sock")
+    worker = WarmWorker(socket_path, workers=2, no_cache=True)
+    worker.start()
+    try:
+        arguments = ["--cv", "samples/sample_cv.pdf", "--role", "samples/sample_role.txt", "--output-dir",
+                     str(tmp_path), "--no-cache", "--backend", "local", "--verbose", "2"]
+        result = CliRunner().invoke(CVAnalyzer.cli, [*arguments, "--daemon", socket_path])
+        assert result.exit_code == 0, result.output
+        assert DaemonClient(socket_path).ping()["served"] == 1
+        assert "'local': {'calls': " in result.output
+        report = json.loads((tmp_path / "analysis_result.json").read_text(encoding="utf-8"))
+        assert set(report) == {"match_score", "skill_gaps", "recommendations"}
+
+        with pytest.raises(ValueError, match="Could not read the CV"):
+            DaemonClient(socket_path).analyze(str(tmp_path / "missing.pdf"), "samples/sample_role.txt")
+        with pytest.raises(OSError, match="already listening"):
+            WarmWorker(socket_path)
+    finally:
+        worker.shutdown()
+
+    with pytest.raises(DaemonUnavailableError):
+        DaemonClient(socket_path).ping()
+    result = CliRunner().invoke(CVAnalyzer.cli, [*arguments, "--daemon", socket_path])
+    assert result.exit_code == 0 and "Analyzing locally" in result.output
@@ -0,0 +1,96 @@
+import json
+
+from click.testing import CliRunner
+from cv_to_role_analyzer.cv_analyzer import CVAnalyzer
+from cv_to_role_analyzer.index import CVIndex
+
+CVS = {
+    "backend": "Python developer. Django, PostgreSQL, REST APIs, Docker and Kubernetes.",
+    "frontend": "Frontend engineer. React, TypeScript, CSS and accessibility.",
+    "data": "Data scientist. Python, pandas, scikit-learn, statistics and SQL.",
+}
+ROLE = "Backend developer: Python, Django, PostgreSQL and Docker."
+
+
+def test_index_add_delete_query(tmp_path):
+    """
+    Unit test for the `add_many`, `add`, `delete` and `query` functions in the `CVIndex` class.
+
+    This test checks that the most similar CV ranks first, that adding an indexed CV replaces its vector and
+    that deleted CVs are no longer returned.
+
+    Args:
+        tmp_path (pathlib.Path): Fixture providing a temporary directory for the index.
+    """
+    index = CVIndex(str(tmp_path))
+    assert index.add_many(CVS.items()) == {"added": 3, "skipped": 0}
+    assert [match["cv"] for match in index.query(ROLE, k=1)] == ["backend"]
+
+    index.add("frontend", "Python and Django backend developer with PostgreSQL and Docker.")
+    assert index.query(ROLE, k=1)[0]["cv"] == "frontend"
+    assert index.stats()["rows"] == 4 and len(index) == 3
+
+    assert index.delete("frontend") and not index.delete("frontend")
+    assert [match["cv"] for match in index.query(ROLE, k=5)][0] == "backend"
+    assert {match["cv"] for match in index.query(ROLE, k=5)} == {"backend", "data"}
+    index.close()
+
+
+def test_index_rebuild_and_reopen(tmp_path):
+    """
+    Unit test for the `rebuild` function in the `CVIndex` class, and for reopening an index.
+
+    Args:
+        tmp_path (pathlib.Path): Fixture providing a temporary directory for the index.
+    """
+    index = CVIndex(str(tmp_path))
+    index.add_many(CVS.items())
+    index.add("data", CVS["data"] + " Spark.")
+    index.delete("frontend")
+    before = index.query(ROLE)
+
+    assert index.rebuild() == {"rows_before": 4, "rows_after": 2, "bytes_reclaimed": 2 * 4 * CVIndex.DIM}
+    assert index.query(ROLE) == before
+    index.close()
+
+    reopened = CVIndex(str(tmp_path))
+    assert reopened.stats()["rows"] == 2 and reopened.stats()["deleted"] == 0
+    assert reopened.query(ROLE) == before
+    reopened.close()
+
+
+def test_index_cli(tmp_path, monkeypatch):
+    """
+    Unit test for the `index add`, `index query` and `index stats` commands.
+
+    This test indexes a JSONL corpus, shortlists it for a role, and analyzes the shortlist with the local
+    backend, which only reads the shortlisted CVs.
+
+    Args:
+        tmp_path (pathlib.Path): Fixture providing a temporary directory for the index and the corpus.
+        monkeypatch (pytest.MonkeyPatch): Fixture pointing the index at the temporary directory.
+    """
+    monkeypatch.setenv("CV_ANALYZER_INDEX", str(tmp_path / "index"))
+    corpus = tmp_path / "cvs.jsonl"
+    corpus.write_text("".join(json.dumps({"id": cv_id, "text": text}) + "\n" for cv_id, text in CVS.items()))
+    role = tmp_path / "backend.txt"
+    role.write_text(ROLE)
+    runner = CliRunner()
+
+    result = runner.invoke(CVAnalyzer.cli, ["index", "add", "--cvs", str(corpus)])
+    assert result.exit_code == 0, result.output
+    assert json.loads(runner.invoke(CVAnalyzer.cli, ["index", "stats"]).output)["live"] == 3
+
+    result = runner.invoke(CVAnalyzer.cli, ["index", "query", "--role", str(role), "--top", "1"])
+    assert [match["cv"] for match in json.loads(result.output)["backend.txt"]] == ["backend"]
+
+    output_dir = tmp_path / "results"
+    result = runner.invoke(CVAnalyzer.cli, ["index", "query", "--role", str(role), "--top", "2", "--analyze-cvs",
+                                            str(corpus), "--output-dir", str(output_dir), "--backend", "local",
+                                            "--no-cache"])
+    assert result.exit_code == 0, result.output
+    assert "2 of 2 shortlisted CVs analyzed" in result.output
+    assert len(list((output_dir / "backend").glob("*.json"))) == 3  # Two analyses and the manifest
+
+    result = runner.invoke(CVAnalyzer.cli, ["index", "delete", "frontend", "unknown"])
+    assert "Deleted 1 of 2 CVs." in result.output and result.exit_code == 1
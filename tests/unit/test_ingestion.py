@@ -0,0 +1,35 @@
+import json
+import zipfile
+
+from cv_to_role_analyzer.ingestion import CVSource
+
+
+def test_cv_source_streams_zip_and_jsonl(tmp_path):
+    """
+    Unit test for the `open` function in the `CVSource` class.
+
+    This test checks that CV records are streamed lazily from a ZIP archive (including PDF members) and
+    from a JSONL file, and that malformed JSONL lines, in the middle of the file or with a text that is not a
+    string, are yielded without text instead of ending the stream.
+
+    Args:
+        tmp_path (pathlib.Path): Fixture providing a temporary directory for the input files.
+    """
+    archive_path = tmp_path / "cvs.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        archive.write("samples/sample_cv.pdf", "batch1/alice.pdf")
+        archive.writestr("batch1/bob.txt", "Bob CV text\n")
+        archive.writestr("notes.md", "ignored")
+
+    records = CVSource.open(str(archive_path))
+    assert next(records)[0] == "batch1/alice.pdf"
+    assert list(records) == [("batch1/bob.txt", "Bob CV text")]
+
+    jsonl_path = tmp_path / "cvs.jsonl"
+    jsonl_path.write_text("\n".join([
+        json.dumps({"id": 1, "text": "First CV"}), "", "not json", json.dumps({"id": "2", "text": ""}),
+        json.dumps({"id": "3", "text": 42}), json.dumps(["no", "id"]), json.dumps({"id": "4", "text": "Last CV"}),
+    ]) + "\n", encoding="utf-8")
+    records = list(CVSource.open(str(jsonl_path)))
+    assert records == [("1", "First CV"), (f"{jsonl_path}:3", None), ("2", None), ("3", None),
+                       (f"{jsonl_path}:6", None), ("4", "Last CV")]
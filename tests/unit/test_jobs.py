@@ -0,0 +1,94 @@
+import json
+
+from click.testing import CliRunner
+from cv_to_role_analyzer.cv_analyzer import CVAnalyzer
+from cv_to_role_analyzer.jobs import JobRunner, JobStore
+
+
+def test_job_runner_resumes_unfinished_and_failed_pairs(tmp_path):
+    """
+    Unit test for the `run` function in the `JobRunner` class.
+
+    This test checks that rerunning a job analyzes again only the pairs that failed or were left running
+    by a crash, restores missing result files from the store, and writes a manifest covering the whole job.
+
+    Args:
+        tmp_path (pathlib.Path): Fixture providing a temporary directory for the store and output files.
+    """
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    store.save_job("nightly", {})
+    roles = {"backend.txt": "backend role", "frontend.txt": "frontend role"}
+    records = [("a.txt", "CV a"), ("b.txt", "CV b")]
+    calls, failing = [], [True]
+
+    def analyze(cv_text, role_text):
+        calls.append((cv_text, role_text))
+        if cv_text == "CV b" and role_text == "frontend role" and failing[0]:
+            raise RuntimeError("LLM Error")
+        return json.dumps({"match_score": 70, "skill_gaps": [], "recommendations": []})
+
+    output_dir = tmp_path / "results"
+    manifest = JobRunner(store, "nightly", str(output_dir), analyze=analyze).run(iter(records), roles)
+    assert (manifest["succeeded"], manifest["failed"]) == (3, 1)
+    assert store.status("nightly")["failed"] == 1
+
+    store.update("nightly", "a.txt", "backend.txt", "running")  # As if the process had crashed mid-analysis
+    (output_dir / "a.txt__frontend.txt.json").unlink()
+    calls.clear()
+    failing[0] = False
+    manifest = JobRunner(store, "nightly", str(output_dir), analyze=analyze).run(iter(records), roles)
+
+    assert sorted(calls) == [("CV a", "backend role"), ("CV b", "frontend role")]
+    assert (manifest["total"], manifest["succeeded"], manifest["failed"]) == (4, 4, 0)
+    assert (output_dir / "a.txt__frontend.txt.json").exists()
+    assert store.status("nightly") == {"total": 4, "pending": 0, "running": 0, "done": 4, "failed": 0, "filtered": 0}
+    assert store.get("nightly", "a.txt", "backend.txt")["attempts"] == 3
+
+
+def test_batch_job_status_and_retry_failed(tmp_path, monkeypatch):
+    """
+    System test for the `--job` option of the `batch` command and for the `status` and `retry-failed` commands.
+
+    Args:
+        tmp_path (pathlib.Path): Fixture providing a temporary directory for the inputs, store and outputs.
+        monkeypatch (pytest.MonkeyPatch): Fixture used to point the job store and the analysis at test doubles.
+    """
+    monkeypatch.setenv("CV_ANALYZER_JOBS", str(tmp_path / "jobs.sqlite3"))
+    (tmp_path / "cvs").mkdir()
+    (tmp_path / "roles").mkdir()
+    (tmp_path / "cvs" / "ada.txt").write_text("Python developer", encoding="utf-8")
+    (tmp_path / "roles" / "backend.txt").write_text("Backend Python role", encoding="utf-8")
+    failing = [True]
+
+    def analyze_core(cv_text, role_text, **kwargs):
+        if failing[0]:
+            raise RuntimeError("LLM Error")
+        return json.dumps({"match_score": 80, "skill_gaps": [], "recommendations": []})
+
+    monkeypatch.setattr(CVAnalyzer, "analyze_core", staticmethod(analyze_core))
+    output_dir = str(tmp_path / "results")
+    runner = CliRunner()
+    result = runner.invoke(CVAnalyzer.cli, ["batch", "--cvs", str(tmp_path / "cvs"), "--roles",
+                                            str(tmp_path / "roles"), "--output-dir", output_dir, "--no-cache",
+                                            "--job", "nightly"])
+    assert result.exit_code == 1  # A batch with failed pairs must fail the calling script
+
+    status = json.loads(runner.invoke(CVAnalyzer.cli, ["status", "nightly"]).output)
+    assert (status["total"], status["failed"]) == (1, 1)
+    assert "LLM Error" in status["failures"][0]["error"]
+
+    failing[0] = False
+    result = runner.invoke(CVAnalyzer.cli, ["retry-failed", "nightly", "--no-cache"])
+    assert "1 succeeded" in result.output and result.exit_code == 0, result.output
+    assert json.loads(runner.invoke(CVAnalyzer.cli, ["status"]).output)[0]["done"] == 1
+
+    # Nothing analyzed is a failure too: a missing CV directory, no role files, or an unknown job
+    missing = runner.invoke(CVAnalyzer.cli, ["batch", "--cvs", str(tmp_path / "missing"), "--roles",
+                                             str(tmp_path / "roles"), "--output-dir", output_dir])
+    assert "does not exist" in missing.output and missing.exit_code == 1
+    (tmp_path / "empty").mkdir()
+    result = runner.invoke(CVAnalyzer.cli, ["batch", "--cvs", str(tmp_path / "cvs"), "--roles", str(tmp_path / "empty"),
+                                            "--output-dir", output_dir])
+    assert "No job role" in result.output and result.exit_code == 1
+    assert runner.invoke(CVAnalyzer.cli, ["status", "unknown"]).exit_code == 1
+    assert runner.invoke(CVAnalyzer.cli, ["retry-failed", "unknown"]).exit_code == 1
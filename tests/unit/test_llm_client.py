@@ -0,0 +1,126 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from cv_to_role_analyzer.llm import LLMClient
+
+
+class StubModels:
+    """A stand-in for `Client.models` that returns a fixed JSON payload and counts the calls."""
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.calls = 0
+
+    def generate_content(self, model, contents, **kwargs):
+        self.calls += 1
+        part = SimpleNamespace(text=f"Reasoning first.\n{json.dumps(self.payload)}")
+        return SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))])
+
+
+class StubAsyncModels(StubModels):
+    """A stand-in for `Client.aio.models` that answers after an optional delay."""
+
+    def __init__(self, payload, delay=0.0):
+        super().__init__(payload)
+        self.delay = delay
+
+    async def generate_content(self, model, contents, **kwargs):
+        await asyncio.sleep(self.delay)
+        return super().generate_content(model, contents, **kwargs)
+
+
+@pytest.fixture
+def stub_client():
+    """Injects a stand-in Gemini client for the duration of a test and resets the shared client afterwards."""
+    payload = {"match_score": 80, "skill_gaps": [{"category": "Tech", "gap": "C++"}], "recommendations": ["Learn C++"]}
+    client = SimpleNamespace(models=StubModels(payload), aio=SimpleNamespace(models=StubAsyncModels(payload)))
+    LLMClient.set_client(client)
+    yield client
+    LLMClient.set_client(None)
+
+
+def test_shared_client_is_created_once(mocker, monkeypatch):
+    """
+    Unit test for the `get_client` function in the `LLMClient` class.
+
+    This test checks that the environment is loaded and the Gemini client is constructed only once, no
+    matter how many times the client is requested.
+
+    Args:
+        mocker (pytest_mock.MockerFixture): Fixture to mock functions for testing.
+        monkeypatch (pytest.MonkeyPatch): Fixture to set environment variables for testing.
+    """
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    load_dotenv = mocker.patch("cv_to_role_analyzer.llm.dotenv.load_dotenv")
+    client_class = mocker.patch("cv_to_role_analyzer.llm.genai.Client")
+    LLMClient.set_client(None)
+    try:
+        clients = {id(LLMClient.get_client()) for _ in range(5)}
+    finally:
+        LLMClient.set_client(None)
+
+    assert len(clients) == 1
+    load_dotenv.assert_called_once()
+    client_class.assert_called_once_with(api_key="test-key")
+
+
+def test_analyze_match_uses_injected_client(stub_client):
+    """
+    Unit test for running `analyze_match` offline against an injected stand-in client.
+
+    Args:
+        stub_client (SimpleNamespace): The injected stand-in Gemini client.
+    """
+    result = LLMClient.analyze_match("Mock CV Text", "Mock Role Text")
+
+    assert result["match_score"] == 80
+    assert stub_client.models.calls >= 1
+
+
+def test_analyze_match_async(stub_client):
+    """
+    Unit test for the `analyze_match_async` function in the `LLMClient` class.
+
+    This test checks that many analyses can be awaited concurrently on one event loop, and that a call
+    exceeding its timeout yields None instead of blocking.
+
+    Args:
+        stub_client (SimpleNamespace): The injected stand-in Gemini client.
+    """
+    async def run_many():
+        return await asyncio.gather(*[LLMClient.analyze_match_async(f"CV {i}", "Mock Role Text") for i in range(20)])
+
+    results = asyncio.run(run_many())
+    assert [result["match_score"] for result in results] == [80] * 20
+
+    stub_client.aio.models.delay = 1.0
+    assert asyncio.run(LLMClient.analyze_match_async("Mock CV Text", "Mock Role Text", timeout=0.01)) is None
+
+
+@pytest.mark.parametrize("text", [
+    '```json\n{"match_score": 70, "skill_gaps": [], "recommendations": ["Keep going"],}\n```',
+    'Here is the analysis: {"match_score": "70", "skill_gaps": [], "recommendations": ["Keep going"]} Done.',
+    '{"match_score": 70, "skill_gaps": [], "recommendations": ["Keep going',
+])
+def test_parse_response_repairs_near_valid_json(text):
+    """
+    Unit test for the local repair of near-valid JSON in `_parse_response`.
+
+    This test checks that fenced, wrapped, trailing-comma and truncated responses are parsed without a new
+    model call, and that each repair is counted.
+
+    Args:
+        text (str): The near-valid response text.
+    """
+    response = SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(
+        parts=[SimpleNamespace(text=text)]))])
+    repaired = LLMClient.stats()["repaired"]
+
+    result = LLMClient._parse_response(response)
+
+    assert result["match_score"] == 70
+    assert result["recommendations"] == ["Keep going"]
+    assert not LLMClient._needs_refinement(result)
+    assert LLMClient.stats()["repaired"] == repaired + 1
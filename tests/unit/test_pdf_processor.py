@@ -0,0 +1,81 @@
+from concurrent.futures.process import BrokenProcessPool
+
+import pypdf
+import pytest
+from cv_to_role_analyzer.utils import PDFProcessor
+
+SAMPLE_CV = "samples/sample_cv.pdf"
+
+
+def write_multipage_pdf(path, copies):
+    """Writes a PDF made of `copies` copies of the sample CV page."""
+    writer = pypdf.PdfWriter()
+    page = pypdf.PdfReader(SAMPLE_CV).pages[0]
+    for _ in range(copies):
+        writer.add_page(page)
+    with open(path, "wb") as f:
+        writer.write(f)
+
+
+def test_extract_text_parallel_cached_and_capped(tmp_path):
+    """
+    Unit test for the `extract_text_with_stats` function in the `PDFProcessor` class.
+
+    This test checks that splitting the pages across worker processes yields the same text as serial
+    extraction, that reprocessing the same content is served from the cache, and that the page and byte
+    caps are enforced.
+
+    Args:
+        tmp_path (pathlib.Path): Fixture providing a temporary directory for the generated PDF.
+    """
+    pdf_path = str(tmp_path / "long_cv.pdf")
+    write_multipage_pdf(pdf_path, PDFProcessor.PARALLEL_MIN_PAGES)
+
+    serial_text, serial_stats = PDFProcessor.extract_text_with_stats(pdf_path, workers=1, max_pages=99)
+    parallel_text, parallel_stats = PDFProcessor.extract_text_with_stats(pdf_path, workers=2)
+    assert parallel_text == serial_text
+    assert parallel_stats["workers"] == 2 and not parallel_stats["cached"]
+    assert serial_stats["pages_extracted"] == PDFProcessor.PARALLEL_MIN_PAGES
+
+    cached_text, cached_stats = PDFProcessor.extract_text_with_stats(pdf_path, workers=2)
+    assert cached_text == serial_text and cached_stats["cached"]
+
+    capped_text, capped_stats = PDFProcessor.extract_text_with_stats(pdf_path, max_pages=2)
+    assert capped_stats["pages"] == PDFProcessor.PARALLEL_MIN_PAGES
+    assert capped_stats["pages_extracted"] == 2
+    assert len(capped_text) < len(serial_text)
+
+    assert PDFProcessor.extract_text(pdf_path, max_bytes=1) is None
+
+
+def test_page_pool_is_replaced_once(mocker):
+    """
+    Unit test for the process pool shared by the parallel extractions of the `PDFProcessor` class.
+
+    This test checks that the pool is created once for a number of workers, that a replaced or broken pool is
+    shut down after its workers, without leaving them running, and that exactly one new pool replaces it.
+
+    Args:
+        mocker (pytest_mock.MockerFixture): Fixture to mock the process pool.
+    """
+    mocker.patch.object(PDFProcessor, "_pool", None)
+    mocker.patch.object(PDFProcessor, "_pool_workers", 0)
+    executor = mocker.patch("cv_to_role_analyzer.utils.ProcessPoolExecutor")
+    executor.return_value.submit.return_value.result.return_value = ["page"]
+
+    assert PDFProcessor._extract_parallel(b"%PDF", 4, 2) == ["page", "page"]
+    PDFProcessor._extract_parallel(b"%PDF", 4, 2)
+    assert executor.call_count == 1
+
+    first = executor.return_value
+    executor.return_value = mocker.MagicMock()
+    executor.return_value.submit.side_effect = BrokenProcessPool("A worker died.")
+    with pytest.raises(BrokenProcessPool):
+        PDFProcessor._extract_parallel(b"%PDF", 4, 3)
+    first.shutdown.assert_called_once_with(wait=True, cancel_futures=True)
+    executor.return_value.shutdown.assert_called_once_with(wait=True, cancel_futures=True)
+    assert executor.call_count == 2 and PDFProcessor._pool is None
+
+    executor.return_value = first
+    PDFProcessor._extract_parallel(b"%PDF", 4, 3)
+    assert executor.call_count == 3
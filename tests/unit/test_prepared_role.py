@@ -0,0 +1,31 @@
+from cv_to_role_analyzer.llm import LLMClient
+from cv_to_role_analyzer.role import PreparedRole
+
+
+def test_prepared_role_reuses_prompt_prefix():
+    """
+    Unit test for the `PreparedRole` class.
+
+    This test checks that the skills are extracted from the qualification sections, that every prompt built
+    from a prepared role shares the same prefix parts, and that a context-cached role sends only the CV text
+    and references the cache in the generation config.
+    """
+    with open("tests/data/test_role.txt", encoding="utf-8") as f:
+        role = PreparedRole(f.read(), "test_role.txt")
+
+    assert "Strong programming skills in Java and C++." in role.skills
+    assert "Experience with Spring Boot." in role.skills
+    assert "Competitive salary and benefits package." not in role.skills
+
+    first = LLMClient._generate_prompt("First CV", role)
+    second = LLMClient._generate_prompt("Second CV", role)
+    assert first.parts[:-1] == second.parts[:-1] == role.prompt_prefix
+    assert first.parts[-1].text.endswith("First CV")
+    config = LLMClient._generation_config(role)
+    assert config.cached_content is None
+    assert config.response_mime_type == "application/json"
+
+    role.cached_content = "cachedContents/role-123"
+    cached = LLMClient._generate_prompt("First CV", role)
+    assert len(cached.parts) == 1
+    assert LLMClient._generation_config(role).cached_content == "cachedContents/role-123"
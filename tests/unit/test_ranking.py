@@ -0,0 +1,86 @@
+import json
+import re
+from types import SimpleNamespace
+
+from google.genai import errors
+from cv_to_role_analyzer.backends import BackendRegistry, RoutingBackend
+from cv_to_role_analyzer.llm import LLMClient
+from cv_to_role_analyzer.ranking import Ranker
+
+
+class StubBatchModels:
+    """A stand-in for `Client.models` that answers batched prompts and rejects prompts above a size limit."""
+
+    def __init__(self, max_items):
+        self.max_items = max_items
+        self.batch_sizes = []
+
+    def generate_content(self, model, contents, **kwargs):
+        ids = [re.match(r"CV \[(.+?)\]", part.text).group(1) for part in contents.parts if part.text.startswith("CV [")]
+        self.batch_sizes.append(len(ids))
+        if len(ids) > self.max_items:
+            raise errors.ClientError(400, {"error": {"message": "The input token count exceeds the maximum"}})
+        results = [{"id": cv_id, "match_score": int(cv_id[2:]) * 10, "skill_gaps": [], "recommendations": []}
+                   for cv_id in ids if cv_id != "cv3"]  # cv3 is left out of every answer
+        part = SimpleNamespace(text=json.dumps({"results": results}))
+        return SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))])
+
+
+def test_rank_cvs_for_role_packs_and_splits_batches():
+    """
+    Unit test for the `rank_cvs_for_role` function in the `Ranker` class.
+
+    This test checks that several CVs are packed into one request, that a batch rejected as too large is
+    split and retried, that a CV missing from every answer is reported as failed, and that the leaderboard
+    is sorted by match score.
+    """
+    models = StubBatchModels(max_items=2)
+    LLMClient.set_client(SimpleNamespace(models=models))
+    try:
+        cvs = {f"cv{i}": f"Curriculum vitae number {i}" for i in range(1, 6)}
+        leaderboard = Ranker(workers=1).rank_cvs_for_role("Backend developer role", cvs)
+    finally:
+        LLMClient.set_client(None)
+
+    assert models.batch_sizes == [5, 3, 2, 1, 2]  # Halved until accepted; cv3 retried alone
+    assert [entry["id"] for entry in leaderboard] == ["cv5", "cv4", "cv2", "cv1", "cv3"]
+    assert [entry["rank"] for entry in leaderboard] == [1, 2, 3, 4, None]
+    assert "error" in leaderboard[-1]
+
+
+def test_pack_respects_token_and_output_budgets():
+    """
+    Unit test for the `pack` function in the `Ranker` class.
+
+    This test checks that batches stay within the prompt token budget and the number of reports the output
+    budget allows, and that an oversized item still gets a batch of its own.
+    """
+    ranker = Ranker(token_budget=1000, max_output_tokens=LLMClient.RESPONSE_TOKENS_ESTIMATE * 3)
+    items = {f"cv{i}": "x" * 400 for i in range(7)}  # ~100 tokens each
+    items["huge"] = "x" * 8000
+
+    batches = ranker.pack(items, shared_tokens=500)
+
+    assert batches == [["cv0", "cv1", "cv2"], ["cv3", "cv4", "cv5"], ["cv6"], ["huge"]]
+
+
+def test_rank_uses_the_selected_backend():
+    """
+    Unit test for the `rank_cvs_for_role` function in the `Ranker` class with the local and routed backends.
+
+    The local backend scores each pair offline, without any Gemini request, and the routed backend only packs
+    the pre-screened shortlist into Gemini requests.
+    """
+    role = "Backend developer.\nRequirements:\n- Python\n- Django\n- PostgreSQL\n- Docker"
+    cvs = {"strong": "Python and Django developer, PostgreSQL and Docker in production.", "weak": "Pastry chef."}
+    models = StubBatchModels(max_items=5)
+    LLMClient.set_client(SimpleNamespace(models=models))
+    try:
+        local = Ranker(workers=1, backend="local").rank_cvs_for_role(role, cvs)
+        assert models.batch_sizes == [] and [entry["id"] for entry in local] == ["strong", "weak"]
+
+        routed = RoutingBackend(BackendRegistry.get("local"), BackendRegistry.get("gemini"), min_score=40)
+        Ranker(workers=1, backend=routed).rank_cvs_for_role(role, {"cv1": cvs["strong"], "cv2": cvs["weak"]})
+        assert models.batch_sizes == [1]  # Only the pre-screened CV reaches Gemini
+    finally:
+        LLMClient.set_client(None)
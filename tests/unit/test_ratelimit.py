@@ -0,0 +1,62 @@
+import pytest
+from google.genai import errors
+from cv_to_role_analyzer.ratelimit import RequestScheduler, TokenBucket
+
+
+def quota_error():
+    """Builds the 429 error the Gemini API returns when the quota is exhausted."""
+    return errors.ClientError(429, {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED", "details": [
+        {"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "0.01s"}
+    ]}})
+
+
+def test_scheduler_retries_transient_failures():
+    """
+    Unit test for the `call` function in the `RequestScheduler` class.
+
+    This test checks that 429 and 5xx errors are retried, that the retry delay sent by the API is read,
+    that a 429 slows the pace down, and that non-transient errors and exhausted retries are raised.
+    """
+    scheduler = RequestScheduler(rpm=6000, max_retries=3, base_delay=0.001, max_delay=0.05)
+    outcomes = [quota_error(), errors.ServerError(503, {"error": {"code": 503}}), "report"]
+
+    def flaky_call():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert RequestScheduler.retry_after(quota_error()) == 0.01
+    assert scheduler.call(flaky_call, tokens=100) == "report"
+    stats = scheduler.stats()
+    assert (stats["requests"], stats["transport_retries"], stats["rate_limited"]) == (3, 2, 1)
+    assert stats["speed"] < 1.0
+
+    def invalid_call():
+        raise errors.ClientError(400, {"error": {"code": 400, "message": "Invalid argument"}})
+
+    with pytest.raises(errors.ClientError):
+        scheduler.call(invalid_call)
+    assert scheduler.stats()["transport_retries"] == 2
+
+    def always_failing_call():
+        raise ConnectionError("Connection reset")
+
+    with pytest.raises(ConnectionError):
+        scheduler.call(always_failing_call)
+    assert scheduler.stats()["transport_retries"] == 5
+
+
+def test_token_bucket_paces_requests():
+    """
+    Unit test for the `reserve` function in the `TokenBucket` class.
+
+    This test checks that the bucket serves its capacity immediately, then makes callers wait in order
+    for the refill, and waits longer when the pace is reduced.
+    """
+    bucket = TokenBucket(capacity=2, refill_per_second=10)
+    assert bucket.reserve(1) == 0.0
+    assert bucket.reserve(1) == 0.0
+    assert bucket.reserve(1) == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve(1) == pytest.approx(0.2, abs=0.01)
+    assert bucket.reserve(1, speed=0.5) == pytest.approx(0.6, abs=0.02)
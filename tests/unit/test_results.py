@@ -0,0 +1,74 @@
+import json
+import os
+
+import pytest
+from click.testing import CliRunner
+from cv_to_role_analyzer.batch import BatchRunner
+from cv_to_role_analyzer.cv_analyzer import CVAnalyzer
+from cv_to_role_analyzer.results import ResultSink
+
+
+def report(score, *categories):
+    """Returns a JSON report with the given score and one skill gap per category."""
+    return json.dumps({"match_score": score, "skill_gaps": [{"category": c, "gap": f"{c} gap"} for c in categories],
+                       "recommendations": []})
+
+
+def test_result_sink_queries(tmp_path):
+    """
+    Unit test for the `top` and `gap_categories` functions in the `ResultSink` class.
+
+    This test checks that results are appended as compact single lines, that the top-N query only returns the
+    best results of the requested role, and that gap categories are counted across roles or for one role.
+
+    Args:
+        tmp_path (pathlib.Path): Fixture providing a temporary directory for the results file.
+    """
+    sink = ResultSink(str(tmp_path))
+    for position, score in enumerate([40, 90, 75, 90]):
+        sink.append(f"cv{position}.pdf", "backend.txt", report(score, "Technical"), backend="local")
+    sink.append("cv9.pdf", "backend.txt.bak", report(99, "Education", "Education"))
+
+    lines = (tmp_path / ResultSink.DEFAULT_NAME).read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 5 and all(": " not in line for line in lines)
+    assert [record["cv"] for record in sink.top("backend.txt", 3)] == ["cv1.pdf", "cv3.pdf", "cv2.pdf"]
+    assert sink.top("backend.txt", 1)[0]["backend"] == "local"
+    assert sink.gap_categories() == [("Technical", 4), ("Education", 2)]
+    assert sink.gap_categories("backend.txt.bak") == [("Education", 2)]
+
+
+def test_batch_appends_to_a_single_results_file(tmp_path):
+    """
+    Unit test for `BatchRunner.run` with a `ResultSink`.
+
+    Args:
+        tmp_path (pathlib.Path): Fixture providing a temporary directory for the output files.
+    """
+    output_dir = tmp_path / "results"
+    sink = ResultSink(str(output_dir / ResultSink.DEFAULT_NAME))
+    runner = BatchRunner(str(output_dir), analyze=lambda cv_text, role_text: report(len(cv_text)), sink=sink)
+    manifest = runner.run(iter([("a.pdf", "CV a"), ("b.pdf", "CV bb")]), {"role.txt": "role"})
+
+    assert sorted(os.listdir(output_dir)) == [BatchRunner.MANIFEST_NAME, ResultSink.DEFAULT_NAME]
+    assert {entry["output"] for entry in manifest["results"]} == {ResultSink.DEFAULT_NAME}
+
+    result = CliRunner().invoke(CVAnalyzer.cli, ["results", str(output_dir), "--role", "role.txt", "--top", "1"])
+    assert json.loads(result.output) == [{"cv": "b.pdf", "role": "role.txt", "match_score": 5}]
+    assert CliRunner().invoke(CVAnalyzer.cli, ["results", str(tmp_path / "missing")]).exit_code == 1
+
+
+def test_export_parquet(tmp_path):
+    """
+    Unit test for the `export_parquet` function in the `ResultSink` class, run when pyarrow is installed.
+
+    Args:
+        tmp_path (pathlib.Path): Fixture providing a temporary directory for the output files.
+    """
+    parquet = pytest.importorskip("pyarrow.parquet")
+    sink = ResultSink(str(tmp_path))
+    sink.append("a.pdf", "role.txt", report(80, "Technical", "Experience"))
+    sink.append("b.pdf", "role.txt", report(20))
+
+    assert sink.export_parquet(str(tmp_path / "results.parquet"), batch_size=1) == 2
+    table = parquet.read_table(str(tmp_path / "results.parquet"), columns=["cv", "match_score", "gap_categories"])
+    assert table.to_pylist()[0] == {"cv": "a.pdf", "match_score": 80, "gap_categories": ["Technical", "Experience"]}
@@ -0,0 +1,113 @@
+import threading
+
+import pytest
+from cv_to_role_analyzer.scheduler import AnalysisScheduler
+from cv_to_role_analyzer.server import ServiceMetrics
+
+
+class BlockedAnalysis:
+    """An analysis function that records its calls and blocks the first one until released."""
+
+    def __init__(self):
+        self.calls = []
+        self.started = threading.Event()
+        self.released = threading.Event()
+
+    def __call__(self, cv_text, role_text):
+        self.calls.append(cv_text)
+        if len(self.calls) == 1:
+            self.started.set()
+            self.released.wait(timeout=10)
+        if cv_text == "broken":
+            raise ValueError("The analysis failed.")
+        return f"{cv_text} x {role_text}"
+
+
+def test_scheduler_priorities_and_tenant_fairness():
+    """
+    Unit test for the order in which the `AnalysisScheduler` class runs queued analyses.
+
+    While the only worker is busy, a bulk import from tenant A, one batch request from tenant B and one
+    interactive request are queued. The interactive request must run first, then the tenants in turn.
+    """
+    analyze = BlockedAnalysis()
+    metrics = ServiceMetrics()
+    scheduler = AnalysisScheduler(analyze, workers=1, metrics=metrics)
+    futures = [scheduler.submit("running", "role")]
+    assert analyze.started.wait(timeout=10)
+
+    futures += [scheduler.submit(f"a{position}", "role", AnalysisScheduler.BATCH, "A") for position in range(3)]
+    futures.append(scheduler.submit("b0", "role", AnalysisScheduler.BATCH, "B"))
+    futures.append(scheduler.submit("recruiter", "role", tenant="A"))
+    assert scheduler.stats()["batch"]["queued"] == 4
+    assert 'cv_analyzer_queue_depth{class="batch"} 4' in metrics.render()
+
+    analyze.released.set()
+    assert [future.result(timeout=10) for future in futures][-1] == "recruiter x role"
+    assert analyze.calls == ["running", "recruiter", "a0", "b0", "a1", "a2"]
+    scheduler.shutdown()
+    assert 'cv_analyzer_queue_wait_seconds_count{class="batch"} 4' in metrics.render()
+
+    with pytest.raises(RuntimeError):
+        scheduler.submit("late", "role")
+    with pytest.raises(ValueError, match="Unknown priority"):
+        AnalysisScheduler(analyze, workers=1).submit("cv", "role", priority="urgent")
+
+
+def test_scheduler_coalesces_identical_requests():
+    """
+    Unit test for the coalescing of identical in-flight requests by the `AnalysisScheduler` class.
+
+    Identical requests share one analysis and its result or error, an interactive duplicate promotes a queued
+    batch request, and requests with keyword arguments are never coalesced.
+    """
+    analyze = BlockedAnalysis()
+    metrics = ServiceMetrics()
+    scheduler = AnalysisScheduler(analyze, workers=1, metrics=metrics)
+    running = scheduler.submit("running", "role")
+    assert analyze.started.wait(timeout=10)
+    assert scheduler.submit("running", "role") is running
+
+    bulk = [scheduler.submit(f"bulk{position}", "role", AnalysisScheduler.BATCH) for position in range(2)]
+    promoted = scheduler.submit("bulk1", "role")
+    broken = [scheduler.submit("broken", "role"), scheduler.submit("broken", "role", AnalysisScheduler.BATCH)]
+    assert promoted is bulk[1] and broken[0] is broken[1]
+
+    analyze.released.set()
+    assert running.result(timeout=10) == "running x role"
+    for future in broken:
+        with pytest.raises(ValueError, match="The analysis failed"):
+            future.result(timeout=10)
+    bulk[0].result(timeout=10)
+    assert analyze.calls == ["running", "bulk1", "broken", "bulk0"]
+
+    assert scheduler.stats()["interactive"] == {"queued": 0, "requests": 4, "coalesced": 2, "coalescing_rate": 0.5}
+    assert 'cv_analyzer_coalesced_total{class="batch"} 1' in metrics.render()
+    scheduler.submit("running", "role").result(timeout=10)  # Finished analyses are no longer coalesced
+    assert analyze.calls.count("running") == 2
+    scheduler.shutdown()
+
+
+def test_scheduler_batch_share_under_steady_interactive_load():
+    """
+    Unit test for the minimum share of the batch class in the `AnalysisScheduler` class.
+
+    Each interactive analysis submits the next one, so interactive requests are always queued; the queued
+    batch request must still start within `batch_every` analyses.
+    """
+    calls = []
+    scheduler = None
+
+    def analyze(cv_text, role_text):
+        calls.append(cv_text)
+        if cv_text.startswith("interactive") and len(calls) < 20:
+            scheduler.submit(f"interactive{len(calls)}", "role")
+        return cv_text
+
+    scheduler = AnalysisScheduler(analyze, workers=1, batch_every=3)
+    with scheduler._condition:  # Queue both classes before the worker starts anything
+        bulk = scheduler.submit("bulk", "role", AnalysisScheduler.BATCH)
+        scheduler.submit("interactive", "role")
+    assert bulk.result(timeout=10) == "bulk"
+    assert calls.index("bulk") <= 2  # Two interactive analyses at most, then the batch share is due
+    scheduler.shutdown()
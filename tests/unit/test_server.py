@@ -0,0 +1,143 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+from cv_to_role_analyzer.server import AnalysisServer
+
+
+@pytest.fixture
+def server():
+    """Starts an `AnalysisServer` with a stubbed analysis on a free port, and stops it afterwards."""
+    def analyze(cv_text, role_text):
+        return json.dumps({"match_score": len(cv_text), "skill_gaps": [], "recommendations": []})
+
+    service = AnalysisServer(port=0, workers=1, max_queue=1, analyze=analyze)
+    service.start()
+    yield service
+    service.shutdown()
+
+
+def request(service, path, payload=None, data=None, content_type="application/json", headers=None):
+    """Sends a request to the service and returns the status code and decoded body."""
+    url = f"http://{service.address[0]}:{service.address[1]}{path}"
+    if payload is not None:
+        data = json.dumps(payload).encode("utf-8")
+    headers = {**({"Content-Type": content_type} if data is not None else {}), **(headers or {})}
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data, headers=headers), timeout=10) as response:
+            body = response.read().decode("utf-8")
+            return response.status, body
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode("utf-8")
+
+
+def test_server_endpoints_and_admission_control(server):
+    """
+    Unit test for the `AnalysisServer` HTTP service.
+
+    This test checks the health, analysis, batch and metrics endpoints against a stubbed analysis, that
+    invalid requests are rejected with 400, and that requests beyond the queue capacity get 503.
+
+    Args:
+        server (AnalysisServer): The running service.
+    """
+    assert request(server, "/healthz") == (200, '{"status": "ok"}')
+
+    status, body = request(server, "/analyze", {"cv_text": "Mock CV", "role_text": "Mock Role"})
+    assert status == 200 and json.loads(body)["match_score"] == len("Mock CV")
+
+    with open("samples/sample_cv.pdf", "rb") as f:
+        upload = (b"--XyZ\r\nContent-Disposition: form-data; name=\"role\"\r\n\r\nMock Role\r\n"
+                  b"--XyZ\r\nContent-Disposition: form-data; name=\"cv\"; filename=\"cv.pdf\"\r\n"
+                  b"Content-Type: application/pdf\r\n\r\n" + f.read() + b"\r\n--XyZ--\r\n")
+    status, body = request(server, "/analyze", data=upload, content_type="multipart/form-data; boundary=XyZ")
+    assert status == 200 and json.loads(body)["match_score"] > 100
+
+    status, body = request(server, "/batch", {"role_text": "Mock Role", "cvs": [{"id": "a", "text": "CV"},
+                                                                                 {"id": "b", "text": ""}]})
+    results = json.loads(body)["results"]
+    assert status == 200
+    assert [result["status"] for result in results] == ["ok", "failed"]
+
+    assert request(server, "/analyze", {"role_text": "Mock Role"})[0] == 400
+    assert request(server, "/analyze", {"cv_text": "Mock CV", "role_text": "Mock Role"},
+                   headers={"X-Priority": "urgent"})[0] == 400
+
+    # With 1 worker and a queue of 1, a third concurrent analysis is rejected
+    assert server.admit(2)
+    assert request(server, "/analyze", {"cv_text": "Mock CV", "role_text": "Mock Role"})[0] == 503
+    server.release()
+    server.release()
+
+    status, metrics = request(server, "/metrics")
+    assert status == 200
+    assert 'cv_analyzer_analyses_total{status="ok"} 3' in metrics
+    assert 'cv_analyzer_requests_total{path="/analyze",status="503"} 1' in metrics
+    assert 'cv_analyzer_queue_wait_seconds_count{class="batch"} 2' in metrics
+    assert 'cv_analyzer_queue_depth{class="interactive"} 0' in metrics
+
+
+def test_server_returns_504_on_timeout():
+    """
+    Unit test for the request timeout of the `AnalysisServer` HTTP service.
+
+    This test checks that an analysis outlasting the request timeout gets 504, not 500, on `/analyze` and
+    `/batch`, while an analysis that raises an error still gets 500.
+    """
+    release = threading.Event()
+
+    def analyze(cv_text, role_text):
+        if cv_text == "broken":
+            raise RuntimeError("The analysis failed.")
+        release.wait(timeout=10)
+        return json.dumps({"match_score": 1, "skill_gaps": [], "recommendations": []})
+
+    service = AnalysisServer(port=0, workers=2, max_queue=2, analyze=analyze)
+    service.REQUEST_TIMEOUT_SECONDS = 0.2
+    service.start()
+    try:
+        status, body = request(service, "/analyze", {"cv_text": "Slow CV", "role_text": "Mock Role"})
+        assert status == 504 and "did not finish within 0.2 seconds" in json.loads(body)["error"]
+        status, body = request(service, "/batch", {"role_text": "Mock Role", "cvs": [{"id": "a", "text": "CV"}]})
+        assert status == 504 and json.loads(body)["results"][0]["status"] == "timeout"
+        release.set()  # Frees the workers held by the timed-out analyses
+        assert request(service, "/analyze", {"cv_text": "broken", "role_text": "Mock Role"})[0] == 500
+    finally:
+        release.set()
+        service.shutdown()
+
+
+def test_server_text_uploads_and_admission_release(server):
+    """
+    Unit test for the text fields sent as file uploads, and for the admission of analyses that cannot be queued.
+
+    This test checks that a role uploaded as a file is analyzed as text, that an upload that is not UTF-8 gets
+    400, that an analysis refused by a stopped scheduler releases its admission on `/analyze` and `/batch`, and
+    that unknown paths share one metric label.
+
+    Args:
+        server (AnalysisServer): The running service.
+    """
+    def upload(role):
+        return (b"--XyZ\r\nContent-Disposition: form-data; name=\"role\"; filename=\"role.txt\"\r\n\r\n" + role +
+                b"\r\n--XyZ\r\nContent-Disposition: form-data; name=\"cv_text\"\r\n\r\nMock CV\r\n--XyZ--\r\n")
+
+    status, body = request(server, "/analyze", data=upload(b"Mock Role"),
+                           content_type="multipart/form-data; boundary=XyZ")
+    assert status == 200 and json.loads(body)["match_score"] == len("Mock CV")
+    status, body = request(server, "/analyze", data=upload("Développeur".encode("latin-1")),
+                           content_type="multipart/form-data; boundary=XyZ")
+    assert status == 400 and "'role' is not valid UTF-8" in json.loads(body)["error"]
+
+    assert request(server, "/unknown?page=1", {})[0] == 404
+    server.scheduler.shutdown()
+    assert request(server, "/analyze", {"cv_text": "Mock CV", "role_text": "Mock Role"})[0] == 500
+    cvs = [{"id": "a", "text": "CV a"}, {"id": "b", "text": "CV b"}]
+    assert request(server, "/batch", {"role_text": "Mock Role", "cvs": cvs})[0] == 500
+
+    metrics = request(server, "/metrics")[1]
+    assert 'cv_analyzer_admitted{class="interactive"} 0' in metrics
+    assert 'cv_analyzer_admitted{class="batch"} 0' in metrics
+    assert 'cv_analyzer_requests_total{path="unknown",status="404"} 1' in metrics
@@ -0,0 +1,94 @@
+import asyncio
+import json
+import urllib.request
+
+import pytest
+from cv_to_role_analyzer.cv_analyzer import CVAnalyzer
+from cv_to_role_analyzer.fakes import FakeGeminiClient
+from cv_to_role_analyzer.llm import LLMClient
+from cv_to_role_analyzer.server import AnalysisServer
+from cv_to_role_analyzer.streaming import IncrementalJSONParser
+
+
+@pytest.fixture
+def fake_client():
+    """Injects a fake Gemini client for the duration of a test and resets the shared client afterwards."""
+    client = FakeGeminiClient(latency=0.05)
+    LLMClient.set_client(client)
+    yield client
+    LLMClient.set_client(None)
+
+
+def test_incremental_parser_reports_fields_as_they_complete():
+    """
+    Unit test for the `feed` function in the `IncrementalJSONParser` class.
+
+    This test feeds a fenced JSON answer one character at a time and checks that the score and each array
+    item are reported once complete, with strings holding escaped quotes and brackets parsed correctly.
+    """
+    text = '```json\n{"match_score": 72, "skill_gaps": [{"category": "Technical", "gap": "No \\"Go\\" [or] {Rust}"}],' \
+           ' "recommendations": ["Learn Go", "Ship Rust"]}\n```'
+    parser = IncrementalJSONParser()
+    events = []
+    for position, char in enumerate(text):
+        events.extend((position, path, value) for path, value in parser.feed(char))
+
+    assert [(path, value) for _, path, value in events] == [
+        (("match_score",), 72),
+        (("skill_gaps", 0), {"category": "Technical", "gap": 'No "Go" [or] {Rust}'}),
+        (("skill_gaps",), [{"category": "Technical", "gap": 'No "Go" [or] {Rust}'}]),
+        (("recommendations", 0), "Learn Go"),
+        (("recommendations", 1), "Ship Rust"),
+        (("recommendations",), ["Learn Go", "Ship Rust"]),
+    ]
+    assert events[0][0] == text.index(",")  # The score is complete at the delimiter that follows it
+    assert parser.done
+
+
+def test_streamed_analysis_emits_fields_before_the_report(fake_client):
+    """
+    Unit test for the `analyze_match_stream` and `stream_match_async` functions in the `LLMClient` class.
+
+    This test checks that the score comes first, then the gaps and recommendations, that the time to the
+    first field is shorter than the total latency, and that the report matches the non-streamed analysis.
+
+    Args:
+        fake_client (FakeGeminiClient): The injected fake Gemini client.
+    """
+    events = []
+    analysis = LLMClient.analyze_match_stream("Python developer", "Backend role", on_field=events.append)
+
+    fields = [event.field for event in events]
+    assert fields[0] == "match_score" and fields[-1] == "report"
+    assert fields[1:-1] == ["skill_gap"] * len(analysis["skill_gaps"]) + \
+        ["recommendation"] * len(analysis["recommendations"])
+    assert events[0].elapsed < events[-1].elapsed
+    assert events[-1].value == analysis == LLMClient.analyze_match("Python developer", "Backend role")
+
+    async def collect():
+        return [event async for event in LLMClient.stream_match_async("Python developer", "Backend role")]
+
+    assert [(event.field, event.value) for event in asyncio.run(collect())] == \
+        [(event.field, event.value) for event in events]
+
+
+def test_server_streams_ndjson_fields(fake_client):
+    """
+    Unit test for the `POST /analyze/stream` endpoint of the `AnalysisServer`.
+
+    Args:
+        fake_client (FakeGeminiClient): The injected fake Gemini client.
+    """
+    service = AnalysisServer(port=0, workers=1, max_queue=1, analyze=CVAnalyzer.analyze_core)
+    service.start()
+    try:
+        url = f"http://{service.address[0]}:{service.address[1]}/analyze/stream"
+        data = json.dumps({"cv_text": "Python developer", "role_text": "Backend role"}).encode("utf-8")
+        request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=10) as response:
+            lines = [json.loads(line) for line in response.read().decode("utf-8").splitlines()]
+    finally:
+        service.shutdown()
+
+    assert lines[0]["field"] == "match_score" and lines[-1]["field"] == "report"
+    assert lines[-1]["value"]["match_score"] == lines[0]["value"]
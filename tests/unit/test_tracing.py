@@ -0,0 +1,90 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+from cv_to_role_analyzer.cv_analyzer import CVAnalyzer
+from cv_to_role_analyzer.fakes import FakeGeminiClient
+from cv_to_role_analyzer.llm import LLMClient
+from cv_to_role_analyzer.tracing import ProfileSink, Tracer
+
+
+class RecordingSink(ProfileSink):
+    """A profile sink that also keeps every finished span."""
+
+    def __init__(self):
+        super().__init__()
+        self.spans = []
+
+    def on_span(self, span):
+        self.spans.append(span)
+        super().on_span(span)
+
+
+@pytest.fixture
+def fake_client():
+    """Injects a fake Gemini client for the duration of a test and resets the shared client afterwards."""
+    client = FakeGeminiClient()
+    LLMClient.set_client(client)
+    yield client
+    LLMClient.set_client(None)
+
+
+def test_spans_nest_and_counters_aggregate():
+    """
+    Unit test for the `span` and `count` functions in the `Tracer` class.
+
+    This test checks that nested spans share the trace of their parent, that nothing is recorded without
+    a sink, and that counters are summed per name.
+    """
+    with Tracer.span("ignored"):
+        pass
+
+    profiler = RecordingSink()
+    Tracer.add_sink(profiler)
+    try:
+        with Tracer.span("analysis"):
+            with Tracer.span("llm.call", tokens=10) as span:
+                span.set(items=1)
+            Tracer.count("llm_tokens_sent", 10)
+            Tracer.count("llm_tokens_sent", 5)
+    finally:
+        Tracer.remove_sink(profiler)
+
+    child, parent = profiler.spans
+    assert (child.name, parent.name) == ("llm.call", "analysis")
+    assert child.trace_id == parent.trace_id and child.parent_id == parent.span_id
+    assert child.attributes == {"tokens": 10, "items": 1}
+    assert profiler.counters[("llm_tokens_sent", ())] == 15
+    assert "ignored" not in profiler.stages
+
+
+def test_analyze_profile_and_exporters(fake_client, tmp_path):
+    """
+    System test for the `--profile` and `--trace` options of the `analyze` command.
+
+    This test checks that the per-stage breakdown is printed, and that the Prometheus dump and the
+    OpenTelemetry file hold the stages and counters of the analysis.
+
+    Args:
+        fake_client (FakeGeminiClient): The injected fake Gemini client.
+        tmp_path (pathlib.Path): Fixture providing a temporary directory for the output files.
+    """
+    prometheus_path, otel_path = tmp_path / "metrics.prom", tmp_path / "traces.jsonl"
+    result = CliRunner().invoke(CVAnalyzer.cli, [
+        "--cv", "samples/sample_cv.pdf", "--role", "samples/sample_role.txt", "--output-dir", str(tmp_path),
+        "--no-cache", "--profile", "--trace", f"prometheus:{prometheus_path}", "--trace", f"otel:{otel_path}",
+    ])
+
+    assert result.exit_code == 0, result.output
+    for stage in ("analysis", "pdf.extract", "text.compact", "prompt.build", "llm.call", "llm.parse",
+                  "report.serialize"):
+        assert stage in result.output
+    assert "llm_tokens_sent" in result.output and "extracted_text_bytes" in result.output
+
+    assert 'cv_analyzer_stage_seconds_count{stage="llm.call"} 1' in prometheus_path.read_text(encoding="utf-8")
+    lines = [json.loads(line) for line in otel_path.read_text(encoding="utf-8").splitlines()]
+    spans = [line["resourceSpans"][0]["scopeSpans"][0]["spans"][0] for line in lines if "resourceSpans" in line]
+    root = next(span for span in spans if span["name"] == "analysis")
+    assert all(span["traceId"] == root["traceId"] for span in spans if span["name"] == "llm.call")
+    assert any("resourceMetrics" in line for line in lines)
+    assert Tracer._sinks == ()
@@ -0,0 +1,102 @@
+from click.testing import CliRunner
+from cv_to_role_analyzer.cv_analyzer import CVAnalyzer
+from cv_to_role_analyzer.fakes import FakeGeminiClient
+from cv_to_role_analyzer.llm import LLMClient
+from cv_to_role_analyzer.versions import CVVersionStore
+
+CV = """Jane Doe
+Backend developer
+
+Experience
+- Python developer at Acme, 2019-2024
+- Built Django services
+
+Skills
+Python, Django, SQL
+
+Education
+BSc Computer Science
+"""
+
+
+def test_section_diff_ignores_cosmetic_edits():
+    """
+    Unit test for the `sections`, `fingerprint` and `diff` functions in the `CVVersionStore` class.
+
+    This test checks that whitespace, case, punctuation and bullet edits leave every section unchanged, and
+    that a real edit names the changed section.
+    """
+    def fingerprints(text):
+        return {name: CVVersionStore.fingerprint(section) for name, section in CVVersionStore.sections(text).items()}
+
+    sections = CVVersionStore.sections(CV)
+    assert list(sections) == ["header", "experience", "skills", "education"]
+
+    cosmetic = CV.replace("- ", "• ").replace("Python, Django", "python,  django").replace("\n\n", "\n\n\n")
+    assert not any(CVVersionStore.diff(fingerprints(CV), fingerprints(cosmetic)).values())
+
+    revised = CV.replace("SQL", "SQL, Kubernetes") + "\nCertifications\nCKA\n"
+    assert CVVersionStore.diff(fingerprints(CV), fingerprints(revised)) == {
+        "added": ["certifications"], "removed": [], "changed": ["skills"],
+    }
+
+
+def test_analyze_revision_reuses_or_focuses_the_analysis(tmp_path, monkeypatch):
+    """
+    Unit test for the `analyze_revision` function in the `CVAnalyzer` class.
+
+    This test checks that the first version is analyzed in full, that a cosmetic revision reuses the stored
+    analysis without any call, and that a real revision sends the previous analysis with the revised sections
+    only.
+
+    Args:
+        tmp_path (pathlib.Path): Fixture providing a temporary directory for the version store.
+        monkeypatch (pytest.MonkeyPatch): Fixture used to record the prompts sent to the fake client.
+    """
+    client = FakeGeminiClient()
+    prompts = []
+    respond = client.respond
+    monkeypatch.setattr(client, "respond", lambda contents: prompts.append(contents) or respond(contents))
+    versions = CVVersionStore(str(tmp_path / "versions.sqlite3"))
+    LLMClient.set_client(client)
+    try:
+        first, revision = CVAnalyzer.analyze_revision("jane", CV, "Backend role", versions, backend="gemini")
+        assert revision["outcome"] == "new" and revision["version"] == 1 and client.calls == 1
+
+        reused, revision = CVAnalyzer.analyze_revision("jane", CV.replace("- ", "* "), "Backend role", versions,
+                                                       backend="gemini")
+        assert revision["outcome"] == "reused" and reused == first and client.calls == 1
+
+        _, revision = CVAnalyzer.analyze_revision("jane", CV.replace("SQL", "SQL, Kubernetes"), "Backend role",
+                                                  versions, backend="gemini")
+    finally:
+        LLMClient.set_client(None)
+
+    assert revision == {"outcome": "revised", "version": 2, "base_version": 1, "added": [], "removed": [],
+                        "changed": ["skills"]}
+    prompt = "\n".join(part.text for part in prompts[-1].parts)
+    assert "Previous analysis" in prompt and "Kubernetes" in prompt and "Acme" not in prompt
+    assert versions.stats() == {"candidates": 1, "versions": 2, "analyses": {"new": 1, "reused": 1, "revised": 1},
+                                "calls_avoided": 1}
+
+
+def test_analyze_cli_with_candidate(tmp_path, monkeypatch):
+    """
+    System test for the `--candidate` option of the `analyze` command and the `versions` command.
+
+    Args:
+        tmp_path (pathlib.Path): Fixture providing a temporary directory for the store and output files.
+        monkeypatch (pytest.MonkeyPatch): Fixture used to point the version store to the temporary directory.
+    """
+    monkeypatch.setenv("CV_ANALYZER_VERSIONS", str(tmp_path / "versions.sqlite3"))
+    arguments = ["--cv", "samples/sample_cv.pdf", "--role", "samples/sample_role.txt", "--output-dir", str(tmp_path),
+                 "--backend", "local", "--candidate", "jane"]
+    first = CliRunner().invoke(CVAnalyzer.cli, arguments)
+    second = CliRunner().invoke(CVAnalyzer.cli, arguments)
+
+    assert first.exit_code == 0 and "analyzed in full" in first.output
+    assert second.exit_code == 0 and "previous analysis reused (1 call avoided)" in second.output
+    result = CliRunner().invoke(CVAnalyzer.cli, ["versions"])
+    assert '"calls_avoided": 1' in result.output
+    result = CliRunner().invoke(CVAnalyzer.cli, ["versions", "jane"])
+    assert '"version": 1' in result.output